@@ -0,0 +1,90 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.db import transaction
+from django.http import Http404, JsonResponse
+from django.views import View
+
+from rest_framework import exceptions
+from rest_framework.settings import api_settings
+
+from apichallenge.api.mixins import ApiAuthMixin
+from apichallenge.common.db_routing import enable_replica_reads, replica_reads, replica_reads_allowed
+
+
+class AsyncApiView(View):
+    """
+    Async counterpart of `ApiAuthMixin` + `APIView` for read endpoints
+    served under ASGI. DRF views are sync-only, so this runs the same
+    authentication, permission and throttle classes and reports errors in
+    the same `{"detail": ...}` format, without holding a thread while
+    awaiting I/O.
+
+    Every handler on a subclass must be `async def`. Async views can't run
+    inside ATOMIC_REQUESTS; set `replica_reads = True` to read from a
+    replica, as ReplicaReadMixin does for sync views. Sync steps that use
+    the ORM must stay on the request's sync thread (thread_sensitive=True):
+    Django closes database connections at the end of the request only
+    there. Throttling and the replica check only touch the cache and run
+    in the shared thread pool.
+    """
+
+    authentication_classes = ApiAuthMixin.authentication_classes
+    permission_classes = ApiAuthMixin.permission_classes
+    throttle_classes = api_settings.DEFAULT_THROTTLE_CLASSES
+    replica_reads = False
+
+    @transaction.non_atomic_requests
+    async def dispatch(self, request, *args, **kwargs):
+        # DRF-style alias, so paginators and filters work unchanged.
+        request.query_params = request.GET
+        try:
+            request.user = await self.authenticate(request)
+            self.check_permissions(request)
+            await self.check_throttles(request)
+            with replica_reads(False):
+                if (
+                    self.replica_reads
+                    and settings.DATABASE_REPLICAS
+                    and await sync_to_async(replica_reads_allowed, thread_sensitive=False)(request)
+                ):
+                    enable_replica_reads()
+                return await super().dispatch(request, *args, **kwargs)
+        except Http404:
+            return self.handle_exception(exceptions.NotFound())
+        except exceptions.APIException as exc:
+            return self.handle_exception(exc)
+
+    @sync_to_async
+    def authenticate(self, request):
+        for authentication_class in self.authentication_classes:
+            result = authentication_class().authenticate(request)
+            if result is not None:
+                return result[0]
+        return AnonymousUser()
+
+    def check_permissions(self, request):
+        for permission_class in self.permission_classes:
+            if not permission_class().has_permission(request, self):
+                if not request.user.is_authenticated:
+                    raise exceptions.NotAuthenticated()
+                raise exceptions.PermissionDenied()
+
+    @sync_to_async(thread_sensitive=False)
+    def check_throttles(self, request):
+        waits = []
+        for throttle_class in self.throttle_classes:
+            throttle = throttle_class()
+            if not throttle.allow_request(request, self):
+                waits.append(throttle.wait())
+        if waits:
+            raise exceptions.Throttled(max(waits))
+
+    def handle_exception(self, exc: exceptions.APIException) -> JsonResponse:
+        response = JsonResponse({"detail": exc.detail}, status=exc.status_code)
+        if getattr(exc, "wait", None):
+            response["Retry-After"] = "%d" % exc.wait
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            response.status_code = 401
+            response["WWW-Authenticate"] = 'Bearer realm="api"'
+        return response
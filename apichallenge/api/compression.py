@@ -0,0 +1,214 @@
+import gzip
+import logging
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_vary_headers
+
+from apichallenge.common.cache import acache_get, acache_set
+
+try:
+    import zstandard
+except ImportError:  # optional: falls back to brotli/gzip
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:  # optional: falls back to gzip
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_CONTENT_TYPES = {
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/vnd.oai.openapi",
+    "application/vnd.oai.openapi+json",
+    "image/svg+xml",
+}
+
+
+def _compress_zstd(data: bytes, level: int) -> bytes:
+    # Compressor objects are not thread-safe; they are cheap to create.
+    return zstandard.ZstdCompressor(level=level).compress(data)
+
+
+def _compress_br(data: bytes, level: int) -> bytes:
+    return brotli.compress(data, quality=level, mode=brotli.MODE_TEXT)
+
+
+def _compress_gzip(data: bytes, level: int) -> bytes:
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def _available_encodings() -> list[tuple[str, object]]:
+    """Supported encodings, in server preference order."""
+    encodings = []
+    if zstandard is not None:
+        encodings.append(("zstd", _compress_zstd))
+    if brotli is not None:
+        encodings.append(("br", _compress_br))
+    encodings.append(("gzip", _compress_gzip))
+    return encodings
+
+
+ENCODINGS = _available_encodings()
+
+
+def parse_accept_encoding(header: str) -> dict[str, float]:
+    """{coding: q} from an Accept-Encoding header."""
+    accepted = {}
+    for part in header.split(","):
+        coding, *params = part.strip().split(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+
+        q = 1.0
+        for param in params:
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def negotiate_encoding(header: str) -> str | None:
+    """The accepted encoding with the highest q; ties go to the better compressor."""
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get("*", 0.0)
+
+    best, best_q = None, 0.0
+    for name, _ in ENCODINGS:
+        q = accepted.get(name, wildcard)
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+def _is_compressible(content_type: str) -> bool:
+    media_type = content_type.split(";")[0].strip().lower()
+    return (
+        media_type.startswith("text/")
+        or media_type.endswith("+json")
+        or media_type in COMPRESSIBLE_CONTENT_TYPES
+    )
+
+
+class CompressionMiddleware:
+    """
+    Compresses text and JSON responses with zstd, brotli or gzip, whichever
+    the client accepts first in that order, once they exceed
+    API_COMPRESSION_MIN_SIZE bytes.
+
+    Streaming responses (file downloads and previews, the async download
+    stream) are never touched, nor are binary or already-encoded content
+    types. For responses with an ETag (set by ConditionalGetMiddleware,
+    which must come after this middleware), compressed bodies are cached
+    per ETag and encoding: the same body is compressed once across workers.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        response = self.get_response(request)
+        encoding = self.get_encoding(request, response)
+        if encoding is None:
+            return response
+
+        key = self.get_cache_key(response, encoding)
+        compressed = cache.get(key) if key else None
+        if compressed is None:
+            compressed = self.compress(response.content, encoding)
+            if key and compressed is not None:
+                cache.set(key, compressed, settings.API_COMPRESSION_CACHE_TTL)
+
+        return self.apply(response, encoding, compressed)
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        encoding = self.get_encoding(request, response)
+        if encoding is None:
+            return response
+
+        key = self.get_cache_key(response, encoding)
+        compressed = await acache_get(key) if key else None
+        if compressed is None:
+            compressed = self.compress(response.content, encoding)
+            if key and compressed is not None:
+                await acache_set(key, compressed, settings.API_COMPRESSION_CACHE_TTL)
+
+        return self.apply(response, encoding, compressed)
+
+    @staticmethod
+    def get_encoding(request, response) -> str | None:
+        if (
+            not settings.API_COMPRESSION_ENABLED
+            or response.streaming
+            or response.status_code != 200
+        ):
+            return None
+        # Vary even when not compressing: a larger body from the same URL may be.
+        patch_vary_headers(response, ("Accept-Encoding",))
+
+        if (
+            response.has_header("Content-Encoding")
+            or "no-transform" in response.get("Cache-Control", "")
+            or not _is_compressible(response.get("Content-Type", ""))
+            or len(response.content) < settings.API_COMPRESSION_MIN_SIZE
+        ):
+            return None
+
+        return negotiate_encoding(request.headers.get("Accept-Encoding", ""))
+
+    @staticmethod
+    def get_cache_key(response, encoding: str) -> str | None:
+        etag = response.get("ETag")
+        if (
+            not etag
+            or not settings.API_COMPRESSION_CACHE_TTL
+            or len(response.content) < settings.API_COMPRESSION_CACHE_MIN_SIZE
+            or "no-store" in response.get("Cache-Control", "")
+        ):
+            return None
+        tag = etag.removeprefix("W/").strip('"')
+        return f"compression:{encoding}:{tag}"
+
+    @staticmethod
+    def compress(content: bytes, encoding: str) -> bytes | None:
+        compressor = dict(ENCODINGS)[encoding]
+        try:
+            return compressor(content, settings.API_COMPRESSION_LEVELS[encoding])
+        except Exception as e:
+            logger.warning("Failed to %s-compress a response: %s", encoding, e)
+            return None
+
+    @staticmethod
+    def apply(response, encoding: str, compressed: bytes | None):
+        # Keep the original when compression failed or did not help.
+        if compressed is None or len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response["Content-Length"] = str(len(compressed))
+        response["Content-Encoding"] = encoding
+
+        # The body is no longer byte-identical to the one the ETag was made for.
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        return response
@@ -5,11 +5,18 @@ from importlib import import_module
 from django.conf import settings
 
 from django.contrib import auth
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
 
 from rest_framework.permissions import IsAuthenticated, BasePermission
 from rest_framework.authentication import BaseAuthentication
 
-from rest_framework_simplejwt.authentication import JWTAuthentication 
+from apichallenge.authentication.authentication import CachedJWTAuthentication
+from apichallenge.common.db_routing import (
+    SAFE_METHODS,
+    enable_replica_reads,
+    replica_reads,
+    replica_reads_allowed,
+)
 
 
 def get_auth_header(headers):
@@ -35,6 +42,31 @@ else:
 
 class ApiAuthMixin:
     authentication_classes: Sequence[Type[BaseAuthentication]] = [
-            JWTAuthentication,
+            CachedJWTAuthentication,
     ]
     permission_classes: PermissionClassesType = (IsAuthenticated, )
+
+
+class ReplicaReadMixin:
+    """
+    Read-only mode for the safe methods of a view: they run outside the
+    ATOMIC_REQUESTS transaction and, once the user is authenticated, read
+    from a replica unless the user was pinned to the primary by a recent
+    write. Other methods keep the per-request transaction.
+    """
+
+    @transaction.non_atomic_requests
+    def dispatch(self, request, *args, **kwargs):
+        if request.method in SAFE_METHODS:
+            with replica_reads(False):
+                return super().dispatch(request, *args, **kwargs)
+
+        if connections[DEFAULT_DB_ALIAS].settings_dict["ATOMIC_REQUESTS"]:
+            with transaction.atomic():
+                return super().dispatch(request, *args, **kwargs)
+        return super().dispatch(request, *args, **kwargs)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if replica_reads_allowed(request):
+            enable_replica_reads()
@@ -0,0 +1,35 @@
+import orjson
+
+from rest_framework.utils import encoders
+from rest_framework.renderers import JSONRenderer
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer producing the same bytes through orjson, which is several
+    times faster on large list responses. Pretty-printing requests
+    (`; indent=`, the browsable API) and a non-compact or ASCII-only
+    configuration still go through the stdlib encoder.
+    """
+
+    # Dates and times go through DRF's encoder, which formats them differently.
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    _default = encoders.JSONEncoder().default
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        if (
+            self.get_indent(accepted_media_type, renderer_context or {}) is not None
+            or not self.compact
+            or self.ensure_ascii
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=self._default, option=self.options)
+
+        # Same escaping as JSONRenderer, see there.
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from config import celery_app
+
+
+class CeleryRoutingTests(SimpleTestCase):
+    def test_every_project_task_is_routed_to_a_declared_queue(self):
+        celery_app.loader.import_default_modules()
+        queues = {queue.name for queue in settings.CELERY_TASK_QUEUES}
+        tasks = [
+            name for name in celery_app.tasks if name.startswith("apichallenge.") and ".tests." not in name
+        ]
+        self.assertTrue(tasks)
+
+        for name in tasks:
+            with self.subTest(task=name):
+                route = celery_app.amqp.router.route({}, name, args=(), kwargs={})
+                self.assertIn(route["queue"].name, queues)
+                self.assertLessEqual(route["priority"], settings.CELERY_TASK_QUEUE_MAX_PRIORITY)
+
+    def test_post_upload_processing_does_not_share_a_queue_with_maintenance(self):
+        route = celery_app.amqp.router.route(
+            {}, "apichallenge.documents.tasks.process_document_after_upload", args=(), kwargs={}
+        )
+        cleanup = celery_app.amqp.router.route(
+            {}, "apichallenge.documents.tasks.cleanup_orphaned_files", args=(), kwargs={}
+        )
+        self.assertNotEqual(route["queue"].name, cleanup["queue"].name)
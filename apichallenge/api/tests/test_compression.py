@@ -0,0 +1,72 @@
+import gzip
+import json
+
+import zstandard
+from django.core.cache import cache
+from django.http import FileResponse, HttpResponse, JsonResponse
+from django.middleware.http import ConditionalGetMiddleware
+from django.test import RequestFactory, TestCase, override_settings
+
+from apichallenge.api.compression import CompressionMiddleware, negotiate_encoding
+
+BODY = {"results": [{"id": i, "title": f"Document {i}"} for i in range(200)]}
+
+
+class NegotiateEncodingTests(TestCase):
+    def test_server_preference_on_ties(self):
+        self.assertEqual(negotiate_encoding("gzip, deflate, br, zstd"), "zstd")
+        self.assertEqual(negotiate_encoding("gzip, br"), "br")
+
+    def test_quality_values(self):
+        self.assertEqual(negotiate_encoding("zstd;q=0.5, gzip"), "gzip")
+        self.assertEqual(negotiate_encoding("*;q=0.1, br;q=0"), "zstd")
+        self.assertIsNone(negotiate_encoding("identity"))
+        self.assertIsNone(negotiate_encoding(""))
+
+
+@override_settings(API_COMPRESSION_ENABLED=True, API_COMPRESSION_MIN_SIZE=1024)
+class CompressionMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+
+    def _get(self, response, accept_encoding="gzip, br, zstd"):
+        request = self.factory.get("/", HTTP_ACCEPT_ENCODING=accept_encoding)
+        return CompressionMiddleware(lambda r: response)(request)
+
+    def test_compresses_large_json(self):
+        resp = self._get(JsonResponse(BODY), accept_encoding="gzip")
+        self.assertEqual(resp["Content-Encoding"], "gzip")
+        self.assertEqual(json.loads(gzip.decompress(resp.content)), BODY)
+        self.assertEqual(resp["Content-Length"], str(len(resp.content)))
+        self.assertIn("Accept-Encoding", resp["Vary"])
+
+    def test_zstd_preferred(self):
+        resp = self._get(JsonResponse(BODY))
+        self.assertEqual(resp["Content-Encoding"], "zstd")
+        self.assertEqual(json.loads(zstandard.ZstdDecompressor().decompress(resp.content)), BODY)
+
+    def test_small_response_untouched(self):
+        resp = self._get(JsonResponse({"id": 1}))
+        self.assertFalse(resp.has_header("Content-Encoding"))
+
+    def test_binary_and_streaming_untouched(self):
+        resp = self._get(HttpResponse(b"x" * 4096, content_type="application/octet-stream"))
+        self.assertFalse(resp.has_header("Content-Encoding"))
+
+        resp = self._get(FileResponse(iter([b"x" * 4096]), content_type="text/plain"))
+        self.assertFalse(resp.has_header("Content-Encoding"))
+
+    @override_settings(API_COMPRESSION_CACHE_MIN_SIZE=0)
+    def test_compressed_variant_cached_by_etag(self):
+        request = self.factory.get("/", HTTP_ACCEPT_ENCODING="gzip")
+        middleware = CompressionMiddleware(ConditionalGetMiddleware(lambda r: JsonResponse(BODY)))
+
+        first = middleware(request)
+        self.assertTrue(first["ETag"].startswith('W/"'))
+        etag = first["ETag"][3:-1]
+        self.assertEqual(cache.get(f"compression:gzip:{etag}"), first.content)
+
+        # A revalidation with the weak ETag is answered with 304.
+        request = self.factory.get("/", HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(middleware(request).status_code, 304)
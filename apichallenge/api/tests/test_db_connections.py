@@ -0,0 +1,96 @@
+import importlib
+import os
+from unittest import mock
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
+
+import config.settings.database
+from apichallenge.common.db_metrics import database_connection_stats, pool_stats
+from apichallenge.users.models import BaseUser, Role
+
+
+def load_database_settings(**environ):
+    with mock.patch.dict(os.environ, environ):
+        try:
+            return importlib.reload(config.settings.database)
+        finally:
+            importlib.reload(config.settings.database)
+
+
+class DatabaseConnectionSettingsTests(SimpleTestCase):
+    def test_role_defaults(self):
+        web = load_database_settings(DJANGO_PROCESS_ROLE="web")
+        self.assertEqual(web.DATABASE_CONNECTION, {"CONN_MAX_AGE": 600, "CONN_HEALTH_CHECKS": True})
+
+        asgi = load_database_settings(DJANGO_PROCESS_ROLE="asgi", ASGI_DATABASE_POOL_MAX_SIZE="4")
+        self.assertEqual(asgi.DATABASE_CONNECTION["CONN_MAX_AGE"], 0)
+        self.assertEqual(asgi.DATABASE_CONNECTION["OPTIONS"]["pool"]["max_size"], 4)
+
+    def test_roles_are_configured_separately(self):
+        celery = load_database_settings(
+            DJANGO_PROCESS_ROLE="celery",
+            DATABASE_CONN_MODE="pool",
+            CELERY_DATABASE_CONN_MODE="none",
+        )
+        self.assertEqual(celery.DATABASE_CONN_MODE, "none")
+        self.assertEqual(celery.DATABASE_CONNECTION, {"CONN_MAX_AGE": 0})
+
+    def test_invalid_values(self):
+        with self.assertRaises(ImproperlyConfigured):
+            load_database_settings(DJANGO_PROCESS_ROLE="worker")
+        with self.assertRaises(ImproperlyConfigured):
+            load_database_settings(DATABASE_CONN_MODE="pooled")
+
+
+class FakePool:
+    def __init__(self, stats):
+        self.stats = stats
+
+    def get_stats(self):
+        return self.stats
+
+
+class DatabaseConnectionStatsTests(TestCase):
+    def test_pool_stats(self):
+        stats = pool_stats(FakePool({
+            "pool_min": 2,
+            "pool_max": 10,
+            "pool_size": 5,
+            "pool_available": 1,
+            "requests_waiting": 2,
+            "requests_num": 40,
+            "requests_queued": 8,
+            "requests_wait_ms": 120,
+        }))
+        self.assertEqual(stats["in_use"], 4)
+        self.assertEqual(stats["saturation"], 0.4)
+        self.assertEqual(stats["waiting"], 2)
+        self.assertEqual(stats["wait_ms_avg"], 3.0)
+        # Counters the pool hasn't incremented yet are missing from get_stats().
+        self.assertEqual(stats["requests_timed_out"], 0)
+
+    def test_connects_are_counted(self):
+        before = database_connection_stats()["default"]
+        connection_created.send(sender=type(connection), connection=connection)
+        after = database_connection_stats()["default"]
+
+        self.assertEqual(after["mode"], "none")
+        self.assertEqual(after["connects"], before["connects"] + 1)
+        self.assertNotIn("pool", after)
+
+    def test_admin_endpoint(self):
+        client = APIClient()
+        admin = BaseUser.objects.create_user(username="db_admin", password="Admin@12345", role=Role.ADMIN)
+        editor = BaseUser.objects.create_user(username="db_editor", password="Editor@12345", role=Role.EDITOR)
+
+        client.force_authenticate(user=editor)
+        self.assertEqual(client.get("/api/documents/admin/db-stats/").status_code, 403)
+
+        client.force_authenticate(user=admin)
+        response = client.get("/api/documents/admin/db-stats/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("default", response.json())
@@ -0,0 +1,72 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework.views import APIView
+
+from apichallenge.api.mixins import ApiAuthMixin, ReplicaReadMixin
+from apichallenge.common.db_routing import (
+    PrimaryPinningMiddleware,
+    PrimaryReplicaRouter,
+    is_pinned_to_primary,
+    pin_to_primary,
+    replica_reads,
+    use_primary,
+)
+from apichallenge.documents.models import Document
+from apichallenge.users.models import BaseUser, Role
+
+router = PrimaryReplicaRouter()
+
+
+class ReadView(ApiAuthMixin, ReplicaReadMixin, APIView):
+    def get(self, request):
+        return Response({"db": router.db_for_read(Document)})
+
+
+@override_settings(DATABASE_REPLICAS=["replica_0"])
+class PrimaryReplicaRouterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = BaseUser.objects.create_user(
+            username="replica_user", password="Replica@12345", role=Role.VIEWER
+        )
+
+    def test_routing(self):
+        self.assertIsNone(router.db_for_read(Document))
+        with replica_reads():
+            self.assertEqual(router.db_for_read(Document), "replica_0")
+            self.assertEqual(router.db_for_write(Document), "default")
+            with use_primary():
+                self.assertIsNone(router.db_for_read(Document))
+        self.assertFalse(router.allow_migrate("replica_0", "documents"))
+
+    @override_settings(DATABASE_REPLICAS=["replica_0", "replica_1"])
+    def test_one_replica_per_block(self):
+        with mock.patch("random.choice", side_effect=["replica_1", "replica_0"]):
+            with replica_reads():
+                self.assertEqual({router.db_for_read(Document) for _ in range(3)}, {"replica_1"})
+
+    def _get(self):
+        request = APIRequestFactory().get("/")
+        force_authenticate(request, user=self.user)
+        return ReadView.as_view()(request).data["db"]
+
+    def test_read_only_view_uses_replica_without_transaction(self):
+        self.assertEqual(ReadView.as_view()._non_atomic_requests, {"default"})
+        self.assertEqual(self._get(), "replica_0")
+        # The replica is only used for the duration of the request.
+        self.assertIsNone(router.db_for_read(Document))
+
+    def test_pinned_user_reads_primary(self):
+        pin_to_primary(self.user.pk)
+        self.assertIsNone(self._get())
+
+    def test_successful_write_pins_user(self):
+        request = RequestFactory().post("/")
+        request.user = self.user
+        PrimaryPinningMiddleware(lambda r: HttpResponse(status=201))(request)
+        self.assertTrue(is_pinned_to_primary(self.user.pk))
@@ -0,0 +1,110 @@
+import tempfile
+from unittest import mock
+
+from botocore.exceptions import ClientError, OperationNotPageableError
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase
+
+from apichallenge.common.storage import LocalS3Storage
+from apichallenge.documents.storage import storage_object_pages, storage_objects_delete
+
+
+class LocalS3StorageTests(SimpleTestCase):
+    def setUp(self):
+        self.storage = LocalS3Storage()
+        self.client = self.storage.connection.meta.client
+        self.bucket = self.storage.bucket_name
+
+    def test_file_api(self):
+        name = self.storage.save("documents/1/a.txt", ContentFile(b"hello"))
+
+        self.assertTrue(self.storage.exists(name))
+        self.assertEqual(self.storage.size(name), 5)
+        with self.storage.open(name) as f:
+            self.assertEqual(f.read(), b"hello")
+
+        self.storage.delete(name)
+        self.assertFalse(self.storage.exists(name))
+        with self.assertRaises(FileNotFoundError):
+            self.storage.open(name)
+
+    def test_range_reads(self):
+        self.storage.save("r.bin", ContentFile(b"0123456789"))
+
+        response = self.client.get_object(Bucket=self.bucket, Key="r.bin", Range="bytes=2-4")
+        self.assertEqual(response["Body"].read(), b"234")
+        self.assertEqual(response["ContentRange"], "bytes 2-4/10")
+        tail = self.client.get_object(Bucket=self.bucket, Key="r.bin", Range="bytes=-3")
+        self.assertEqual(tail["Body"].read(), b"789")
+
+        with self.assertRaises(ClientError) as error:
+            self.client.get_object(Bucket=self.bucket, Key="r.bin", Range="bytes=20-")
+        self.assertEqual(error.exception.response["Error"]["Code"], "InvalidRange")
+
+    def test_listing_and_batch_delete_through_the_app_helpers(self):
+        for i in range(5):
+            self.storage.save(f"documents/{i}.txt", ContentFile(b"x"))
+        self.storage.save("previews/p.webp", ContentFile(b"x"))
+
+        with mock.patch("apichallenge.documents.storage.LIST_OBJECTS_PAGE_SIZE", 2):
+            pages = list(storage_object_pages(prefix="documents/", storage=self.storage))
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+
+        keys = [obj["Key"] for page in pages for obj in page]
+        self.assertEqual(storage_objects_delete(keys=keys, storage=self.storage), 5)
+        self.assertEqual(self.storage.listdir("")[0], ["previews"])
+
+        with self.assertRaises(OperationNotPageableError):
+            self.client.get_paginator("get_object")
+
+    def test_large_files_are_saved_in_parts(self):
+        self.storage.multipart_threshold = self.storage.multipart_chunksize = 5 * 1024 * 1024
+        data = b"a" * (5 * 1024 * 1024) + b"b" * 10
+
+        with mock.patch.object(self.client, "upload_part", wraps=self.client.upload_part) as upload_part:
+            name = self.storage.save("big.bin", ContentFile(data))
+
+        self.assertEqual(upload_part.call_count, 2)
+        self.assertEqual(self.storage.open(name).read(), data)
+
+    def test_multipart_rejects_small_parts(self):
+        upload_id = self.client.create_multipart_upload(Bucket=self.bucket, Key="m")["UploadId"]
+        parts = [
+            {"PartNumber": n, "ETag": self.client.upload_part(
+                Bucket=self.bucket, Key="m", UploadId=upload_id, PartNumber=n, Body=b"small"
+            )["ETag"]}
+            for n in (1, 2)
+        ]
+        with self.assertRaises(ClientError) as error:
+            self.client.complete_multipart_upload(
+                Bucket=self.bucket, Key="m", UploadId=upload_id, MultipartUpload={"Parts": parts}
+            )
+        self.assertEqual(error.exception.response["Error"]["Code"], "EntityTooSmall")
+
+    def test_presigned_urls(self):
+        url = self.storage.url("documents/1/a b.txt")
+
+        self.assertEqual(self.client.verify_presigned_url(url), "documents/1/a b.txt")
+        self.assertIsNone(self.client.verify_presigned_url(url, method="PUT"))
+        self.assertIsNone(self.client.verify_presigned_url(url.replace("a%20b", "c")))
+
+        expired = self.storage.url("x.txt", expire=-1)
+        self.assertIsNone(self.client.verify_presigned_url(expired))
+
+    def test_clear(self):
+        self.storage.save("documents/1/a.txt", ContentFile(b"x"))
+        upload_id = self.client.create_multipart_upload(Bucket=self.bucket, Key="m")["UploadId"]
+
+        self.storage.clear()
+
+        self.assertEqual(self.storage.listdir(""), ([], []))
+        with self.assertRaises(ClientError):
+            self.client.upload_part(Bucket=self.bucket, Key="m", UploadId=upload_id, PartNumber=1, Body=b"x")
+
+    def test_directory_backed(self):
+        with tempfile.TemporaryDirectory() as location:
+            storage = LocalS3Storage(location=location)
+            storage.save("documents/1/a.txt", ContentFile(b"on disk"))
+
+            self.assertEqual(LocalS3Storage(location=location).open("documents/1/a.txt").read(), b"on disk")
+            self.assertEqual(storage.listdir("documents"), (["1"], []))
@@ -0,0 +1,99 @@
+import io
+from unittest import mock
+
+import boto3
+from botocore.awsrequest import AWSResponse
+from celery.signals import after_task_publish, before_task_publish
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from prometheus_client import REGISTRY
+from rest_framework.test import APIClient
+from urllib3 import HTTPResponse
+
+from apichallenge.common import metrics
+from apichallenge.common.metrics import instrument_s3_client
+from apichallenge.users.models import BaseUser, Role
+
+LIST_VIEW = "api:documents:document-list-create"
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            user=BaseUser.objects.create_user(username="metrics_viewer", password="Viewer@12345", role=Role.VIEWER)
+        )
+
+    def test_requests_are_recorded_per_view(self):
+        labels = {"view": LIST_VIEW, "method": "GET", "status": "200"}
+        requests = sample("http_request_duration_seconds_count", **labels)
+        queries = sample("http_request_db_queries_sum", view=LIST_VIEW)
+
+        self.client.get("/api/documents/")
+
+        self.assertEqual(sample("http_request_duration_seconds_count", **labels), requests + 1)
+        self.assertGreater(sample("http_request_db_queries_sum", view=LIST_VIEW), queries)
+
+    def test_document_cache_hits_and_misses(self):
+        misses = sample("documents_cache_lookups_total", cache="list", result="miss")
+        hits = sample("documents_cache_lookups_total", cache="list", result="hit")
+
+        self.client.get("/api/documents/")
+        self.client.get("/api/documents/")
+
+        self.assertEqual(sample("documents_cache_lookups_total", cache="list", result="miss"), misses + 1)
+        self.assertEqual(sample("documents_cache_lookups_total", cache="list", result="hit"), hits + 1)
+
+    def test_metrics_endpoint(self):
+        self.client.get("/api/documents/")
+
+        response = APIClient().get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"http_request_duration_seconds_bucket", response.content)
+        self.assertIn(b"documents_cache_lookups_total", response.content)
+
+
+class StorageAndCeleryMetricsTests(TestCase):
+    def test_s3_calls_are_recorded(self):
+        client = boto3.client(
+            "s3", region_name="us-east-1", aws_access_key_id="key", aws_secret_access_key="secret"
+        )
+        instrument_s3_client(client)
+        instrument_s3_client(client)  # idempotent
+        calls = sample("storage_requests_total", operation="PutObject", status="200")
+        sent = sample("storage_bytes_total", operation="PutObject", direction="sent")
+
+        # Answer at the HTTP layer, so the whole botocore call path runs.
+        def respond(request, **kwargs):
+            return AWSResponse(request.url, 200, {}, HTTPResponse(body=io.BytesIO(), preload_content=False))
+
+        client.meta.events.register("before-send.s3", respond)
+        client.put_object(Bucket="documents", Key="k", Body=b"12345")
+
+        self.assertEqual(sample("storage_requests_total", operation="PutObject", status="200"), calls + 1)
+        self.assertEqual(sample("storage_bytes_total", operation="PutObject", direction="sent"), sent + 5)
+        self.assertGreater(sample("storage_request_duration_seconds_count", operation="PutObject"), 0)
+
+    def test_task_publish_time(self):
+        task = "apichallenge.documents.tasks.relay_outbox"
+        published = sample("celery_task_publish_duration_seconds_count", task=task)
+
+        before_task_publish.send(sender=task, headers={"id": "1"}, body=())
+        after_task_publish.send(sender=task, headers={"id": "1"}, body=(), exchange="", routing_key="")
+
+        self.assertEqual(sample("celery_task_publish_duration_seconds_count", task=task), published + 1)
+
+    @mock.patch.object(metrics, "start_http_server")
+    def test_worker_metrics_server(self, start_http_server):
+        with override_settings(METRICS_WORKER_PORT=0):
+            metrics._start_worker_metrics_server()
+        start_http_server.assert_not_called()
+
+        with override_settings(METRICS_WORKER_PORT=9808):
+            metrics._start_worker_metrics_server()
+        start_http_server.assert_called_once_with(9808, registry=REGISTRY)
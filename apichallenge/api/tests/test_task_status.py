@@ -0,0 +1,77 @@
+from datetime import timedelta
+from unittest import mock
+
+from celery import shared_task
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from django_celery_results.models import TaskResult
+from rest_framework.test import APIClient
+
+from apichallenge.common.task_status import StatusTrackedTask, task_status_get
+from apichallenge.common.tasks import prune_task_results
+from apichallenge.documents.tasks import prune_document_tombstones
+from apichallenge.users.models import BaseUser, Role
+
+
+@shared_task(base=StatusTrackedTask)
+def failing_task():
+    raise ValueError("broken")
+
+
+class TaskStatusTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_success_is_recorded_without_a_result_row(self):
+        result = prune_document_tombstones.delay()
+
+        status = task_status_get(task_id=result.id)
+        self.assertEqual(status["task"], prune_document_tombstones.name)
+        self.assertEqual(status["state"], "SUCCESS")
+        self.assertEqual(status["result"], 0)
+        self.assertFalse(TaskResult.objects.exists())
+
+    def test_failure_is_recorded(self):
+        # Eager runs that propagate errors skip on_failure; workers always call it.
+        failing_task.apply(task_id="failing", throw=False)
+
+        status = task_status_get(task_id="failing")
+        self.assertEqual(status["state"], "FAILURE")
+        self.assertIn("broken", status["error"])
+
+    def test_cache_errors_do_not_fail_the_task(self):
+        with mock.patch("apichallenge.common.task_status.cache.set", side_effect=ConnectionError):
+            self.assertEqual(prune_document_tombstones.delay().get(), 0)
+
+    def test_admin_endpoint(self):
+        client = APIClient()
+        admin = BaseUser.objects.create_user(username="task_admin", password="Admin@12345", role=Role.ADMIN)
+        editor = BaseUser.objects.create_user(username="task_editor", password="Editor@12345", role=Role.EDITOR)
+        task_id = prune_document_tombstones.delay().id
+
+        client.force_authenticate(user=editor)
+        self.assertEqual(client.get(f"/api/documents/admin/tasks/{task_id}/").status_code, 403)
+
+        client.force_authenticate(user=admin)
+        response = client.get(f"/api/documents/admin/tasks/{task_id}/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["id"], task_id)
+        self.assertEqual(response.json()["state"], "SUCCESS")
+
+        self.assertEqual(client.get("/api/documents/admin/tasks/unknown/").status_code, 404)
+
+
+class PruneTaskResultsTests(TestCase):
+    def test_prunes_rows_older_than_the_retention_in_batches(self):
+        now = timezone.now()
+        for i in range(5):
+            TaskResult.objects.create(task_id=f"old-{i}", status="SUCCESS")
+        TaskResult.objects.create(task_id="recent", status="SUCCESS")
+        # date_done is auto_now: backdate after creating.
+        TaskResult.objects.exclude(task_id="recent").update(date_done=now - timedelta(days=30))
+
+        with self.settings(TASK_RESULTS_RETENTION=60 * 60 * 24, TASK_RESULTS_PRUNE_BATCH_SIZE=2):
+            self.assertEqual(prune_task_results(), 5)
+
+        self.assertEqual(list(TaskResult.objects.values_list("task_id", flat=True)), ["recent"])
@@ -0,0 +1,215 @@
+import logging
+import math
+import re
+import threading
+import time
+from dataclasses import dataclass
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+
+from rest_framework.throttling import BaseThrottle
+
+logger = logging.getLogger(__name__)
+
+# Atomic token bucket. The bucket may go negative when a single request
+# costs more than the whole burst (a large download): it is admitted once
+# the bucket is full and the debt is then repaid by the refill rate.
+# Uses the Redis clock, so buckets stay consistent across app servers.
+TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+local allowed = 0
+if tokens >= math.min(cost, capacity) then
+    tokens = tokens - cost
+    allowed = 1
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate * 1000) + 1000)
+return {allowed, tostring(tokens)}
+"""
+
+_RATE_RE = re.compile(
+    r"^\s*(?P<amount>\d+)\s*(?P<unit>[KMG]B|B)?\s*/\s*(?P<count>\d*)\s*(?P<period>[smhd])[a-z]*\s*$",
+    re.IGNORECASE,
+)
+_UNITS = {"": 1, "B": 1, "KB": 1024, "MB": 1024**2, "GB": 1024**3}
+_PERIODS = {"s": 1, "m": 60, "h": 60 * 60, "d": 60 * 60 * 24}
+
+
+@dataclass(frozen=True)
+class Rate:
+    capacity: float  # burst size
+    refill: float  # tokens per second
+
+
+def parse_rate(rate: str) -> Rate:
+    """
+    Parse "<amount>[unit]/[n]<period>", e.g. "120/min", "20/10s" or
+    "20MB/s". The amount is both the burst and the refill per period.
+    """
+    match = _RATE_RE.match(rate)
+    if match is None:
+        raise ValueError(f"Invalid throttle rate: {rate!r}")
+
+    amount = int(match["amount"]) * _UNITS[(match["unit"] or "").upper()]
+    seconds = int(match["count"] or 1) * _PERIODS[match["period"].lower()]
+    return Rate(capacity=amount, refill=amount / seconds)
+
+
+def _uses_django_redis() -> bool:
+    return hasattr(cache, "client") and hasattr(cache.client, "get_client")
+
+
+_script = None
+_local_lock = threading.Lock()
+
+
+def _consume_redis(*, key: str, rate: Rate, cost: int) -> tuple[bool, float]:
+    global _script
+
+    if _script is None:
+        from django_redis import get_redis_connection
+
+        _script = get_redis_connection("default").register_script(TOKEN_BUCKET_LUA)
+
+    allowed, tokens = _script(keys=[key], args=[rate.capacity, rate.refill, cost])
+    return bool(allowed), float(tokens)
+
+
+def _consume_local(*, key: str, rate: Rate, cost: int) -> tuple[bool, float]:
+    """Same algorithm on a non-Redis cache (tests, local runs); atomic per process only."""
+    with _local_lock:
+        now = time.time()
+        tokens, ts = cache.get(key, (rate.capacity, now))
+        tokens = min(rate.capacity, tokens + max(0.0, now - ts) * rate.refill)
+
+        allowed = tokens >= min(cost, rate.capacity)
+        if allowed:
+            tokens -= cost
+
+        cache.set(key, (tokens, now), math.ceil((rate.capacity - tokens) / rate.refill) + 1)
+        return allowed, tokens
+
+
+def token_bucket_consume(*, key: str, rate: Rate, cost: int = 1) -> tuple[bool, float]:
+    """Take `cost` tokens from a bucket; returns (allowed, tokens left)."""
+    if _uses_django_redis():
+        return _consume_redis(key=key, rate=rate, cost=cost)
+    return _consume_local(key=key, rate=rate, cost=cost)
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Token-bucket throttle keyed by scope, role and user (or client IP for
+    anonymous requests), with budgets from settings.API_THROTTLE_RATES:
+
+        {"<scope>": {"<role>": "<rate>", "default": "<rate>"}}
+
+    Safe methods fall under the "read" scope and the others under "write".
+    A view can name its own scope with `throttle_scope`, a string or a
+    {method: scope} dict; it gets a separate budget once the scope has
+    rates configured, and shares the read/write one until then. A view
+    may define `get_throttle_cost(request)` to charge more than one token
+    per request, e.g. the bytes of a download.
+
+    The bucket state is exposed to clients as RateLimit-* response headers
+    by RateLimitHeadersMiddleware. Redis errors let the request through.
+    """
+
+    wait_seconds = 0
+
+    def get_scope(self, request, view) -> str:
+        default = "read" if request.method in ("GET", "HEAD", "OPTIONS") else "write"
+
+        scope = getattr(view, "throttle_scope", None)
+        if isinstance(scope, dict):
+            scope = scope.get(request.method)
+        if scope and scope in settings.API_THROTTLE_RATES:
+            return scope
+        return default
+
+    def get_rate(self, scope: str, role: str) -> Rate | None:
+        rates = settings.API_THROTTLE_RATES.get(scope, {})
+        rate = rates.get(role, rates.get("default"))
+        return parse_rate(rate) if rate else None
+
+    def allow_request(self, request, view):
+        if not settings.API_THROTTLE_ENABLED:
+            return True
+
+        user = request.user
+        if user and user.is_authenticated:
+            role, ident = user.role, user.pk
+        else:
+            role, ident = "anon", self.get_ident(request)
+
+        scope = self.get_scope(request, view)
+        rate = self.get_rate(scope, role)
+        if rate is None:
+            return True
+
+        get_cost = getattr(view, "get_throttle_cost", None)
+        cost = max(int(get_cost(request)), 1) if get_cost is not None else 1
+
+        try:
+            allowed, tokens = token_bucket_consume(
+                key=f"throttle:{scope}:{role}:{ident}", rate=rate, cost=cost
+            )
+        except Exception as e:
+            logger.warning("Throttle check failed, allowing request: %s", e)
+            return True
+
+        # Seconds until another request of this cost is admitted.
+        self.wait_seconds = 0 if allowed else (min(cost, rate.capacity) - tokens) / rate.refill
+
+        getattr(request, "_request", request).ratelimit = {
+            "limit": int(rate.capacity),
+            "remaining": max(int(tokens), 0),
+            "reset": math.ceil((rate.capacity - tokens) / rate.refill),
+        }
+        return allowed
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class RateLimitHeadersMiddleware:
+    """Adds RateLimit-Limit/-Remaining/-Reset headers for throttled endpoints."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.add_headers(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.add_headers(request, await self.get_response(request))
+
+    @staticmethod
+    def add_headers(request, response):
+        ratelimit = getattr(request, "ratelimit", None)
+        if ratelimit is not None:
+            response["RateLimit-Limit"] = ratelimit["limit"]
+            response["RateLimit-Remaining"] = ratelimit["remaining"]
+            response["RateLimit-Reset"] = ratelimit["reset"]
+        return response
@@ -0,0 +1,44 @@
+from rest_framework import serializers, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from drf_spectacular.utils import extend_schema
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apichallenge.api.mixins import ApiAuthMixin
+from apichallenge.authentication.revocation import revoke_token
+
+
+class TokenRevokeApi(ApiAuthMixin, APIView):
+    """
+    Log out: revoke the access token of this request and, if given, a
+    refresh token of the same user, effective immediately in every process.
+    """
+
+    class InputSerializer(serializers.Serializer):
+        refresh = serializers.CharField(required=False)
+
+        def validate_refresh(self, refresh):
+            try:
+                token = RefreshToken(refresh)
+            except TokenError as e:
+                raise serializers.ValidationError(str(e))
+
+            user = self.context["request"].user
+            if str(token.get(api_settings.USER_ID_CLAIM)) != str(user.pk):
+                raise serializers.ValidationError("Token does not belong to the current user.")
+            return token
+
+    @extend_schema(request=InputSerializer, responses={204: None})
+    def post(self, request):
+        serializer = self.InputSerializer(data=request.data, context={"request": request})
+        serializer.is_valid(raise_exception=True)
+
+        revoke_token(request.auth)
+        refresh = serializer.validated_data.get("refresh")
+        if refresh is not None:
+            revoke_token(refresh)
+
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class AuthenticationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apichallenge.authentication'
+
+    def ready(self):
+        from apichallenge.authentication import signals  # noqa: F401
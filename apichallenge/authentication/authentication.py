@@ -0,0 +1,95 @@
+import copy
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from apichallenge.authentication.revocation import is_token_revoked
+
+# Tier 1: per-process, very short TTL, no network round trip.
+# Keyed by str(user id): the token claim is a string, model pks are ints.
+_local_users: dict[str, tuple[float, object]] = {}
+_local_users_lock = threading.Lock()
+LOCAL_CACHE_MAX_SIZE = 10_000
+
+
+def _user_cache_key(user_id) -> str:
+    return f"auth:user:{user_id}"
+
+
+def invalidate_user_auth_cache(user_id) -> None:
+    """
+    Drop a user from the authentication caches after a change to its role,
+    active flag or password. The shared tier is cleared immediately; other
+    processes' local tier expires within AUTH_USER_LOCAL_CACHE_TTL.
+    """
+    cache.delete(_user_cache_key(user_id))
+    with _local_users_lock:
+        _local_users.pop(str(user_id), None)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that resolves the token's user from a two-tier cache
+    (in-process, then Django's cache) instead of querying Postgres on every
+    request. Only the database row decides `is_active` and `role`; the
+    token's `role` claim is informational, for clients.
+
+    Revoked tokens are rejected; see apichallenge.authentication.revocation.
+    """
+
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+        if is_token_revoked(validated_token):
+            raise InvalidToken(_("Token has been revoked"))
+        return validated_token
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        user_id = str(user_id)
+        user = self._get_cached_user(user_id)
+        if user is None:
+            user = super().get_user(validated_token)
+            self._set_cached_user(user_id, user)
+            return user
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        return user
+
+    @staticmethod
+    def _get_cached_user(user_id):
+        now = time.monotonic()
+        entry = _local_users.get(user_id)
+        if entry is not None and entry[0] > now:
+            # Copy, so per-request changes to request.user never leak across requests.
+            return copy.copy(entry[1])
+
+        user = cache.get(_user_cache_key(user_id))
+        if user is not None:
+            CachedJWTAuthentication._set_local_user(user_id, user, now)
+        return user
+
+    @staticmethod
+    def _set_cached_user(user_id, user) -> None:
+        cache.set(_user_cache_key(user_id), user, settings.AUTH_USER_CACHE_TTL)
+        CachedJWTAuthentication._set_local_user(user_id, user, time.monotonic())
+
+    @staticmethod
+    def _set_local_user(user_id, user, now: float) -> None:
+        with _local_users_lock:
+            if len(_local_users) >= LOCAL_CACHE_MAX_SIZE:
+                _local_users.clear()
+            _local_users[user_id] = (now + settings.AUTH_USER_LOCAL_CACHE_TTL, copy.copy(user))
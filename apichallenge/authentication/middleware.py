@@ -0,0 +1,52 @@
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from django.contrib.auth.models import AnonymousUser
+
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from apichallenge.authentication.authentication import CachedJWTAuthentication
+
+# Browsers cannot set headers on a WebSocket handshake, so the access token
+# travels either as `?token=<jwt>` or as the subprotocol pair
+# `Sec-WebSocket-Protocol: access_token, <jwt>`.
+TOKEN_QUERY_PARAM = "token"
+TOKEN_SUBPROTOCOL = "access_token"
+
+
+def get_websocket_token(scope) -> tuple[str | None, str | None]:
+    """Return (raw token, subprotocol to echo back on accept)."""
+    query = parse_qs(scope.get("query_string", b"").decode())
+    if query.get(TOKEN_QUERY_PARAM):
+        return query[TOKEN_QUERY_PARAM][0], None
+
+    subprotocols = scope.get("subprotocols") or []
+    if len(subprotocols) >= 2 and subprotocols[0] == TOKEN_SUBPROTOCOL:
+        return subprotocols[1], TOKEN_SUBPROTOCOL
+
+    return None, None
+
+
+@database_sync_to_async
+def get_user_from_token(raw_token: str):
+    authentication = CachedJWTAuthentication()
+    try:
+        validated_token = authentication.get_validated_token(raw_token)
+        return authentication.get_user(validated_token)
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        return AnonymousUser()
+
+
+class JWTAuthMiddleware(BaseMiddleware):
+    """Populate scope["user"] for WebSocket connections from a JWT access token."""
+
+    async def __call__(self, scope, receive, send):
+        raw_token, subprotocol = get_websocket_token(scope)
+
+        scope = dict(scope)
+        scope["user"] = await get_user_from_token(raw_token) if raw_token else AnonymousUser()
+        scope["auth_subprotocol"] = subprotocol
+
+        return await super().__call__(scope, receive, send)
@@ -0,0 +1,180 @@
+import hashlib
+import logging
+import math
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from rest_framework_simplejwt.settings import api_settings
+
+logger = logging.getLogger(__name__)
+
+REVOKED_KEY_PREFIX = "auth:revoked:"
+# Revoked JTIs scored by token expiry, to seed the filters from (raw Redis key)
+REVOKED_SET_KEY = "auth:revoked"
+REVOCATION_CHANNEL = "auth:revocations"
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter: constant-time membership tests with no false
+    negatives and a false positive rate of about `error_rate` at `capacity`.
+    """
+
+    def __init__(self, *, capacity: int, error_rate: float):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+def _get_redis():
+    from django_redis import get_redis_connection
+
+    return get_redis_connection("default")
+
+
+class RevocationFilter:
+    """
+    Per-process view of the revoked JTIs.
+
+    Revocations are stored in the cache (the source of truth, expiring with
+    the token), indexed in a Redis sorted set and announced on a Redis
+    pub/sub channel. A background thread in every process feeds them into a
+    local Bloom filter, so the request path only costs a cache round trip
+    for the rare positive. The filter is re-seeded from the sorted set on
+    (re)subscribe and rebuilt periodically, which also forgets JTIs of
+    tokens that have expired. Until it is seeded, and while the listener is
+    disconnected, every token is checked against the cache.
+    """
+
+    def __init__(self):
+        self._filter = self._new_filter()
+        self._seeded = False
+        self._thread: threading.Thread | None = None
+        self._pid: int | None = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _new_filter() -> BloomFilter:
+        return BloomFilter(
+            capacity=settings.AUTH_REVOCATION_FILTER_CAPACITY,
+            error_rate=settings.AUTH_REVOCATION_FILTER_ERROR_RATE,
+        )
+
+    def add(self, jti: str) -> None:
+        self._filter.add(jti)
+
+    @property
+    def is_seeded(self) -> bool:
+        """Whether the filter holds every revocation (always, without pub/sub)."""
+        return self._seeded or not settings.AUTH_REVOCATION_PUBSUB_ENABLED
+
+    def might_contain(self, jti: str) -> bool:
+        self._ensure_listener()
+        return not self.is_seeded or jti in self._filter
+
+    def _ensure_listener(self) -> None:
+        if not settings.AUTH_REVOCATION_PUBSUB_ENABLED:
+            return
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            # A forked process misses the revocations its parent's listener receives from now on
+            self._seeded = False
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._listen, name="token-revocation-listener", daemon=True
+            )
+            self._thread.start()
+
+    def _seed(self) -> None:
+        """Replace the filter with one built from the revocations of unexpired tokens."""
+        redis = _get_redis()
+        now = time.time()
+        redis.zremrangebyscore(REVOKED_SET_KEY, "-inf", now)
+        seeded = self._new_filter()
+        for jti in redis.zrangebyscore(REVOKED_SET_KEY, now, "+inf"):
+            seeded.add(jti.decode() if isinstance(jti, bytes) else jti)
+        self._filter = seeded
+        self._seeded = True
+
+    def _listen(self) -> None:
+        while True:
+            try:
+                pubsub = _get_redis().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(REVOCATION_CHANNEL)
+                # Seed after subscribing, so no revocation falls in between.
+                self._seed()
+                seeded_at = time.monotonic()
+
+                while True:
+                    message = pubsub.get_message(timeout=1.0)
+                    if message is not None:
+                        data = message["data"]
+                        self.add(data.decode() if isinstance(data, bytes) else data)
+                    if time.monotonic() - seeded_at > settings.AUTH_REVOCATION_FILTER_REBUILD_INTERVAL:
+                        self._seed()
+                        seeded_at = time.monotonic()
+            except Exception as e:
+                # Revocations published meanwhile are missed: check the cache until re-seeded
+                self._seeded = False
+                logger.warning("Token revocation listener failed, retrying: %s", e)
+                time.sleep(1)
+
+
+revocation_filter = RevocationFilter()
+
+
+def _revoked_key(jti: str) -> str:
+    return f"{REVOKED_KEY_PREFIX}{jti}"
+
+
+def revoke_token(token) -> None:
+    """
+    Revoke a validated token until it expires, in every process. Raises if
+    the revocation can't be announced to the other processes, whose filters
+    would let the token through; it is then undone, so the client can retry.
+    """
+    jti = token[api_settings.JTI_CLAIM]
+    ttl = max(int(token["exp"] - time.time()), 1)
+
+    cache.set(_revoked_key(jti), 1, ttl)
+
+    if settings.AUTH_REVOCATION_PUBSUB_ENABLED:
+        try:
+            pipe = _get_redis().pipeline()
+            pipe.zadd(REVOKED_SET_KEY, {jti: token["exp"]})
+            pipe.publish(REVOCATION_CHANNEL, jti)
+            pipe.execute()
+        except Exception:
+            cache.delete(_revoked_key(jti))
+            raise
+
+    revocation_filter.add(jti)
+
+
+def is_token_revoked(token) -> bool:
+    """Constant-time filter check; confirmed against the cache only on a hit."""
+    jti = token.get(api_settings.JTI_CLAIM)
+    if jti is None or not revocation_filter.might_contain(jti):
+        return False
+    return cache.get(_revoked_key(jti)) is not None
@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apichallenge.authentication.authentication import invalidate_user_auth_cache
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Role changes, deactivations and deletions must not be served from cache."""
+    invalidate_user_auth_cache(instance.pk)
+    # Again after commit, in case a concurrent request re-cached the old row.
+    transaction.on_commit(lambda: invalidate_user_auth_cache(instance.pk))
@@ -0,0 +1,57 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient, APIRequestFactory
+
+from apichallenge.authentication.authentication import CachedJWTAuthentication, _local_users
+from apichallenge.authentication.tokens import RoleRefreshToken
+from apichallenge.users.models import BaseUser, Role
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    """Test the cached JWT user lookup and its invalidation."""
+
+    def setUp(self):
+        cache.clear()
+        _local_users.clear()
+        self.user = BaseUser.objects.create_user(
+            username="cached_user", password="Cached@12345", role=Role.VIEWER
+        )
+        self.token = RoleRefreshToken.for_user(self.user).access_token
+
+    def _authenticate(self):
+        request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {self.token}")
+        return CachedJWTAuthentication().authenticate(request)[0]
+
+    def test_role_claim(self):
+        self.assertEqual(self.token["role"], Role.VIEWER)
+
+    def test_second_lookup_hits_cache(self):
+        self._authenticate()
+        with self.assertNumQueries(0):
+            user = self._authenticate()
+        self.assertEqual(user.pk, self.user.pk)
+
+    def test_role_change_invalidates_cache(self):
+        self._authenticate()
+        admin = BaseUser.objects.create_user(
+            username="cached_admin", password="Admin@12345", role=Role.ADMIN
+        )
+        client = APIClient()
+        client.force_authenticate(user=admin)
+        client.patch(f"/api/documents/admin/users/{self.user.id}/role/", {"role": Role.EDITOR})
+
+        self.assertEqual(self._authenticate().role, Role.EDITOR)
+
+    def test_deactivated_user_rejected(self):
+        self._authenticate()
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self._authenticate()
+
+    def test_login_returns_role_claim(self):
+        resp = APIClient().post(
+            "/api/auth/jwt/login/", {"username": "cached_user", "password": "Cached@12345"}
+        )
+        self.assertEqual(RoleRefreshToken(resp.data["refresh"])["role"], Role.VIEWER)
@@ -0,0 +1,121 @@
+import time
+from unittest import mock
+
+import fakeredis
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apichallenge.authentication.revocation import (
+    REVOKED_SET_KEY,
+    BloomFilter,
+    RevocationFilter,
+    is_token_revoked,
+)
+from apichallenge.authentication.tokens import RoleRefreshToken
+from apichallenge.users.models import BaseUser, Role
+
+
+class BloomFilterTests(TestCase):
+    def test_no_false_negatives(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        items = [f"jti-{i}" for i in range(1000)]
+        for item in items:
+            bloom.add(item)
+        self.assertTrue(all(item in bloom for item in items))
+
+    def test_false_positive_rate(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f"jti-{i}")
+        false_positives = sum(f"other-{i}" in bloom for i in range(10_000))
+        self.assertLess(false_positives, 300)
+
+
+@override_settings(AUTH_REVOCATION_PUBSUB_ENABLED=True)
+class RevocationFilterSeedingTests(TestCase):
+    def setUp(self):
+        self.redis = fakeredis.FakeRedis()
+        patcher = mock.patch("apichallenge.authentication.revocation._get_redis", return_value=self.redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # No listener thread: seeding is driven by the test
+        patcher = mock.patch.object(RevocationFilter, "_ensure_listener")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_unseeded_filter_defers_to_the_cache(self):
+        revocations = RevocationFilter()
+
+        self.assertFalse(revocations.is_seeded)
+        self.assertTrue(revocations.might_contain("any-jti"))
+
+    def test_seeds_from_unexpired_revocations(self):
+        now = time.time()
+        self.redis.zadd(REVOKED_SET_KEY, {"live": now + 60, "expired": now - 60})
+        revocations = RevocationFilter()
+
+        revocations._seed()
+
+        self.assertTrue(revocations.is_seeded)
+        self.assertTrue(revocations.might_contain("live"))
+        self.assertFalse(revocations.might_contain("other"))
+        self.assertEqual(self.redis.zrange(REVOKED_SET_KEY, 0, -1), [b"live"])
+
+
+class TokenRevocationTests(TestCase):
+    """Test revoking tokens through the API and rejecting them afterwards."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = BaseUser.objects.create_user(
+            username="revoke_user", password="Revoke@12345", role=Role.VIEWER
+        )
+        self.refresh = RoleRefreshToken.for_user(self.user)
+        self.access = str(self.refresh.access_token)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.access}")
+
+    def test_unrevoked_token_skips_cache(self):
+        with mock.patch.object(cache, "get") as cache_get:
+            self.assertFalse(is_token_revoked(self.refresh.access_token))
+        cache_get.assert_not_called()
+
+    def test_revoke_rejects_access_and_refresh(self):
+        resp = self.client.post("/api/auth/jwt/revoke/", {"refresh": str(self.refresh)})
+        self.assertEqual(resp.status_code, 204)
+
+        resp = self.client.get("/api/documents/")
+        self.assertEqual(resp.status_code, 401)
+
+        resp = APIClient().post("/api/auth/jwt/refresh/", {"refresh": str(self.refresh)})
+        self.assertEqual(resp.status_code, 401)
+
+    def test_other_tokens_stay_valid(self):
+        other_access = str(RoleRefreshToken.for_user(self.user).access_token)
+        self.client.post("/api/auth/jwt/revoke/")
+
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {other_access}")
+        self.assertEqual(client.get("/api/documents/").status_code, 200)
+
+    @override_settings(AUTH_REVOCATION_PUBSUB_ENABLED=True)
+    @mock.patch.object(RevocationFilter, "_ensure_listener")
+    def test_failed_announcement_fails_the_revocation(self, _):
+        with mock.patch(
+            "apichallenge.authentication.revocation._get_redis", side_effect=ConnectionError("down")
+        ):
+            with self.assertRaises(ConnectionError):
+                self.client.post("/api/auth/jwt/revoke/")
+
+        # Not revoked anywhere, so the client can retry
+        self.assertEqual(self.client.get("/api/documents/").status_code, 200)
+
+    def test_cannot_revoke_foreign_refresh_token(self):
+        other = BaseUser.objects.create_user(
+            username="revoke_other", password="Revoke@12345", role=Role.VIEWER
+        )
+        resp = self.client.post(
+            "/api/auth/jwt/revoke/", {"refresh": str(RoleRefreshToken.for_user(other))}
+        )
+        self.assertEqual(resp.status_code, 400)
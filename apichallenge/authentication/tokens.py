@@ -0,0 +1,30 @@
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apichallenge.authentication.revocation import is_token_revoked
+
+
+class RoleRefreshToken(RefreshToken):
+    """Refresh token (and derived access tokens) carrying the user's `role` claim."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token["role"] = user.role
+        return token
+
+
+class RoleTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = RoleRefreshToken
+
+
+class RevocationAwareTokenRefreshSerializer(TokenRefreshSerializer):
+    """Refuses to mint access tokens from a revoked refresh token."""
+
+    def validate(self, attrs):
+        if is_token_revoked(self.token_class(attrs["refresh"])):
+            raise InvalidToken(_("Token has been revoked"))
+        return super().validate(attrs)
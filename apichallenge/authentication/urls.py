@@ -1,10 +1,13 @@
 from django.urls import path, include
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView, TokenVerifyView
 
+from .apis import TokenRevokeApi
+
 urlpatterns = [
         path('jwt/', include(([
             path('login/', TokenObtainPairView.as_view(),name="login"),
             path('refresh/', TokenRefreshView.as_view(),name="refresh"),
             path('verify/', TokenVerifyView.as_view(),name="verify"),
+            path('revoke/', TokenRevokeApi.as_view(),name="revoke"),
             ])), name="jwt"),
 ]
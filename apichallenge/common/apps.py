@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class CommonConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apichallenge.common'
+
+    def ready(self):
+        from apichallenge.common import db_metrics  # noqa: F401 (connects its signal receiver)
+        from apichallenge.common import metrics  # noqa: F401 (connects its signal receivers)
@@ -0,0 +1,50 @@
+import asyncio
+import weakref
+
+from django.conf import settings
+from django.core.cache import cache
+
+# One asyncio Redis client per event loop: connections cannot be shared across loops.
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, object]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _uses_django_redis() -> bool:
+    return hasattr(cache, "client") and hasattr(cache.client, "get_client")
+
+
+def _get_async_client():
+    import redis.asyncio as aioredis
+
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        location = settings.CACHES["default"]["LOCATION"]
+        if isinstance(location, (list, tuple)):
+            location = location[0]
+        client = aioredis.Redis.from_url(location)
+        _async_clients[loop] = client
+    return client
+
+
+async def acache_get(key: str):
+    """
+    Async counterpart of cache.get(). With django-redis it talks to Redis
+    through redis.asyncio, reading the same keys and encoding as the sync
+    cache, so sync and async code paths share entries.
+    """
+    if not _uses_django_redis():
+        return await cache.aget(key)
+
+    raw = await _get_async_client().get(cache.client.make_key(key))
+    return None if raw is None else cache.client.decode(raw)
+
+
+async def acache_set(key: str, value, timeout: int) -> None:
+    """Async counterpart of cache.set()."""
+    if not _uses_django_redis():
+        await cache.aset(key, value, timeout)
+        return
+
+    await _get_async_client().set(cache.client.make_key(key), cache.client.encode(value), ex=timeout)
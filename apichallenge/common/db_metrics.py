@@ -0,0 +1,65 @@
+from collections import Counter
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+# Per process: Django-level connects per alias. With persistent connections
+# these are new server connections; in pool mode, checkouts from the pool.
+_connects: Counter = Counter()
+
+
+@receiver(connection_created)
+def _count_connect(sender, connection, **kwargs):
+    _connects[connection.alias] += 1
+
+
+def _connection_mode(settings_dict: dict) -> str:
+    if settings_dict.get("OPTIONS", {}).get("pool"):
+        return "pool"
+    return "persistent" if settings_dict.get("CONN_MAX_AGE") else "none"
+
+
+def pool_stats(pool) -> dict:
+    """Wait time and saturation of a psycopg_pool.ConnectionPool, from its counters."""
+    # get_stats() leaves out counters that are still zero.
+    stats = pool.get_stats()
+    size = stats.get("pool_size", 0)
+    in_use = size - stats.get("pool_available", 0)
+    max_size = stats.get("pool_max", 0)
+    requests = stats.get("requests_num", 0)
+    wait_ms = stats.get("requests_wait_ms", 0)
+    return {
+        "size": size,
+        "max_size": max_size,
+        "in_use": in_use,
+        "waiting": stats.get("requests_waiting", 0),
+        "saturation": round(in_use / max_size, 3) if max_size else 0.0,
+        "requests": requests,
+        "requests_queued": stats.get("requests_queued", 0),
+        "requests_timed_out": stats.get("requests_errors", 0),
+        "wait_ms_total": wait_ms,
+        "wait_ms_avg": round(wait_ms / requests, 3) if requests else 0.0,
+        "connections_opened": stats.get("connections_num", 0),
+        "connections_lost": stats.get("connections_lost", 0),
+    }
+
+
+def database_connection_stats() -> dict[str, dict]:
+    """
+    Connection reuse of this process, per database alias: the mode, the
+    connect count and, for pooled aliases, pool wait time and saturation.
+    Each worker process has its own connections, so these are per worker.
+    """
+    stats = {}
+    for alias in connections:
+        entry = {
+            "mode": _connection_mode(connections.settings[alias]),
+            "connects": _connects[alias],
+        }
+        # The pools live on the backend class; don't create one just to report on it.
+        pools = getattr(type(connections[alias]), "_connection_pools", {})
+        if alias in pools:
+            entry["pool"] = pool_stats(pools[alias])
+        stats[alias] = entry
+    return stats
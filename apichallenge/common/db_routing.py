@@ -0,0 +1,129 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# The replica the current request reads from, or None for the primary. Set
+# per request by read-only views; contextvars follow sync_to_async. Chosen
+# once, so that all of a request's reads (a count and its page, a list and
+# a detail) see the same replication lag.
+_read_replica: ContextVar[str | None] = ContextVar("read_replica", default=None)
+
+
+def _choose_replica(enabled: bool) -> str | None:
+    return random.choice(settings.DATABASE_REPLICAS) if enabled and settings.DATABASE_REPLICAS else None
+
+
+@contextmanager
+def replica_reads(enabled: bool = True):
+    """Route the reads in this block to a replica (or, with False, to the primary)."""
+    token = _read_replica.set(_choose_replica(enabled))
+    try:
+        yield
+    finally:
+        _read_replica.reset(token)
+
+
+def use_primary():
+    """Read from the primary inside this block, e.g. to fill a long-lived cache entry."""
+    return replica_reads(False)
+
+
+def enable_replica_reads() -> None:
+    """Switch the rest of the current replica_reads() block to a replica."""
+    _read_replica.set(_choose_replica(True))
+
+
+def _pin_key(user_id) -> str:
+    return f"db:pin:{user_id}"
+
+
+def pin_to_primary(user_id) -> None:
+    """Send this user's reads to the primary while replicas may not have their write yet."""
+    cache.set(_pin_key(user_id), 1, settings.DATABASE_REPLICA_PIN_SECONDS)
+
+
+def is_pinned_to_primary(user_id) -> bool:
+    return cache.get(_pin_key(user_id)) is not None
+
+
+def replica_reads_allowed(request) -> bool:
+    """Whether an authenticated request may read from a replica."""
+    if not settings.DATABASE_REPLICAS or request.method not in SAFE_METHODS:
+        return False
+    user = request.user
+    return not (user and user.is_authenticated and is_pinned_to_primary(user.pk))
+
+
+class PrimaryReplicaRouter:
+    """
+    Writes, migrations and, by default, reads go to the primary ("default").
+    Inside replica_reads() — enabled by read-only views — reads go to the
+    replica picked at random from settings.DATABASE_REPLICAS for the block.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_replica.get()
+
+    def db_for_write(self, model, **hints):
+        # Explicit, so that objects loaded from a replica are saved to the primary.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
+
+
+class PrimaryPinningMiddleware:
+    """
+    After a successful write request, pins its user to the primary for
+    DATABASE_REPLICA_PIN_SECONDS, so they read their own writes despite
+    replication lag.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        response = self.get_response(request)
+        if self.should_pin(request, response):
+            self.pin(request)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if self.should_pin(request, response):
+            await sync_to_async(self.pin)(request)
+        return response
+
+    @staticmethod
+    def should_pin(request, response) -> bool:
+        return (
+            bool(settings.DATABASE_REPLICAS)
+            and request.method not in SAFE_METHODS
+            and response.status_code < 400
+        )
+
+    @staticmethod
+    def pin(request) -> None:
+        # DRF views set the token's user on the underlying request.
+        user = getattr(request, "user", None)
+        if user is not None and user.is_authenticated:
+            pin_to_primary(user.pk)
@@ -0,0 +1,276 @@
+import os
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from celery.signals import after_task_publish, before_task_publish, worker_init
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    start_http_server,
+)
+from prometheus_client import multiprocess
+
+# With PROMETHEUS_MULTIPROC_DIR set (by the docker entrypoints, before
+# startup), every worker process writes its samples to files in that
+# directory and /metrics aggregates them, whichever worker serves it.
+# Celery workers serve the same on METRICS_WORKER_PORT.
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time spent handling a request, by view.",
+    ["view", "method", "status"],
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "SQL queries run by a request, by view.",
+    ["view"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89),
+)
+REQUEST_DB_DURATION = Histogram(
+    "http_request_db_duration_seconds",
+    "Time a request spent in SQL queries, by view.",
+    ["view"],
+)
+CACHE_LOOKUPS = Counter(
+    "documents_cache_lookups_total",
+    "Document cache lookups, by cache (list, detail) and result (hit, miss).",
+    ["cache", "result"],
+)
+STORAGE_REQUESTS = Counter(
+    "storage_requests_total",
+    "Object storage (S3 / MinIO) API calls, by operation and HTTP status.",
+    ["operation", "status"],
+)
+STORAGE_DURATION = Histogram(
+    "storage_request_duration_seconds",
+    "Object storage API call latency, by operation.",
+    ["operation"],
+)
+STORAGE_BYTES = Counter(
+    "storage_bytes_total",
+    "Object bytes sent to or received from object storage, by operation.",
+    ["operation", "direction"],
+)
+CELERY_PUBLISH_DURATION = Histogram(
+    "celery_task_publish_duration_seconds",
+    "Time spent publishing a task to the broker, by task.",
+    ["task"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+# WebSocket connections of the ASGI workers (apichallenge.documents.consumers).
+# Gauges add up the live workers; a crashed worker's last values stay until
+# the container restarts, as Uvicorn has no hook to mark it dead.
+WS_CONNECTIONS = Gauge(
+    "ws_connections",
+    "Open WebSocket connections.",
+    multiprocess_mode="livesum",
+)
+WS_QUEUED_FRAMES = Gauge(
+    "ws_queued_frames",
+    "Frames queued for WebSocket clients and not sent yet.",
+    multiprocess_mode="livesum",
+)
+WS_DROPPED_FRAMES = Counter(
+    "ws_dropped_frames_total",
+    "Frames dropped or coalesced because a WebSocket client's send queue was full.",
+)
+WS_SLOW_CONSUMER_DISCONNECTS = Counter(
+    "ws_slow_consumer_disconnects_total",
+    "WebSocket connections closed for not keeping up with their events.",
+)
+
+
+class _QueryStats:
+    __slots__ = ("count", "seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+
+# Set per request; contextvars follow sync_to_async, so the queries an async
+# view runs in worker threads are counted too.
+_request_queries: ContextVar[_QueryStats | None] = ContextVar("request_queries", default=None)
+
+
+def _record_query(execute, sql, params, many, context):
+    stats = _request_queries.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.count += 1
+        stats.seconds += time.perf_counter() - start
+
+
+@receiver(connection_created)
+def _instrument_connection(sender, connection, **kwargs):
+    # Fired on every (re)connect of the same wrapper: install once.
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def record_cache_lookup(*, cache: str, hit: bool) -> None:
+    CACHE_LOOKUPS.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+
+def _view_name(request) -> str:
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unmatched"
+    return match.view_name or match._func_path
+
+
+class RequestMetricsMiddleware:
+    """Records the latency, SQL query count and SQL time of each request, labelled by view."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        stats, token, start = self._start()
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_queries.reset(token)
+        self._observe(request, response, stats, start)
+        return response
+
+    async def __acall__(self, request):
+        stats, token, start = self._start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_queries.reset(token)
+        self._observe(request, response, stats, start)
+        return response
+
+    @staticmethod
+    def _start():
+        stats = _QueryStats()
+        return stats, _request_queries.set(stats), time.perf_counter()
+
+    @staticmethod
+    def _observe(request, response, stats: _QueryStats, start: float) -> None:
+        view = _view_name(request)
+        REQUEST_DURATION.labels(
+            view=view, method=request.method, status=str(response.status_code)
+        ).observe(time.perf_counter() - start)
+        REQUEST_DB_QUERIES.labels(view=view).observe(stats.count)
+        REQUEST_DB_DURATION.labels(view=view).observe(stats.seconds)
+
+
+# Object storage: botocore client events, for the sync (boto3) and async
+# (aiobotocore) S3 clients alike.
+
+def _body_size(body) -> int:
+    if not body:
+        return 0
+    if isinstance(body, (bytes, bytearray)):
+        return len(body)
+    # botocore hands uploads over as seekable streams (BytesIO, the storage's
+    # file, s3transfer's part chunks): measure what is left to send.
+    try:
+        position = body.tell()
+        body.seek(0, os.SEEK_END)
+        end = body.tell()
+        body.seek(position)
+    except (AttributeError, OSError, ValueError):
+        return 0
+    return end - position
+
+
+def _storage_before_call(model, params, context, **kwargs):
+    context["metrics_start"] = time.perf_counter()
+    sent = _body_size(params.get("body"))
+    if sent:
+        STORAGE_BYTES.labels(operation=model.name, direction="sent").inc(sent)
+
+
+def _storage_after_call(model, http_response, parsed, context, **kwargs):
+    start = context.pop("metrics_start", None)
+    if start is not None:
+        STORAGE_DURATION.labels(operation=model.name).observe(time.perf_counter() - start)
+    STORAGE_REQUESTS.labels(operation=model.name, status=str(http_response.status_code)).inc()
+    if model.name == "GetObject" and parsed.get("ContentLength"):
+        STORAGE_BYTES.labels(operation=model.name, direction="received").inc(parsed["ContentLength"])
+
+
+def _storage_after_call_error(event_name, context, **kwargs):
+    # Emitted without the operation model: "after-call-error.s3.<Operation>".
+    operation = event_name.rsplit(".", 1)[-1]
+    start = context.pop("metrics_start", None)
+    if start is not None:
+        STORAGE_DURATION.labels(operation=operation).observe(time.perf_counter() - start)
+    STORAGE_REQUESTS.labels(operation=operation, status="error").inc()
+
+
+def instrument_s3_client(client) -> None:
+    """Record the calls of a boto3 / aiobotocore S3 client. Idempotent."""
+    if getattr(client, "_metrics_instrumented", False):
+        return
+    events = client.meta.events
+    # First: a handler that answers the call itself (a stub) would skip later ones.
+    events.register_first("before-call.s3", _storage_before_call)
+    events.register("after-call.s3", _storage_after_call)
+    events.register("after-call-error.s3", _storage_after_call_error)
+    client._metrics_instrumented = True
+
+
+# Celery: publish time, from just before serialization until the broker took
+# it. Both signals fire in the publishing thread, around the send.
+_publish_started: ContextVar[float | None] = ContextVar("publish_started", default=None)
+
+
+@before_task_publish.connect
+def _task_publish_started(sender=None, **kwargs):
+    _publish_started.set(time.perf_counter())
+
+
+@after_task_publish.connect
+def _task_published(sender=None, **kwargs):
+    start = _publish_started.get()
+    if start is not None:
+        _publish_started.set(None)
+        CELERY_PUBLISH_DURATION.labels(task=sender).observe(time.perf_counter() - start)
+
+
+def _registry() -> CollectorRegistry:
+    if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+@worker_init.connect
+def _start_worker_metrics_server(sender=None, **kwargs):
+    # In the worker's main process, before the pool starts: prefork children
+    # write to PROMETHEUS_MULTIPROC_DIR and are served from here.
+    if settings.METRICS_WORKER_PORT:
+        start_http_server(settings.METRICS_WORKER_PORT, registry=_registry())
+
+
+def metrics_view(request):
+    """Prometheus exposition of every metric above, across all worker processes."""
+    return HttpResponse(generate_latest(_registry()), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,474 @@
+import hashlib
+import hmac
+import io
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from types import SimpleNamespace
+from datetime import datetime, timezone as dt_timezone
+from urllib.parse import parse_qs, quote, unquote, urlencode, urlsplit
+
+from botocore.exceptions import ClientError, OperationNotPageableError
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import Storage
+from django.utils.deconstruct import deconstructible
+from storages.backends.s3boto3 import S3Boto3Storage
+
+from apichallenge.common.metrics import instrument_s3_client
+
+# S3 limits the app depends on
+LIST_MAX_KEYS = 1000
+MULTIPART_MIN_PART_SIZE = 5 * 1024 * 1024
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _error(code: str, message: str, operation: str, status: int = 400) -> ClientError:
+    return ClientError(
+        {"Error": {"Code": code, "Message": message}, "ResponseMetadata": {"HTTPStatusCode": status}},
+        operation,
+    )
+
+
+class _Body(io.BytesIO):
+    """The StreamingBody subset: read(amt), iter_chunks() and close()."""
+
+    def iter_chunks(self, chunk_size: int = 1024):
+        while chunk := self.read(chunk_size):
+            yield chunk
+
+
+class _MemoryObjects:
+    def __init__(self):
+        self._objects: dict[str, tuple[bytes, datetime]] = {}
+
+    def get(self, key: str) -> tuple[bytes, datetime] | None:
+        return self._objects.get(key)
+
+    def put(self, key: str, data: bytes) -> datetime:
+        modified = datetime.now(dt_timezone.utc)
+        self._objects[key] = (data, modified)
+        return modified
+
+    def delete(self, key: str) -> None:
+        self._objects.pop(key, None)
+
+    def clear(self) -> None:
+        self._objects.clear()
+
+    def stat(self, prefix: str) -> list[tuple[str, int, datetime]]:
+        return [
+            (key, len(data), modified)
+            for key, (data, modified) in self._objects.items()
+            if key.startswith(prefix)
+        ]
+
+
+class _DirectoryObjects:
+    """Objects as files under `location`; keys are relative paths."""
+
+    def __init__(self, location: str):
+        self.location = os.path.abspath(location)
+
+    def _path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.location, key))
+        if not path.startswith(self.location + os.sep):
+            raise _error("InvalidArgument", f"Invalid key {key!r}", "PutObject")
+        return path
+
+    def _modified(self, path: str) -> datetime:
+        return datetime.fromtimestamp(os.path.getmtime(path), tz=dt_timezone.utc)
+
+    def get(self, key: str) -> tuple[bytes, datetime] | None:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                return f.read(), self._modified(path)
+        except (FileNotFoundError, IsADirectoryError):
+            return None
+
+    def put(self, key: str, data: bytes) -> datetime:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename, so readers never see a partial object.
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        return self._modified(path)
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def clear(self) -> None:
+        if os.path.isdir(self.location):
+            shutil.rmtree(self.location)
+
+    def stat(self, prefix: str) -> list[tuple[str, int, datetime]]:
+        found = []
+        for root, _, files in os.walk(self.location):
+            for filename in files:
+                if filename.endswith(".tmp"):
+                    continue
+                path = os.path.join(root, filename)
+                key = os.path.relpath(path, self.location).replace(os.sep, "/")
+                if key.startswith(prefix):
+                    found.append((key, os.path.getsize(path), self._modified(path)))
+        return found
+
+
+class LocalS3Client:
+    """
+    The part of the boto3 S3 client API the app uses, on local objects:
+    put/get (with Range)/head/delete, DeleteObjects, list_objects_v2 and
+    its paginator, multipart uploads and presigned URLs. Errors are raised
+    as botocore ClientErrors with S3's codes (NoSuchKey, InvalidRange...).
+    """
+
+    def __init__(self, *, bucket: str, objects, endpoint_url: str, secret: str):
+        self.bucket = bucket
+        self.endpoint_url = endpoint_url.rstrip("/")
+        self._objects = objects
+        self._secret = secret.encode()
+        self._uploads: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        # storage.connection.meta.client is how the app reaches a client.
+        self.meta = SimpleNamespace(client=self)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._objects.clear()
+            self._uploads.clear()
+
+    def _check_bucket(self, bucket: str, operation: str) -> None:
+        if bucket != self.bucket:
+            raise _error("NoSuchBucket", f"The bucket {bucket!r} does not exist", operation, 404)
+
+    def _get(self, bucket: str, key: str, operation: str) -> tuple[bytes, datetime]:
+        self._check_bucket(bucket, operation)
+        with self._lock:
+            found = self._objects.get(key)
+        if found is None:
+            raise _error("NoSuchKey", "The specified key does not exist.", operation, 404)
+        return found
+
+    def put_object(self, *, Bucket: str, Key: str, Body=b"", **kwargs) -> dict:
+        self._check_bucket(Bucket, "PutObject")
+        data = Body.read() if hasattr(Body, "read") else bytes(Body)
+        with self._lock:
+            self._objects.put(Key, data)
+        return {"ETag": f'"{hashlib.md5(data).hexdigest()}"'}
+
+    def get_object(self, *, Bucket: str, Key: str, Range: str | None = None, **kwargs) -> dict:
+        data, modified = self._get(Bucket, Key, "GetObject")
+        size = len(data)
+        response = {"LastModified": modified, "ETag": f'"{hashlib.md5(data).hexdigest()}"'}
+        if Range:
+            start, end = self._parse_range(Range, size)
+            data = data[start:end + 1]
+            response["ContentRange"] = f"bytes {start}-{end}/{size}"
+            response["ResponseMetadata"] = {"HTTPStatusCode": 206}
+        response.update(Body=_Body(data), ContentLength=len(data))
+        return response
+
+    @staticmethod
+    def _parse_range(header: str, size: int) -> tuple[int, int]:
+        match = _RANGE_RE.match(header.strip())
+        if not match or match.groups() == ("", ""):
+            raise _error("InvalidArgument", f"Invalid range {header!r}", "GetObject")
+        first, last = match.groups()
+        if first == "":  # the last `last` bytes
+            start, end = max(size - int(last), 0), size - 1
+        else:
+            start, end = int(first), min(int(last), size - 1) if last else size - 1
+        if start >= size or start > end:
+            raise _error("InvalidRange", "The requested range is not satisfiable", "GetObject", 416)
+        return start, end
+
+    def head_object(self, *, Bucket: str, Key: str, **kwargs) -> dict:
+        data, modified = self._get(Bucket, Key, "HeadObject")
+        return {"ContentLength": len(data), "LastModified": modified}
+
+    def delete_object(self, *, Bucket: str, Key: str, **kwargs) -> dict:
+        self._check_bucket(Bucket, "DeleteObject")
+        with self._lock:
+            self._objects.delete(Key)
+        return {}
+
+    def delete_objects(self, *, Bucket: str, Delete: dict, **kwargs) -> dict:
+        self._check_bucket(Bucket, "DeleteObjects")
+        keys = [obj["Key"] for obj in Delete["Objects"]]
+        if len(keys) > LIST_MAX_KEYS:
+            raise _error("MalformedXML", f"At most {LIST_MAX_KEYS} keys per request", "DeleteObjects")
+        with self._lock:
+            for key in keys:
+                self._objects.delete(key)
+        if Delete.get("Quiet"):
+            return {}
+        return {"Deleted": [{"Key": key} for key in keys]}
+
+    def list_objects_v2(
+        self,
+        *,
+        Bucket: str,
+        Prefix: str = "",
+        MaxKeys: int = LIST_MAX_KEYS,
+        ContinuationToken: str | None = None,
+        StartAfter: str = "",
+        **kwargs,
+    ) -> dict:
+        self._check_bucket(Bucket, "ListObjectsV2")
+        with self._lock:
+            found = sorted(self._objects.stat(Prefix))
+        after = ContinuationToken or StartAfter
+        page_size = min(MaxKeys, LIST_MAX_KEYS)
+        remaining = [entry for entry in found if entry[0] > after]
+        page = remaining[:page_size]
+
+        response = {"KeyCount": len(page), "IsTruncated": len(remaining) > page_size, "Prefix": Prefix}
+        if page:
+            response["Contents"] = [
+                {"Key": key, "Size": size, "LastModified": modified} for key, size, modified in page
+            ]
+        if response["IsTruncated"]:
+            response["NextContinuationToken"] = page[-1][0]
+        return response
+
+    def get_paginator(self, operation: str):
+        if operation != "list_objects_v2":
+            raise OperationNotPageableError(operation_name=operation)
+        return _ListObjectsPaginator(self)
+
+    def create_multipart_upload(self, *, Bucket: str, Key: str, **kwargs) -> dict:
+        self._check_bucket(Bucket, "CreateMultipartUpload")
+        upload_id = uuid.uuid4().hex
+        with self._lock:
+            self._uploads[upload_id] = {"key": Key, "parts": {}}
+        return {"Bucket": Bucket, "Key": Key, "UploadId": upload_id}
+
+    def _upload(self, upload_id: str, key: str, operation: str) -> dict:
+        upload = self._uploads.get(upload_id)
+        if upload is None or upload["key"] != key:
+            raise _error("NoSuchUpload", "The specified upload does not exist.", operation, 404)
+        return upload
+
+    def upload_part(self, *, Bucket: str, Key: str, UploadId: str, PartNumber: int, Body, **kwargs) -> dict:
+        self._check_bucket(Bucket, "UploadPart")
+        data = Body.read() if hasattr(Body, "read") else bytes(Body)
+        etag = f'"{hashlib.md5(data).hexdigest()}"'
+        with self._lock:
+            self._upload(UploadId, Key, "UploadPart")["parts"][PartNumber] = (etag, data)
+        return {"ETag": etag}
+
+    def complete_multipart_upload(
+        self, *, Bucket: str, Key: str, UploadId: str, MultipartUpload: dict, **kwargs
+    ) -> dict:
+        self._check_bucket(Bucket, "CompleteMultipartUpload")
+        with self._lock:
+            stored = self._upload(UploadId, Key, "CompleteMultipartUpload")["parts"]
+            requested = MultipartUpload["Parts"]
+            numbers = [part["PartNumber"] for part in requested]
+            if numbers != sorted(set(numbers)):
+                raise _error("InvalidPartOrder", "Parts must be in ascending order", "CompleteMultipartUpload")
+            chunks = []
+            for index, part in enumerate(requested):
+                etag, data = stored.get(part["PartNumber"], (None, b""))
+                if etag is None or etag != part["ETag"]:
+                    raise _error("InvalidPart", f"Part {part['PartNumber']} not found", "CompleteMultipartUpload")
+                if index < len(requested) - 1 and len(data) < MULTIPART_MIN_PART_SIZE:
+                    raise _error(
+                        "EntityTooSmall", "Parts but the last must be 5 MiB or more", "CompleteMultipartUpload"
+                    )
+                chunks.append(data)
+            data = b"".join(chunks)
+            self._objects.put(Key, data)
+            del self._uploads[UploadId]
+        return {"Bucket": Bucket, "Key": Key, "ETag": f'"{hashlib.md5(data).hexdigest()}-{len(chunks)}"'}
+
+    def abort_multipart_upload(self, *, Bucket: str, Key: str, UploadId: str, **kwargs) -> dict:
+        self._check_bucket(Bucket, "AbortMultipartUpload")
+        with self._lock:
+            self._upload(UploadId, Key, "AbortMultipartUpload")
+            del self._uploads[UploadId]
+        return {}
+
+    def _signature(self, method: str, key: str, expires_at: int) -> str:
+        message = f"{method}\n{self.bucket}/{key}\n{expires_at}".encode()
+        return hmac.new(self._secret, message, hashlib.sha256).hexdigest()
+
+    def generate_presigned_url(self, ClientMethod: str, Params: dict, ExpiresIn: int = 3600, **kwargs) -> str:
+        method = {"get_object": "GET", "put_object": "PUT", "head_object": "HEAD"}[ClientMethod]
+        key = Params["Key"]
+        expires_at = int(time.time()) + ExpiresIn
+        query = urlencode({"X-Amz-Expires": expires_at, "X-Amz-Signature": self._signature(method, key, expires_at)})
+        return f"{self.endpoint_url}/{self.bucket}/{quote(key)}?{query}"
+
+    def verify_presigned_url(self, url: str, *, method: str = "GET") -> str | None:
+        """The key a presigned URL grants `method` on, or None if it is invalid or expired."""
+        parts = urlsplit(url)
+        prefix = f"/{self.bucket}/"
+        query = parse_qs(parts.query)
+        if not parts.path.startswith(prefix) or not {"X-Amz-Expires", "X-Amz-Signature"} <= query.keys():
+            return None
+        key = unquote(parts.path[len(prefix):])
+        expires_at = int(query["X-Amz-Expires"][0])
+        signature = self._signature(method, key, expires_at)
+        if expires_at < time.time() or not hmac.compare_digest(signature, query["X-Amz-Signature"][0]):
+            return None
+        return key
+
+
+class _ListObjectsPaginator:
+    def __init__(self, client: LocalS3Client):
+        self.client = client
+
+    def paginate(self, *, PaginationConfig: dict | None = None, **params):
+        page_size = (PaginationConfig or {}).get("PageSize", LIST_MAX_KEYS)
+        token = None
+        while True:
+            page = self.client.list_objects_v2(MaxKeys=page_size, ContinuationToken=token, **params)
+            yield page
+            if not page["IsTruncated"]:
+                return
+            token = page["NextContinuationToken"]
+
+
+@deconstructible(path="apichallenge.common.storage.LocalS3Storage")
+class LocalS3Storage(Storage):
+    """
+    Stand-in for S3Boto3Storage in tests, benchmarks and local runs: objects
+    live in memory (location=None) or under a local directory, behind a
+    LocalS3Client. It is exposed as `connection.meta.client` with
+    `bucket_name`, as on S3Boto3Storage, so code written against the S3
+    client (listing, batch deletes) runs unchanged. Large files are saved
+    with a multipart upload and url() returns a presigned URL.
+    """
+
+    multipart_threshold = 8 * 1024 * 1024
+    multipart_chunksize = 8 * 1024 * 1024
+
+    def __init__(self, location: str | None = None, bucket_name: str | None = None, **kwargs):
+        self.bucket_name = bucket_name or getattr(settings, "AWS_STORAGE_BUCKET_NAME", "documents")
+        self.location = location
+        self.file_overwrite = getattr(settings, "AWS_S3_FILE_OVERWRITE", True)
+        self.querystring_expire = getattr(settings, "AWS_QUERYSTRING_EXPIRE", 3600)
+        objects = _DirectoryObjects(location) if location else _MemoryObjects()
+        self.connection = LocalS3Client(
+            bucket=self.bucket_name,
+            objects=objects,
+            endpoint_url=getattr(settings, "AWS_S3_ENDPOINT_URL", None) or "http://localhost:9000",
+            secret=getattr(settings, "AWS_SECRET_ACCESS_KEY", None) or settings.SECRET_KEY,
+        )
+
+    @property
+    def client(self) -> LocalS3Client:
+        return self.connection
+
+    def clear(self) -> None:
+        """Delete every object and unfinished multipart upload, e.g. between tests."""
+        self.client.clear()
+
+    @staticmethod
+    def _key(name: str) -> str:
+        return name.replace("\\", "/").lstrip("/")
+
+    def _open(self, name, mode="rb"):
+        if "w" in mode or "a" in mode or "+" in mode:
+            raise ValueError("LocalS3Storage files are read-only; use save().")
+        try:
+            response = self.client.get_object(Bucket=self.bucket_name, Key=self._key(name))
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "NoSuchKey":
+                raise FileNotFoundError(f"File does not exist: {name}") from e
+            raise
+        return ContentFile(response["Body"].read(), name=name)
+
+    def _save(self, name, content):
+        key = self._key(name)
+        if hasattr(content, "seek"):
+            content.seek(0)
+        size = getattr(content, "size", None)
+        if size is not None and size > self.multipart_threshold:
+            self._save_multipart(key, content)
+        else:
+            self.client.put_object(Bucket=self.bucket_name, Key=key, Body=content.read())
+        return name
+
+    def _save_multipart(self, key: str, content) -> None:
+        upload_id = self.client.create_multipart_upload(Bucket=self.bucket_name, Key=key)["UploadId"]
+        try:
+            parts = []
+            while chunk := content.read(self.multipart_chunksize):
+                number = len(parts) + 1
+                response = self.client.upload_part(
+                    Bucket=self.bucket_name, Key=key, UploadId=upload_id, PartNumber=number, Body=chunk
+                )
+                parts.append({"PartNumber": number, "ETag": response["ETag"]})
+            self.client.complete_multipart_upload(
+                Bucket=self.bucket_name, Key=key, UploadId=upload_id, MultipartUpload={"Parts": parts}
+            )
+        except Exception:
+            self.client.abort_multipart_upload(Bucket=self.bucket_name, Key=key, UploadId=upload_id)
+            raise
+
+    def get_available_name(self, name, max_length=None):
+        # As S3Boto3Storage: with AWS_S3_FILE_OVERWRITE a save replaces the object.
+        if self.file_overwrite:
+            return self._key(name)
+        return super().get_available_name(name, max_length)
+
+    def delete(self, name):
+        self.client.delete_object(Bucket=self.bucket_name, Key=self._key(name))
+
+    def exists(self, name):
+        try:
+            self.client.head_object(Bucket=self.bucket_name, Key=self._key(name))
+        except ClientError:
+            return False
+        return True
+
+    def size(self, name):
+        return self.client.head_object(Bucket=self.bucket_name, Key=self._key(name))["ContentLength"]
+
+    def get_modified_time(self, name):
+        return self.client.head_object(Bucket=self.bucket_name, Key=self._key(name))["LastModified"]
+
+    def listdir(self, path):
+        prefix = self._key(path)
+        if prefix and not prefix.endswith("/"):
+            prefix += "/"
+        directories, files = set(), []
+        for page in self.client.get_paginator("list_objects_v2").paginate(Bucket=self.bucket_name, Prefix=prefix):
+            for obj in page.get("Contents", []):
+                rest = obj["Key"][len(prefix):]
+                if "/" in rest:
+                    directories.add(rest.split("/", 1)[0])
+                else:
+                    files.append(rest)
+        return sorted(directories), files
+
+    def url(self, name, parameters=None, expire=None, http_method=None):
+        method = {None: "get_object", "GET": "get_object", "PUT": "put_object", "HEAD": "head_object"}[http_method]
+        return self.client.generate_presigned_url(
+            method,
+            Params={"Bucket": self.bucket_name, "Key": self._key(name), **(parameters or {})},
+            ExpiresIn=expire or self.querystring_expire,
+        )
+
+
+class InstrumentedS3Storage(S3Boto3Storage):
+    """S3Boto3Storage whose API calls are recorded in the storage_* metrics."""
+
+    @property
+    def connection(self):
+        # One connection per thread: instrument each when first used.
+        connection = super().connection
+        instrument_s3_client(connection.meta.client)
+        return connection
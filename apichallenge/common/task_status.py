@@ -0,0 +1,58 @@
+import logging
+
+from celery import Task, states
+from celery.utils import uuid
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "tasks:status:"
+
+# Longest error message kept in a status.
+MAX_ERROR_LENGTH = 500
+
+
+def task_status_set(*, task_id: str, task: str, state: str, result=None, error: str = "") -> None:
+    """Record the state of a task for TASK_STATUS_TTL seconds; a cache failure is only logged."""
+    status = {"task": task, "state": state, "updated_at": timezone.now().isoformat()}
+    if result is not None:
+        status["result"] = result
+    if error:
+        status["error"] = error[:MAX_ERROR_LENGTH]
+    try:
+        cache.set(f"{KEY_PREFIX}{task_id}", status, settings.TASK_STATUS_TTL)
+    except Exception as e:
+        logger.warning("Failed to record the status of task %s: %s", task_id, e)
+
+
+def task_status_get(*, task_id: str) -> dict | None:
+    return cache.get(f"{KEY_PREFIX}{task_id}")
+
+
+class StatusTrackedTask(Task):
+    """
+    Base for tasks whose outcome someone reads: the state (PENDING, STARTED,
+    RETRY, SUCCESS or FAILURE) and the return value or error are kept in the
+    cache rather than in a django_celery_results row. The return value must
+    be small and JSON-serializable.
+    """
+
+    def apply_async(self, args=None, kwargs=None, task_id=None, **options):
+        # Recorded before publishing: an eager run finishes inside apply_async.
+        task_id = task_id or uuid()
+        task_status_set(task_id=task_id, task=self.name, state=states.PENDING)
+        return super().apply_async(args, kwargs, task_id=task_id, **options)
+
+    def before_start(self, task_id, args, kwargs):
+        task_status_set(task_id=task_id, task=self.name, state=states.STARTED)
+
+    def on_retry(self, exc, task_id, args, kwargs, einfo):
+        task_status_set(task_id=task_id, task=self.name, state=states.RETRY, error=repr(exc))
+
+    def on_success(self, retval, task_id, args, kwargs):
+        task_status_set(task_id=task_id, task=self.name, state=states.SUCCESS, result=retval)
+
+    def on_failure(self, exc, task_id, args, kwargs, einfo):
+        task_status_set(task_id=task_id, task=self.name, state=states.FAILURE, error=repr(exc))
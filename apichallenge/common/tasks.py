@@ -0,0 +1,37 @@
+import logging
+from datetime import timedelta
+
+from celery import shared_task
+from django.conf import settings
+from django.utils import timezone
+from django_celery_results.models import TaskResult
+
+from apichallenge.common.task_status import StatusTrackedTask
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(base=StatusTrackedTask)
+def prune_task_results() -> int:
+    """
+    Periodic task to delete django_celery_results rows older than
+    TASK_RESULTS_RETENTION, TASK_RESULTS_PRUNE_BATCH_SIZE rows per DELETE
+    so a large backlog never holds long locks.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.TASK_RESULTS_RETENTION)
+    batch_size = settings.TASK_RESULTS_PRUNE_BATCH_SIZE
+    pruned = 0
+    while True:
+        ids = list(
+            TaskResult.objects.filter(date_done__lt=cutoff).order_by("id").values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        deleted, _ = TaskResult.objects.filter(id__in=ids).delete()
+        pruned += deleted
+        if len(ids) < batch_size:
+            break
+
+    if pruned:
+        logger.info("Pruned %s task results.", pruned)
+    return pruned
@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from apichallenge.documents.models import Document, AuditLog
+from apichallenge.documents.models import Document, AuditLog, OutboxMessage, StorageDeletion
+from apichallenge.documents.services import storage_deletions_cancel
 
 
 @admin.register(Document)
@@ -17,3 +18,22 @@ class AuditLogAdmin(admin.ModelAdmin):
     list_filter = ("action", "timestamp")
     search_fields = ("document_title", "details")
     readonly_fields = ("timestamp",)
+
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = ("id", "topic", "attempts", "available_at", "created_at")
+    list_filter = ("topic",)
+    readonly_fields = ("created_at",)
+
+
+@admin.register(StorageDeletion)
+class StorageDeletionAdmin(admin.ModelAdmin):
+    list_display = ("id", "key", "document_id", "purge_after", "attempts")
+    search_fields = ("key", "document_id")
+    actions = ("cancel_deletion",)
+
+    @admin.action(description="Cancel deletion (keep the objects in storage)")
+    def cancel_deletion(self, request, queryset):
+        cancelled = storage_deletions_cancel(keys=list(queryset.values_list("key", flat=True)))
+        self.message_user(request, f"Cancelled {cancelled} deletion(s).")
@@ -1,7 +1,16 @@
-from django.http import FileResponse, Http404
+import base64
+import binascii
+import json
+import time
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponseNotModified
 from django.shortcuts import get_object_or_404
+from django.utils.http import parse_etags
 
 from rest_framework import serializers, status
+from rest_framework.exceptions import APIException, ValidationError
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.renderers import BaseRenderer
 from rest_framework.response import Response
@@ -10,21 +19,30 @@ from rest_framework.views import APIView
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
 
-from apichallenge.api.mixins import ApiAuthMixin
+from apichallenge.api.mixins import ApiAuthMixin, ReplicaReadMixin
+from apichallenge.api.serialization import ValuesSerializer
 from apichallenge.api.pagination import (
     LimitOffsetPagination,
     get_paginated_response,
 )
-from apichallenge.documents.models import Document, AuditLog
+from apichallenge.common.db_metrics import database_connection_stats
+from apichallenge.common.task_status import task_status_get
+from apichallenge.documents.models import Document, DocumentTombstone, AuditLog
 from apichallenge.documents.permissions import DocumentPermission, IsAdmin
-from apichallenge.documents.selectors import document_list, document_get, audit_log_list
+from apichallenge.documents.previews import PREVIEW_CONTENT_TYPE
+from apichallenge.documents.selectors import (
+    document_list,
+    document_get,
+    document_preview_get,
+    document_changes_since,
+    audit_log_list,
+)
 from apichallenge.documents.services import (
     document_create,
     document_update,
     document_delete,
     create_audit_log,
 )
-from apichallenge.documents.tasks import process_document_after_upload
 from apichallenge.users.models import BaseUser, Role
 
 
@@ -47,8 +65,27 @@ def _get_document_or_404(pk: int) -> Document:
     return doc
 
 
+SPARSE_FIELDSET_PARAMETERS = [
+    OpenApiParameter(
+        "fields", OpenApiTypes.STR, description="Comma-separated fields to return (default: all)"
+    ),
+    OpenApiParameter("exclude", OpenApiTypes.STR, description="Comma-separated fields to omit"),
+]
+
+
+def _preview_sizes(previews: dict) -> list[int]:
+    return sorted(int(size) for size in previews)
+
+
+def _etag_matches(etag: str, if_none_match: str) -> bool:
+    """If-None-Match comparison: "*" or any listed tag, weakly (RFC 9110 13.1.2)."""
+    etags = parse_etags(if_none_match)
+    return "*" in etags or etag.removeprefix("W/") in {tag.removeprefix("W/") for tag in etags}
+
+
 class DocumentOutputSerializer(serializers.ModelSerializer):
     uploaded_by_username = serializers.CharField(source="uploaded_by.username", read_only=True)
+    preview_sizes = serializers.SerializerMethodField()
 
     class Meta:
         model = Document
@@ -63,8 +100,21 @@ class DocumentOutputSerializer(serializers.ModelSerializer):
             "uploaded_by_username",
             "created_at",
             "updated_at",
+            "preview_sizes",
+            "processing_status",
+            "processing_progress",
         )
 
+    def get_preview_sizes(self, obj) -> list[int]:
+        return _preview_sizes(obj.previews)
+
+
+class DocumentListSerializer(ValuesSerializer):
+    """Fast path of DocumentOutputSerializer for list endpoints."""
+
+    serializer_class = DocumentOutputSerializer
+    method_fields = {"preview_sizes": ("previews", _preview_sizes)}
+
 
 class DocumentDetailOutputSerializer(DocumentOutputSerializer):
     file_url = serializers.SerializerMethodField()
@@ -116,6 +166,19 @@ class AuditLogOutputSerializer(serializers.ModelSerializer):
         )
 
 
+class AuditLogListSerializer(ValuesSerializer):
+    """Fast path of AuditLogOutputSerializer for list endpoints."""
+
+    serializer_class = AuditLogOutputSerializer
+
+
+class DocumentSyncOutputSerializer(serializers.Serializer):
+    changed = DocumentOutputSerializer(many=True)
+    deleted = serializers.ListField(child=serializers.IntegerField())
+    cursor = serializers.CharField()
+    has_more = serializers.BooleanField()
+
+
 class AdminUserCreateInputSerializer(serializers.Serializer):
     username = serializers.CharField(max_length=150)
     password = serializers.CharField(min_length=8)
@@ -134,14 +197,15 @@ class AdminUserUpdateRoleInputSerializer(serializers.Serializer):
 
 
 @extend_schema(tags=["Documents"])
-class DocumentListCreateApi(ApiAuthMixin, APIView):
+class DocumentListCreateApi(ApiAuthMixin, ReplicaReadMixin, APIView):
     """
-    GET  → List all documents (viewer+) with filtering & pagination.
+    GET  → List all documents (viewer+) with filtering & pagination, from a replica.
     POST → Upload a new document (editor+).
     """
 
     permission_classes = (DocumentPermission,)
     parser_classes = (MultiPartParser, FormParser)
+    throttle_scope = {"GET": "documents.list", "POST": "documents.upload"}
 
     class Pagination(LimitOffsetPagination):
         default_limit = 10
@@ -155,15 +219,17 @@ class DocumentListCreateApi(ApiAuthMixin, APIView):
             OpenApiParameter("created_before", OpenApiTypes.DATETIME, description="Created before"),
             OpenApiParameter("limit", OpenApiTypes.INT, description="Pagination limit"),
             OpenApiParameter("offset", OpenApiTypes.INT, description="Pagination offset"),
+            *SPARSE_FIELDSET_PARAMETERS,
         ],
         responses=DocumentOutputSerializer(many=True),
     )
     def get(self, request):
         documents = document_list(filters=request.query_params)
+        serializer_class = DocumentListSerializer.for_request(request)
         return get_paginated_response(
             pagination_class=self.Pagination,
-            serializer_class=DocumentOutputSerializer,
-            queryset=documents,
+            serializer_class=serializer_class,
+            queryset=serializer_class.values(documents),
             request=request,
             view=self,
         )
@@ -184,14 +250,89 @@ class DocumentListCreateApi(ApiAuthMixin, APIView):
             request=request,
         )
 
-        # Trigger background processing
-        process_document_after_upload.delay(document.id)
-
         output = DocumentDetailOutputSerializer(document, context={"request": request})
         return Response(output.data, status=status.HTTP_201_CREATED)
 
 
 
+class SyncCursorExpired(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = "Sync cursor has expired, start a full sync without a cursor."
+    default_code = "sync_cursor_expired"
+
+
+def _encode_sync_cursor(position: tuple[int, int]) -> str:
+    xid, seq = position
+    raw = json.dumps({"x": xid, "s": seq, "t": int(time.time())}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_sync_cursor(cursor: str) -> tuple[int, int]:
+    """Return the change position of a cursor, rejecting expired ones."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        seq, issued_at = int(data["s"]), int(data["t"])
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise ValidationError({"cursor": ["Invalid cursor."]})
+
+    # Tombstones older than the TTL are pruned, so deletions could be missed.
+    # Cursors without a transaction id predate it and can't be resumed either.
+    if time.time() - issued_at > settings.DOCUMENTS_SYNC_TOMBSTONE_TTL or "x" not in data:
+        raise SyncCursorExpired()
+
+    try:
+        return int(data["x"]), seq
+    except (ValueError, TypeError):
+        raise ValidationError({"cursor": ["Invalid cursor."]})
+
+
+@extend_schema(tags=["Documents"])
+class DocumentSyncApi(ApiAuthMixin, APIView):
+    """
+    Delta sync (viewer+): documents created, updated or deleted since an
+    opaque cursor. Start without a cursor, then pass back the returned one
+    until `has_more` is false. A 410 means the cursor is too old and the
+    client must sync from scratch.
+    """
+
+    permission_classes = (DocumentPermission,)
+
+    default_limit = 100
+    max_limit = 500
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter("cursor", OpenApiTypes.STR, description="Cursor from the previous sync"),
+            OpenApiParameter("limit", OpenApiTypes.INT, description="Maximum number of changes"),
+        ],
+        responses=DocumentSyncOutputSerializer,
+    )
+    def get(self, request):
+        cursor = request.query_params.get("cursor")
+        position = _decode_sync_cursor(cursor) if cursor else (0, 0)
+
+        limit = request.query_params.get("limit", "")
+        limit = min(int(limit), self.max_limit) if limit.isdigit() else self.default_limit
+        limit = max(limit, 1)
+
+        changes, has_more = document_changes_since(after=position, limit=limit)
+        if changes:
+            position = (changes[-1].change_xid, changes[-1].change_seq)
+
+        return Response(
+            {
+                "changed": DocumentOutputSerializer(
+                    [c for c in changes if isinstance(c, Document)], many=True
+                ).data,
+                "deleted": [c.document_id for c in changes if isinstance(c, DocumentTombstone)],
+                "cursor": _encode_sync_cursor(position),
+                "has_more": has_more,
+            }
+        )
+
+
+
 @extend_schema(tags=["Documents"])
 class DocumentDetailApi(ApiAuthMixin, APIView):
     """
@@ -202,6 +343,7 @@ class DocumentDetailApi(ApiAuthMixin, APIView):
 
     permission_classes = (DocumentPermission,)
     parser_classes = (MultiPartParser, FormParser)
+    throttle_scope = {"GET": "documents.detail", "PUT": "documents.upload"}
 
     @extend_schema(responses=DocumentDetailOutputSerializer)
     def get(self, request, pk):
@@ -236,9 +378,6 @@ class DocumentDetailApi(ApiAuthMixin, APIView):
             request=request,
         )
 
-        if serializer.validated_data.get("file"):
-            process_document_after_upload.delay(document.id)
-
         output = DocumentDetailOutputSerializer(document, context={"request": request})
         return Response(output.data)
 
@@ -258,16 +397,26 @@ class DocumentDetailApi(ApiAuthMixin, APIView):
 
 @extend_schema(tags=["Documents"])
 class DocumentDownloadApi(ApiAuthMixin, APIView):
-    """Secure file download endpoint (viewer+)."""
+    """Secure file download endpoint (viewer+), throttled in bytes."""
 
     permission_classes = (DocumentPermission,)
     renderer_classes = (BinaryFileRenderer,)
+    throttle_scope = "documents.download"
+
+    def get_document(self) -> Document:
+        # Fetched once per request: the throttle needs its size first.
+        if not hasattr(self, "_document"):
+            self._document = _get_document_or_404(self.kwargs["pk"])
+        return self._document
+
+    def get_throttle_cost(self, request) -> int:
+        return self.get_document().file_size
 
     @extend_schema(
         responses={(200, "application/octet-stream"): OpenApiTypes.BINARY},
     )
     def get(self, request, pk):
-        document = _get_document_or_404(pk)
+        document = self.get_document()
 
         create_audit_log(
             user=request.user,
@@ -285,9 +434,53 @@ class DocumentDownloadApi(ApiAuthMixin, APIView):
 
 
 
+@extend_schema(tags=["Documents"])
+class DocumentPreviewApi(ApiAuthMixin, APIView):
+    """
+    Thumbnail preview of a document (viewer+).
+
+    Renditions are immutable (a new file gets new previews), so they are
+    served with a long-lived ETag and answered with 304 when unchanged.
+    """
+
+    permission_classes = (DocumentPermission,)
+    renderer_classes = (BinaryFileRenderer,)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter("size", OpenApiTypes.INT, description="Requested size in pixels"),
+        ],
+        responses={(200, PREVIEW_CONTENT_TYPE): OpenApiTypes.BINARY, 304: None},
+    )
+    def get(self, request, pk):
+        document = _get_document_or_404(pk)
+
+        size = request.query_params.get("size")
+        preview = document_preview_get(
+            document=document,
+            size=int(size) if size and size.isdigit() else None,
+        )
+        if preview is None:
+            raise Http404
+
+        cache_control = f"private, max-age={settings.DOCUMENTS_PREVIEW_CACHE_MAX_AGE}, immutable"
+
+        if _etag_matches(preview["etag"], request.headers.get("If-None-Match", "")):
+            response = HttpResponseNotModified()
+        else:
+            response = FileResponse(
+                default_storage.open(preview["key"], "rb"),
+                content_type=PREVIEW_CONTENT_TYPE,
+            )
+        response["ETag"] = preview["etag"]
+        response["Cache-Control"] = cache_control
+        return response
+
+
+
 @extend_schema(tags=["Admin"])
-class AuditLogListApi(ApiAuthMixin, APIView):
-    """List audit logs (admin only)."""
+class AuditLogListApi(ApiAuthMixin, ReplicaReadMixin, APIView):
+    """List audit logs (admin only), from a replica."""
 
     permission_classes = (IsAdmin,)
 
@@ -309,8 +502,8 @@ class AuditLogListApi(ApiAuthMixin, APIView):
         )
         return get_paginated_response(
             pagination_class=self.Pagination,
-            serializer_class=AuditLogOutputSerializer,
-            queryset=logs,
+            serializer_class=AuditLogListSerializer,
+            queryset=AuditLogListSerializer.values(logs),
             request=request,
             view=self,
         )
@@ -370,3 +563,34 @@ class AdminUserRoleUpdateApi(ApiAuthMixin, APIView):
 
         output = AdminUserOutputSerializer(user)
         return Response(output.data)
+
+
+@extend_schema(tags=["Admin"])
+class AdminDatabaseStatsApi(ApiAuthMixin, APIView):
+    """
+    Admin-only: database connection reuse of the worker serving the request:
+    connects per alias and, in pool mode, pool wait time and saturation.
+    """
+
+    permission_classes = (IsAdmin,)
+
+    @extend_schema(responses=OpenApiTypes.OBJECT)
+    def get(self, request):
+        return Response(database_connection_stats())
+
+
+@extend_schema(tags=["Admin"])
+class AdminTaskStatusApi(ApiAuthMixin, APIView):
+    """
+    Admin-only: the state of a background task, from the cache. Kept for
+    TASK_STATUS_TTL seconds, for tasks based on StatusTrackedTask only.
+    """
+
+    permission_classes = (IsAdmin,)
+
+    @extend_schema(responses=OpenApiTypes.OBJECT)
+    def get(self, request, task_id: str):
+        status = task_status_get(task_id=task_id)
+        if status is None:
+            raise Http404("Unknown or expired task.")
+        return Response({"id": task_id, **status})
@@ -0,0 +1,98 @@
+from asgiref.sync import sync_to_async
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+
+from apichallenge.api.async_views import AsyncApiView
+from apichallenge.api.pagination import LimitOffsetPagination
+from apichallenge.documents.apis import (
+    DocumentDetailOutputSerializer,
+    DocumentListSerializer,
+    _get_document_or_404,
+)
+from apichallenge.documents.models import Document, AuditLog
+from apichallenge.documents.permissions import DocumentPermission
+from apichallenge.documents.selectors import adocument_get, adocument_list
+from apichallenge.documents.services import create_audit_log
+from apichallenge.documents.storage import astorage_stream
+
+
+async def _aget_document_or_404(pk: int) -> Document:
+    """Get document from cached selector or raise 404."""
+    doc = await adocument_get(pk=pk)
+    if doc is None:
+        raise Http404
+    return doc
+
+
+class AsyncDocumentListApi(AsyncApiView):
+    """Async variant of DocumentListCreateApi.get (viewer+)."""
+
+    permission_classes = (DocumentPermission,)
+    throttle_scope = "documents.list"
+    replica_reads = True
+
+    class Pagination(LimitOffsetPagination):
+        default_limit = 10
+
+    async def get(self, request):
+        documents = await adocument_list(filters=request.query_params)
+
+        paginator = self.Pagination()
+        paginator.request = request
+        paginator.limit = paginator.get_limit(request)
+        paginator.offset = paginator.get_offset(request)
+        paginator.count = await documents.acount()
+
+        serializer_class = DocumentListSerializer.for_request(request)
+        rows = serializer_class.values(documents)
+        page = [row async for row in rows[paginator.offset:paginator.offset + paginator.limit]]
+        data = serializer_class(page, many=True).data
+        return JsonResponse(paginator.get_paginated_data(data))
+
+
+class AsyncDocumentDetailApi(AsyncApiView):
+    """Async variant of DocumentDetailApi.get (viewer+)."""
+
+    permission_classes = (DocumentPermission,)
+    throttle_scope = "documents.detail"
+
+    async def get(self, request, pk):
+        document = await _aget_document_or_404(pk)
+
+        await sync_to_async(create_audit_log)(
+            user=request.user,
+            document=document,
+            action=AuditLog.Action.READ,
+            request=request,
+        )
+
+        output = DocumentDetailOutputSerializer(document, context={"request": request})
+        return JsonResponse(output.data)
+
+
+class AsyncDocumentDownloadApi(AsyncApiView):
+    """Async variant of DocumentDownloadApi.get (viewer+), streamed from storage."""
+
+    permission_classes = (DocumentPermission,)
+    throttle_scope = "documents.download"
+
+    def get_throttle_cost(self, request) -> int:
+        # Runs inside check_throttles' worker thread, so the sync selector is fine.
+        return _get_document_or_404(self.kwargs["pk"]).file_size
+
+    async def get(self, request, pk):
+        document = await _aget_document_or_404(pk)
+
+        await sync_to_async(create_audit_log)(
+            user=request.user,
+            document=document,
+            action=AuditLog.Action.DOWNLOAD,
+            request=request,
+        )
+
+        response = StreamingHttpResponse(
+            astorage_stream(name=document.file.name),
+            content_type=document.content_type or "application/octet-stream",
+        )
+        response["Content-Length"] = document.file_size
+        response["Content-Disposition"] = f'attachment; filename="{document.file_name}"'
+        return response
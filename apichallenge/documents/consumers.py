@@ -1,36 +1,300 @@
-import json
+import asyncio
+import contextlib
+import logging
+from collections import deque
+from urllib.parse import parse_qs
 
+from asgiref.sync import sync_to_async
 from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from django.conf import settings
+
+from apichallenge.common.metrics import (
+    WS_CONNECTIONS,
+    WS_DROPPED_FRAMES,
+    WS_QUEUED_FRAMES,
+    WS_SLOW_CONSUMER_DISCONNECTS,
+)
+from apichallenge.documents.event_stream import (
+    EventStreamGap,
+    event_stream_read_after,
+    parse_event_id,
+)
+from apichallenge.documents.notifications import (
+    FEED_GROUP,
+    document_group_name,
+    user_group_name,
+)
+
+logger = logging.getLogger(__name__)
+
+# Close code for a rejected handshake (no or invalid access token).
+CLOSE_UNAUTHORIZED = 4401
+# Close code for a connection that cannot keep up with its events.
+CLOSE_SLOW_CONSUMER = 4408
+
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_COALESCE = "coalesce"
+OVERFLOW_DISCONNECT = "disconnect"
 
 
 class DocumentNotificationConsumer(AsyncJsonWebsocketConsumer):
     """
-    WebSocket consumer that broadcasts notifications to all connected
-    users when a document is created or updated.
+    WebSocket consumer that delivers document events to authenticated
+    users. A connection only receives events it asked for:
+
+      - always: events about documents the user uploaded
+      - {"action": "subscribe", "documents": [1, 2]}: events about those documents
+      - {"action": "subscribe", "feed": true}: every document event
+
+    "unsubscribe" takes the same arguments.
+
+    Events are "created", "updated" and "deleted", plus "processing" while
+    an uploaded file is processed, carrying {"status", "progress"}: clients
+    learn that a document is ready (or failed) without polling it.
+
+    Every event carries a stream "id". A reconnecting client passes the
+    last one it saw, along with its subscriptions, and first receives the
+    events it missed, then live ones. If they can no longer be replayed it
+    gets {"type": "resync"} and should re-fetch the document list.
+
+    Connect: ws://<host>/ws/documents/?token=<access token>
+             [&documents=1,2][&feed=1][&last_event_id=<id>]
+
+    Events are not sent from the channel-layer handler itself but queued
+    per connection (DOCUMENTS_WS_SEND_QUEUE_SIZE frames) and written by a
+    sender task, so a slow client never holds up the channel layer. When
+    the queue is full DOCUMENTS_WS_OVERFLOW_POLICY applies:
 
-    Connect: ws://<host>/ws/documents/
+      - "drop_oldest": discard the oldest queued frame
+      - "coalesce": replace everything queued with a single resync frame
+      - "disconnect": close the connection (4408); the client resumes with
+        last_event_id
+
+    A connection that drops more than DOCUMENTS_WS_SLOW_CONSUMER_MAX_DROPS
+    frames is disconnected whatever the policy.
     """
 
-    GROUP_NAME = "document_notifications"
+    RECENT_EVENTS_SIZE = 256
 
     async def connect(self):
-        await self.channel_layer.group_add(self.GROUP_NAME, self.channel_name)
-        await self.accept()
+        user = self.scope.get("user")
+        if user is None or not user.is_authenticated:
+            await self.close(code=CLOSE_UNAUTHORIZED)
+            return
+
+        self.user = user
+        self.joined_groups = set()
+        self.documents = set()
+        self.feed = False
+        self.recent_event_ids = deque(maxlen=self.RECENT_EVENTS_SIZE)
+        self.last_event_id: tuple[int, int] | None = None
+
+        query = parse_qs(self.scope.get("query_string", b"").decode())
+        document_ids = {
+            int(pk)
+            for value in query.get("documents", [])
+            for pk in value.split(",")
+            if pk.strip().isdigit()
+        }
+
+        await self._join(user_group_name(user.id))
+        for pk in list(document_ids)[: settings.DOCUMENTS_WS_MAX_SUBSCRIPTIONS]:
+            await self._join(document_group_name(pk))
+            self.documents.add(pk)
+        if query.get("feed", ["0"])[0] in ("1", "true"):
+            await self._join(FEED_GROUP)
+            self.feed = True
+
+        await self.accept(subprotocol=self.scope.get("auth_subprotocol"))
+
+        self.outbox: deque[dict] = deque()
+        self.outbox_ready = asyncio.Event()
+        self.dropped_frames = 0
+        self.closing = False
+        self.sender = asyncio.create_task(self._send_outbox())
+        WS_CONNECTIONS.inc()
+
+        if query.get("last_event_id"):
+            await self._replay(query["last_event_id"][0])
+
+    async def _replay(self, last_event_id: str) -> None:
+        """
+        Send the events missed since `last_event_id`. Groups were joined
+        before reading the stream, so nothing falls in between; live events
+        already covered by the replay are dropped by their id.
+        """
+        try:
+            events = await sync_to_async(event_stream_read_after, thread_sensitive=False)(
+                last_event_id=last_event_id,
+                groups=set(self.joined_groups),
+            )
+        except Exception as e:
+            # A gap in the stream, or the stream is unavailable.
+            if not isinstance(e, EventStreamGap):
+                logger.warning("Failed to replay document events: %s", e)
+            await self._enqueue({"type": "resync"})
+            return
+
+        if events:
+            self.last_event_id = parse_event_id(events[-1]["id"])
+            await self._enqueue(
+                {"type": "replay", "events": [self._event_frame(event) for event in events]}
+            )
 
     async def disconnect(self, close_code):
-        await self.channel_layer.group_discard(self.GROUP_NAME, self.channel_name)
+        for group in getattr(self, "joined_groups", ()):
+            await self.channel_layer.group_discard(group, self.channel_name)
+
+        sender = getattr(self, "sender", None)
+        if sender is not None:
+            sender.cancel()
+            WS_CONNECTIONS.dec()
+            WS_QUEUED_FRAMES.dec(len(self.outbox))
+            self.outbox.clear()
+
+    async def _send_outbox(self) -> None:
+        """Write queued frames to the client, one at a time."""
+        try:
+            while True:
+                await self.outbox_ready.wait()
+                while self.outbox:
+                    frame = self.outbox.popleft()
+                    WS_QUEUED_FRAMES.dec()
+                    await self.send_json(frame)
+                self.outbox_ready.clear()
+        except Exception:
+            # Nothing would reach the client again: close, it resumes with last_event_id.
+            logger.exception("Failed to send to WebSocket consumer of user %s, closing.", self.user.id)
+            self.closing = True
+            with contextlib.suppress(Exception):
+                await self.close()
+
+    async def _enqueue(self, frame: dict) -> None:
+        if self.closing:
+            return
+
+        if len(self.outbox) >= settings.DOCUMENTS_WS_SEND_QUEUE_SIZE:
+            policy = settings.DOCUMENTS_WS_OVERFLOW_POLICY
+
+            if policy == OVERFLOW_DISCONNECT:
+                await self._disconnect_slow_consumer()
+                return
+
+            if policy == OVERFLOW_COALESCE:
+                dropped = len(self.outbox)
+                self.outbox.clear()
+                WS_QUEUED_FRAMES.dec(dropped)
+                # The client re-fetches instead of receiving what was queued.
+                frame = {"type": "resync"}
+            else:
+                self.outbox.popleft()
+                WS_QUEUED_FRAMES.dec()
+                dropped = 1
+
+            self.dropped_frames += dropped
+            WS_DROPPED_FRAMES.inc(dropped)
+
+            if self.dropped_frames > settings.DOCUMENTS_WS_SLOW_CONSUMER_MAX_DROPS:
+                await self._disconnect_slow_consumer()
+                return
+
+        self.outbox.append(frame)
+        WS_QUEUED_FRAMES.inc()
+        self.outbox_ready.set()
+
+    async def _disconnect_slow_consumer(self) -> None:
+        logger.warning(
+            "Disconnecting slow WebSocket consumer of user %s (%s frames queued, %s dropped).",
+            self.user.id,
+            len(self.outbox),
+            self.dropped_frames,
+        )
+        self.closing = True
+        WS_SLOW_CONSUMER_DISCONNECTS.inc()
+        await self.close(code=CLOSE_SLOW_CONSUMER)
+
+    async def _join(self, group: str) -> None:
+        if group not in self.joined_groups:
+            await self.channel_layer.group_add(group, self.channel_name)
+            self.joined_groups.add(group)
+
+    async def _leave(self, group: str) -> None:
+        if group in self.joined_groups:
+            await self.channel_layer.group_discard(group, self.channel_name)
+            self.joined_groups.discard(group)
 
     async def receive_json(self, content, **kwargs):
-        # Client messages are not expected; ignore them.
-        pass
-
-    async def document_notification(self, event):
-        """Handler for messages sent to the group."""
-        await self.send_json(
-            {
-                "type": event["action"],
-                "document": event["document"],
-                "user": event["user"],
-                "timestamp": event["timestamp"],
-            }
+        action = content.get("action") if isinstance(content, dict) else None
+        if action not in ("subscribe", "unsubscribe"):
+            await self._enqueue({"type": "error", "detail": "Unknown action."})
+            return
+
+        document_ids = content.get("documents", [])
+        if not isinstance(document_ids, list) or not all(
+            isinstance(pk, int) and not isinstance(pk, bool) for pk in document_ids
+        ):
+            await self._enqueue({"type": "error", "detail": "'documents' must be a list of IDs."})
+            return
+
+        if action == "subscribe":
+            new_ids = set(document_ids) - self.documents
+            if len(self.documents) + len(new_ids) > settings.DOCUMENTS_WS_MAX_SUBSCRIPTIONS:
+                await self._enqueue({"type": "error", "detail": "Too many subscriptions."})
+                return
+            for pk in new_ids:
+                await self._join(document_group_name(pk))
+            self.documents |= new_ids
+            if content.get("feed"):
+                await self._join(FEED_GROUP)
+                self.feed = True
+        else:
+            for pk in set(document_ids) & self.documents:
+                await self._leave(document_group_name(pk))
+            self.documents -= set(document_ids)
+            if content.get("feed"):
+                await self._leave(FEED_GROUP)
+                self.feed = False
+
+        await self._enqueue(
+            {"type": "subscriptions", "documents": sorted(self.documents), "feed": self.feed}
         )
+
+    async def document_notifications(self, message):
+        """
+        Handler for batches sent to the groups. A single event goes out as
+        one frame; several go out together as one "batch" frame.
+        """
+        frames = []
+        for event in message["events"]:
+            # A connection in several matching groups gets the event once per group.
+            event_id = event.get("event_id")
+            if event_id is not None:
+                if event_id in self.recent_event_ids:
+                    continue
+                self.recent_event_ids.append(event_id)
+            if (
+                self.last_event_id is not None
+                and "id" in event
+                and parse_event_id(event["id"]) <= self.last_event_id
+            ):
+                continue
+            frames.append(self._event_frame(event))
+
+        if len(frames) == 1:
+            await self._enqueue(frames[0])
+        elif frames:
+            await self._enqueue({"type": "batch", "events": frames})
+
+    @staticmethod
+    def _event_frame(event: dict) -> dict:
+        frame = {
+            "type": event["action"],
+            "document": event["document"],
+            "user": event["user"],
+            "timestamp": event["timestamp"],
+        }
+        if "processing" in event:
+            frame["processing"] = event["processing"]
+        if "id" in event:
+            frame["id"] = event["id"]
+        return frame
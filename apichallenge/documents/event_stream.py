@@ -0,0 +1,120 @@
+import json
+import logging
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+STREAM_KEY = "documents:events"
+# Events can be replayed after this ID only: the newest trimmed entry, or
+# the first entry of a stream that was recreated (its earlier events are lost).
+FLOOR_KEY = "documents:events:floor"
+
+# KEYS[1] stream, KEYS[2] floor
+# ARGV[1] max length, then a groups, event pair per event
+APPEND_LUA = """
+local created = redis.call("EXISTS", KEYS[1]) == 0
+local ids = {}
+for i = 2, #ARGV, 2 do
+    ids[#ids + 1] = redis.call("XADD", KEYS[1], "*", "groups", ARGV[i], "event", ARGV[i + 1])
+end
+if created then
+    redis.call("SET", KEYS[2], ids[1])
+end
+
+local excess = redis.call("XLEN", KEYS[1]) - tonumber(ARGV[1])
+if excess > 0 then
+    local trimmed = redis.call("XRANGE", KEYS[1], "-", "+", "COUNT", excess)
+    redis.call("SET", KEYS[2], trimmed[#trimmed][1])
+    redis.call("XTRIM", KEYS[1], "MAXLEN", ARGV[1])
+end
+return ids
+"""
+
+
+class EventStreamGap(Exception):
+    """The requested offset is no longer retained; the client must resync."""
+
+
+def _get_redis():
+    from django_redis import get_redis_connection
+
+    return get_redis_connection("default")
+
+
+def parse_event_id(event_id: str) -> tuple[int, int]:
+    """Redis stream IDs are "<ms>-<seq>"; compare them as integer pairs."""
+    ms, _, seq = event_id.partition("-")
+    return int(ms), int(seq or 0)
+
+
+def event_stream_append(events: list[tuple[list[str], dict]]) -> None:
+    """
+    Append events to the capped document event stream in one round trip
+    and stamp each with its stream ID ("id"), which increases monotonically.
+    The stream is trimmed to DOCUMENTS_EVENT_STREAM_MAXLEN, recording the
+    newest trimmed ID. Events are left without an ID if the stream is
+    disabled or unavailable.
+    """
+    if not settings.DOCUMENTS_EVENT_STREAM_ENABLED or not events:
+        return
+
+    args = [settings.DOCUMENTS_EVENT_STREAM_MAXLEN]
+    for groups, event in events:
+        args += [",".join(groups), json.dumps(event)]
+    try:
+        append = _get_redis().register_script(APPEND_LUA)
+        for (_, event), stream_id in zip(events, append(keys=[STREAM_KEY, FLOOR_KEY], args=args)):
+            event["id"] = stream_id.decode() if isinstance(stream_id, bytes) else stream_id
+    except Exception as e:
+        logger.warning("Failed to append to the document event stream: %s", e)
+
+
+def event_stream_read_after(*, last_event_id: str, groups: set[str]) -> list[dict]:
+    """
+    Return the events after `last_event_id` addressed to any of `groups`,
+    oldest first. Raises EventStreamGap if some of the events in between
+    have already been trimmed or the stream is gone (e.g. Redis restarted
+    without it, or evicted it), or if there are more than the replay limit.
+    """
+    if not settings.DOCUMENTS_EVENT_STREAM_ENABLED:
+        raise EventStreamGap
+
+    try:
+        last = parse_event_id(last_event_id)
+    except ValueError:
+        raise EventStreamGap
+
+    redis = _get_redis()
+    pipeline = redis.pipeline(transaction=False)
+    pipeline.xrange(STREAM_KEY, count=1)
+    pipeline.get(FLOOR_KEY)
+    oldest, floor = pipeline.execute()
+    if not oldest:
+        # Trimming never empties the stream: the client's events were lost with it.
+        raise EventStreamGap
+    if floor is None:
+        # Not recorded (e.g. evicted): fall back to the oldest kept entry.
+        floor = oldest[0][0]
+    if parse_event_id(floor.decode() if isinstance(floor, bytes) else floor) > last:
+        # Entries after the client's offset were trimmed.
+        raise EventStreamGap
+
+    limit = settings.DOCUMENTS_EVENT_STREAM_REPLAY_LIMIT
+    entries = redis.xrange(STREAM_KEY, min=f"({last[0]}-{last[1]}", count=limit + 1)
+    if len(entries) > limit:
+        raise EventStreamGap
+
+    events = []
+    for stream_id, fields in entries:
+        fields = {
+            (k.decode() if isinstance(k, bytes) else k): (v.decode() if isinstance(v, bytes) else v)
+            for k, v in fields.items()
+        }
+        if groups.isdisjoint(fields["groups"].split(",")):
+            continue
+        event = json.loads(fields["event"])
+        event["id"] = stream_id.decode() if isinstance(stream_id, bytes) else stream_id
+        events.append(event)
+
+    return events
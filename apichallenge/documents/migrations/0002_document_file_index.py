@@ -0,0 +1,19 @@
+# Generated by Django 5.1.15 on 2026-10-19 08:22
+
+import apichallenge.documents.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='document',
+            name='file',
+            field=models.FileField(db_index=True, upload_to=apichallenge.documents.models.document_upload_path),
+        ),
+    ]
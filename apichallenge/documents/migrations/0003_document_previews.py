@@ -0,0 +1,18 @@
+# Generated by Django 5.1.15 on 2026-10-19 08:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0002_document_file_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='previews',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
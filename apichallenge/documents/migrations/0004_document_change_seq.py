@@ -0,0 +1,56 @@
+# Generated by Django 5.1.15 on 2026-10-19 08:29
+
+from django.conf import settings
+from django.db import migrations, models
+
+CHANGE_SEQUENCE = "documents_change_seq"
+
+
+def create_change_sequence(apps, schema_editor):
+    """Create the change sequence and give existing documents a position in it."""
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(f"CREATE SEQUENCE IF NOT EXISTS {CHANGE_SEQUENCE}")
+        schema_editor.execute(
+            f"UPDATE documents_document SET change_seq = nextval('{CHANGE_SEQUENCE}')"
+        )
+    else:
+        Document = apps.get_model("documents", "Document")
+        Document.objects.update(change_seq=models.F("id"))
+
+
+def drop_change_sequence(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(f"DROP SEQUENCE IF EXISTS {CHANGE_SEQUENCE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0003_document_previews'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('document_id', models.BigIntegerField()),
+                ('change_seq', models.BigIntegerField(unique=True)),
+                ('deleted_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'ordering': ['change_seq'],
+            },
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='change_seq',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['change_seq'], include=('id', 'updated_at'), name='document_change_seq_idx'),
+        ),
+        migrations.RunPython(create_change_sequence, drop_change_sequence),
+    ]
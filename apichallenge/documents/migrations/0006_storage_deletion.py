@@ -0,0 +1,49 @@
+# Generated by Django 5.1.15 on 2026-10-19 08:57
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def move_outbox_deletions(apps, schema_editor):
+    """Storage deletions still waiting in the outbox move to the deletion queue, due now."""
+    OutboxMessage = apps.get_model("documents", "OutboxMessage")
+    StorageDeletion = apps.get_model("documents", "StorageDeletion")
+
+    messages = OutboxMessage.objects.filter(topic="delete_files")
+    now = timezone.now()
+    StorageDeletion.objects.bulk_create(
+        StorageDeletion(key=key, purge_after=now)
+        for message in messages
+        for key in message.payload.get("keys", [])
+    )
+    messages.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0005_outbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StorageDeletion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=255)),
+                ('document_id', models.BigIntegerField(blank=True, db_index=True, null=True)),
+                ('purge_after', models.DateTimeField(db_index=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['purge_after'],
+            },
+        ),
+        migrations.RunPython(move_outbox_deletions, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='outboxmessage',
+            name='topic',
+            field=models.CharField(choices=[('notify', 'WebSocket notification'), ('invalidate_cache', 'Cache invalidation'), ('process', 'Post-upload processing')], max_length=32),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.15 on 2026-10-19 08:59
+
+from django.db import migrations, models
+
+
+def mark_existing_documents_ready(apps, schema_editor):
+    """Documents uploaded so far have been processed already."""
+    Document = apps.get_model("documents", "Document")
+    Document.objects.update(processing_status="ready", processing_progress=100)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0006_storage_deletion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='processing_progress',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='processing_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('ready', 'Ready'), ('failed', 'Failed')], default='pending', max_length=10),
+        ),
+        migrations.RunPython(mark_existing_documents_ready, migrations.RunPython.noop),
+    ]
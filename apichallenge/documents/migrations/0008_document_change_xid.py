@@ -0,0 +1,37 @@
+# Generated by Django 5.1.15 on 2026-10-19 09:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0007_document_processing_status'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='document',
+            name='document_change_seq_idx',
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='change_xid',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='documenttombstone',
+            name='change_xid',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['change_xid', 'change_seq'], name='document_change_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='documenttombstone',
+            index=models.Index(fields=['change_xid', 'change_seq'], name='tombstone_change_idx'),
+        ),
+    ]
@@ -2,10 +2,15 @@ import uuid
 
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
 from apichallenge.common.models import BaseModel
 
 
+# Postgres sequence behind Document.change_seq / DocumentTombstone.change_seq.
+DOCUMENT_CHANGE_SEQUENCE = "documents_change_seq"
+
+
 def document_upload_path(instance, filename):
     """Generate unique upload path for documents."""
     ext = filename.rsplit(".", 1)[-1] if "." in filename else "bin"
@@ -13,9 +18,15 @@ def document_upload_path(instance, filename):
 
 
 class Document(BaseModel):
+    class ProcessingStatus(models.TextChoices):
+        PENDING = "pending", "Pending"
+        PROCESSING = "processing", "Processing"
+        READY = "ready", "Ready"
+        FAILED = "failed", "Failed"
+
     title = models.CharField(max_length=255)
     description = models.TextField(blank=True, default="")
-    file = models.FileField(upload_to=document_upload_path)
+    file = models.FileField(upload_to=document_upload_path, db_index=True)
     file_name = models.CharField(max_length=255)
     file_size = models.PositiveBigIntegerField(default=0)
     content_type = models.CharField(max_length=100, blank=True, default="")
@@ -24,14 +35,47 @@ class Document(BaseModel):
         on_delete=models.CASCADE,
         related_name="documents",
     )
+    # Rendered thumbnails, keyed by size: {"256": {"key": ..., "etag": ...}}
+    previews = models.JSONField(default=dict, blank=True)
+    # Position in the global change order, bumped on every change (see sync):
+    # the writing transaction's id, then the change sequence.
+    change_xid = models.BigIntegerField(default=0)
+    change_seq = models.BigIntegerField(default=0)
+    # Post-upload processing of the current file (tasks.process_document_after_upload)
+    processing_status = models.CharField(
+        max_length=10, choices=ProcessingStatus.choices, default=ProcessingStatus.PENDING
+    )
+    processing_progress = models.PositiveSmallIntegerField(default=0)  # percent
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # The sync endpoint's "changed since" scan, in change order.
+            models.Index(fields=["change_xid", "change_seq"], name="document_change_idx"),
+        ]
 
     def __str__(self):
         return f"{self.title} ({self.file_name})"
 
 
+class DocumentTombstone(models.Model):
+    """Marks a deleted document for clients that sync changes incrementally."""
+
+    document_id = models.BigIntegerField()
+    change_xid = models.BigIntegerField(default=0)
+    change_seq = models.BigIntegerField(unique=True)
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ["change_seq"]
+        indexes = [
+            models.Index(fields=["change_xid", "change_seq"], name="tombstone_change_idx"),
+        ]
+
+    def __str__(self):
+        return f"Tombstone #{self.document_id} @ {self.change_seq}"
+
+
 class AuditLog(models.Model):
     """Tracks all access and modifications to documents."""
 
@@ -65,3 +109,50 @@ class AuditLog(models.Model):
 
     def __str__(self):
         return f"[{self.action}] {self.document_title} by {self.user} @ {self.timestamp}"
+
+
+class OutboxMessage(models.Model):
+    """
+    A side effect of a document change (notification, cache invalidation,
+    background processing), written in the same transaction as the change
+    and performed after commit by the outbox relay.
+    """
+
+    class Topic(models.TextChoices):
+        NOTIFY = "notify", "WebSocket notification"
+        INVALIDATE_CACHE = "invalidate_cache", "Cache invalidation"
+        PROCESS = "process", "Post-upload processing"
+
+    topic = models.CharField(max_length=32, choices=Topic.choices)
+    payload = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Failed messages are retried from this time on, with backoff.
+    available_at = models.DateTimeField(default=timezone.now, db_index=True)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, default="")
+
+    class Meta:
+        ordering = ["id"]
+
+    def __str__(self):
+        return f"Outbox #{self.id} {self.topic} ({self.attempts} attempts)"
+
+
+class StorageDeletion(models.Model):
+    """
+    A storage object slated for removal by a document update or delete.
+    Purged after `purge_after`; until then the deletion can be cancelled.
+    """
+
+    key = models.CharField(max_length=255)
+    # The document the object belonged to, to find it when restoring.
+    document_id = models.BigIntegerField(null=True, blank=True, db_index=True)
+    purge_after = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    attempts = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["purge_after"]
+
+    def __str__(self):
+        return f"Delete {self.key} after {self.purge_after}"
@@ -1,36 +1,155 @@
+import asyncio
 import logging
+import uuid
 
 from django.utils import timezone
 
+from apichallenge.documents.event_stream import event_stream_append
+from apichallenge.documents.models import OutboxMessage
+from apichallenge.documents.outbox import outbox_enqueue
+
 logger = logging.getLogger(__name__)
 
+# Feed of all document events, for connections that opted in. One group for
+# every role: all of them may read every document (DocumentPermission).
+FEED_GROUP = "documents.feed"
+
+
+def user_group_name(user_id: int) -> str:
+    """Events about documents uploaded by one user."""
+    return f"documents.user.{user_id}"
+
+
+def document_group_name(document_id: int) -> str:
+    """Events about a single subscribed document."""
+    return f"documents.document.{document_id}"
+
+
+def get_event_groups(*, document) -> list[str]:
+    """Groups that are interested in an event about `document`."""
+    return [
+        document_group_name(document.id),
+        user_group_name(document.uploaded_by_id),
+        FEED_GROUP,
+    ]
+
+
+# Actions whose latest event about a document supersedes the earlier ones.
+COALESCED_ACTIONS = ("updated", "processing")
+
+
+def coalesce_events(events: list[dict]) -> list[dict]:
+    """
+    Collapse repeated "updated" (or "processing") events for the same
+    document into the latest one, keeping the position of the first.
+    Other events are kept.
+    """
+    coalesced: list[dict] = []
+    latest_index: dict[tuple[str, int], int] = {}
+
+    for event in events:
+        if event["action"] in COALESCED_ACTIONS:
+            key = (event["action"], event["document"]["id"])
+            if key in latest_index:
+                coalesced[latest_index[key]] = event
+                continue
+            latest_index[key] = len(coalesced)
+        coalesced.append(event)
+
+    return coalesced
+
+
+async def _send_batch(channel_layer, batch: list[tuple[list[str], dict]]) -> None:
+    """Send each group a single message carrying all of its events."""
+    events_by_group: dict[str, list[dict]] = {}
+    for groups, event in batch:
+        for group in groups:
+            events_by_group.setdefault(group, []).append(event)
+
+    await asyncio.gather(
+        *(
+            channel_layer.group_send(
+                group,
+                {"type": "document.notifications", "events": coalesce_events(events)},
+            )
+            for group, events in events_by_group.items()
+        )
+    )
+
+
+def publish_document_events(events: list[tuple[list[str], dict]], *, replayable: bool = True) -> None:
+    """
+    Append `events` to the replayable event stream (unless not
+    `replayable`) and send each group a single message carrying all of
+    its events.
+    """
+    from asgiref.sync import async_to_sync
+    from channels.layers import get_channel_layer
+
+    if replayable:
+        event_stream_append(events)
+
+    channel_layer = get_channel_layer()
+    if channel_layer is not None:
+        async_to_sync(_send_batch)(channel_layer, events)
+
+
+def _document_event(*, action: str, document, user, **extra) -> dict:
+    return {
+        # Lets a connection drop duplicates: it may be in several matching
+        # groups, and the relay may send an event again after a failure.
+        "event_id": uuid.uuid4().hex,
+        "action": action,
+        "document": {
+            "id": document.id,
+            "title": document.title,
+            "file_name": document.file_name,
+        },
+        "user": user.username,
+        "timestamp": timezone.now().isoformat(),
+        **extra,
+    }
+
 
 def notify_document_change(*, action: str, document, user):
     """
-    Send a WebSocket notification to all connected clients.
-    Fails silently if channels layer is not available.
+    Notify the connections interested in `document`: its subscribers,
+    its uploader and the feed.
+
+    The event is written to the outbox in the surrounding transaction and
+    sent by the outbox relay after commit, so rolled back changes are never
+    announced and committed ones are announced even if this process dies.
+    Events the relay takes together reach each group as one message. Every
+    event is also appended to the replayable event stream (see
+    event_stream.py) under a monotonic "id".
     """
+    groups = get_event_groups(document=document)
+    event = _document_event(action=action, document=document, user=user)
+
+    outbox_enqueue(topic=OutboxMessage.Topic.NOTIFY, payload={"groups": groups, "event": event})
+
+
+def notify_document_processing(*, document, status_changed: bool) -> None:
+    """
+    Push a "processing" event with the document's processing status and
+    progress to the same connections as notify_document_change().
+
+    Sent right away by the processing worker, whose updates are already
+    committed. Status changes are also appended to the replayable event
+    stream; progress alone is only useful while it is current, so it only
+    goes to the connected clients. A client that misses it still finds the
+    progress on the document.
+    """
+    event = _document_event(
+        action="processing",
+        document=document,
+        user=document.uploaded_by,
+        processing={
+            "status": document.processing_status,
+            "progress": document.processing_progress,
+        },
+    )
     try:
-        from channels.layers import get_channel_layer
-        from asgiref.sync import async_to_sync
-
-        channel_layer = get_channel_layer()
-        if channel_layer is None:
-            return
-
-        async_to_sync(channel_layer.group_send)(
-            "document_notifications",
-            {
-                "type": "document.notification",
-                "action": action,
-                "document": {
-                    "id": document.id,
-                    "title": document.title,
-                    "file_name": document.file_name,
-                },
-                "user": user.username,
-                "timestamp": timezone.now().isoformat(),
-            },
-        )
+        publish_document_events([(get_event_groups(document=document), event)], replayable=status_changed)
     except Exception as e:
-        logger.warning("Failed to send WebSocket notification: %s", e)
+        logger.warning("Failed to send the processing event of document #%s: %s", document.id, e)
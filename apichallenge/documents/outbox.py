@@ -0,0 +1,137 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from apichallenge.documents.models import OutboxMessage
+
+logger = logging.getLogger(__name__)
+
+Topic = OutboxMessage.Topic
+
+# Set while a relay run is scheduled, so a burst of commits schedules one run.
+RELAY_SCHEDULED_KEY = "documents:outbox:relay_scheduled"
+
+
+def outbox_enqueue(*, topic: str, payload: dict) -> OutboxMessage:
+    """
+    Record a side effect in the current transaction. The relay performs it
+    once the transaction commits; a rollback discards it with the change.
+    """
+    message = OutboxMessage.objects.create(topic=topic, payload=payload)
+    transaction.on_commit(_schedule_relay)
+    return message
+
+
+def _schedule_relay() -> None:
+    """Wake the relay after a commit. The periodic relay run covers a failed wake-up."""
+    from apichallenge.documents.tasks import relay_outbox
+
+    try:
+        if cache.add(RELAY_SCHEDULED_KEY, 1, settings.DOCUMENTS_OUTBOX_RELAY_INTERVAL):
+            relay_outbox.delay()
+    except Exception as e:
+        logger.warning("Failed to schedule the outbox relay: %s", e)
+
+
+def _notify(payloads: list[dict]) -> None:
+    from apichallenge.documents.notifications import publish_document_events
+
+    publish_document_events([(payload["groups"], payload["event"]) for payload in payloads])
+
+
+def _invalidate_cache(payloads: list[dict]) -> None:
+    from apichallenge.documents.selectors import invalidate_document_cache
+
+    invalidate_document_cache(
+        document_ids={payload["document_id"] for payload in payloads if payload.get("document_id")}
+    )
+
+
+def _process(payloads: list[dict]) -> None:
+    from apichallenge.documents.processing_queue import processing_enqueue
+    from apichallenge.documents.tasks import process_document_after_upload
+
+    document_ids = list(dict.fromkeys(payload["document_id"] for payload in payloads))
+    if settings.DOCUMENTS_PROCESSING_BATCHED:
+        processing_enqueue(document_ids=document_ids)
+        return
+    for document_id in document_ids:
+        process_document_after_upload.delay(document_id)
+
+
+# Each handler performs a batch of messages of its topic and must be
+# idempotent: a batch is performed again if the relay fails midway.
+HANDLERS = {
+    Topic.NOTIFY: _notify,
+    Topic.INVALIDATE_CACHE: _invalidate_cache,
+    Topic.PROCESS: _process,
+}
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    seconds = settings.DOCUMENTS_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1)
+    return timedelta(seconds=min(seconds, settings.DOCUMENTS_OUTBOX_MAX_RETRY_DELAY))
+
+
+def outbox_relay_batch(*, batch_size: int | None = None) -> int:
+    """
+    Perform up to `batch_size` due messages, oldest first, grouped by topic.
+    Performed messages are deleted; a failing topic's messages are retried
+    later with exponential backoff, until DOCUMENTS_OUTBOX_MAX_ATTEMPTS.
+    Concurrent relays skip each other's locked rows.
+    Returns the number of messages taken.
+    """
+    batch_size = batch_size or settings.DOCUMENTS_OUTBOX_BATCH_SIZE
+    now = timezone.now()
+
+    with transaction.atomic():
+        messages = list(
+            OutboxMessage.objects.select_for_update(skip_locked=True)
+            .filter(available_at__lte=now, attempts__lt=settings.DOCUMENTS_OUTBOX_MAX_ATTEMPTS)
+            .order_by("id")[:batch_size]
+        )
+
+        by_topic: dict[str, list[OutboxMessage]] = {}
+        for message in messages:
+            by_topic.setdefault(message.topic, []).append(message)
+
+        done, failed = [], []
+        for topic, topic_messages in by_topic.items():
+            try:
+                HANDLERS[topic]([message.payload for message in topic_messages])
+            except Exception as e:
+                logger.warning("Outbox %s handler failed for %s messages: %s", topic, len(topic_messages), e)
+                for message in topic_messages:
+                    message.attempts += 1
+                    message.available_at = now + _retry_delay(message.attempts)
+                    message.last_error = repr(e)
+                    if message.attempts >= settings.DOCUMENTS_OUTBOX_MAX_ATTEMPTS:
+                        logger.error("Outbox message #%s gave up after %s attempts.", message.id, message.attempts)
+                failed.extend(topic_messages)
+            else:
+                done.extend(message.id for message in topic_messages)
+
+        OutboxMessage.objects.filter(id__in=done).delete()
+        if failed:
+            OutboxMessage.objects.bulk_update(failed, ["attempts", "available_at", "last_error"])
+
+    return len(messages)
+
+
+def outbox_relay(*, max_batches: int = 100) -> int:
+    """Drain the outbox in batches. Returns the number of messages taken."""
+    # Commits from here on schedule another run: this one may have missed them.
+    cache.delete(RELAY_SCHEDULED_KEY)
+
+    batch_size = settings.DOCUMENTS_OUTBOX_BATCH_SIZE
+    total = 0
+    for _ in range(max_batches):
+        taken = outbox_relay_batch(batch_size=batch_size)
+        total += taken
+        if taken < batch_size:
+            break
+    return total
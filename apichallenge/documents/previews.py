@@ -0,0 +1,108 @@
+import hashlib
+import io
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+PREVIEW_FORMAT = "WEBP"
+PREVIEW_CONTENT_TYPE = "image/webp"
+PREVIEW_EXTENSION = "webp"
+
+_process_pool: ProcessPoolExecutor | None = None
+
+
+def preview_path(*, file_name: str, size: int) -> str:
+    """
+    Storage key of a preview rendition, derived from the original's key:
+    documents/<user>/<uuid>.pdf -> previews/<user>/<uuid>/<size>.webp
+
+    Previews live under their own prefix so cleanup_orphaned_files,
+    which only scans the documents/ prefix, never mistakes them for orphans.
+    """
+    stem = file_name.rsplit(".", 1)[0]
+    if stem.startswith(settings.DOCUMENTS_STORAGE_PREFIX):
+        stem = stem[len(settings.DOCUMENTS_STORAGE_PREFIX):]
+    return f"{settings.DOCUMENTS_PREVIEW_PREFIX}{stem}/{size}.{PREVIEW_EXTENSION}"
+
+
+def preview_etag(content: bytes) -> str:
+    return f'"{hashlib.md5(content).hexdigest()}"'
+
+
+def can_render_preview(content_type: str) -> bool:
+    return content_type.startswith("image/") or content_type == "application/pdf"
+
+
+def _open_source_image(data: bytes, content_type: str):
+    from PIL import Image, ImageOps
+
+    if content_type == "application/pdf":
+        import pypdfium2 as pdfium
+
+        pdf = pdfium.PdfDocument(data)
+        try:
+            page = pdf[0]
+            width, height = page.get_size()
+            # Render just large enough for the biggest rendition.
+            scale = max(settings.DOCUMENTS_PREVIEW_SIZES) / max(width, height, 1)
+            image = page.render(scale=max(scale, 0.1)).to_pil()
+        finally:
+            pdf.close()
+        return image
+
+    image = Image.open(io.BytesIO(data))
+    image = ImageOps.exif_transpose(image)
+    return image
+
+
+def render_previews(data: bytes, content_type: str, sizes: list[int]) -> dict[int, bytes]:
+    """
+    Decode the source once and encode one rendition per size, largest
+    first so every resize starts from the previous (smaller) image.
+    Module-level and side-effect free so it can run in a worker process.
+    """
+    image = _open_source_image(data, content_type)
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+
+    renditions = {}
+    for size in sorted(sizes, reverse=True):
+        image.thumbnail((size, size))
+        buffer = io.BytesIO()
+        image.save(buffer, format=PREVIEW_FORMAT, quality=settings.DOCUMENTS_PREVIEW_QUALITY)
+        renditions[size] = buffer.getvalue()
+
+    return renditions
+
+
+def _get_process_pool() -> ProcessPoolExecutor | None:
+    global _process_pool
+
+    workers = settings.DOCUMENTS_PREVIEW_PROCESS_WORKERS
+    if workers <= 0:
+        return None
+
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=workers)
+    return _process_pool
+
+
+def previews_render(*, data: bytes, content_type: str) -> dict[int, bytes]:
+    """
+    Render all configured preview sizes for a file.
+
+    Rendering is CPU-bound, so with DOCUMENTS_PREVIEW_PROCESS_WORKERS > 0
+    it is shipped to a shared process pool; otherwise it runs inline
+    (the right choice inside prefork Celery workers, which are already
+    separate processes and may not fork children of their own).
+    """
+    sizes = list(settings.DOCUMENTS_PREVIEW_SIZES)
+    pool = _get_process_pool()
+
+    if pool is None:
+        return render_previews(data, content_type, sizes)
+
+    return pool.submit(render_previews, data, content_type, sizes).result()
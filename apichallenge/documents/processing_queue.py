@@ -0,0 +1,112 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Documents waiting for post-upload processing: a set, so enqueueing a
+# document twice before a run takes it (upload, then an immediate file
+# replacement) processes it once.
+PENDING_KEY = "documents:processing:pending"
+# Documents taken by a run, scored by when. A run that dies leaves its
+# documents here; they are requeued after DOCUMENTS_PROCESSING_CLAIM_TIMEOUT.
+CLAIMED_KEY = "documents:processing:claimed"
+# Set while a run is scheduled, so a burst of uploads schedules one run.
+SCHEDULED_KEY = "documents:processing:scheduled"
+
+# KEYS[1] pending set, KEYS[2] claimed sorted set
+# ARGV[1] count, ARGV[2] now, ARGV[3] claims older than this are requeued
+TAKE_LUA = """
+local stale = redis.call("ZRANGEBYSCORE", KEYS[2], "-inf", ARGV[3])
+for _, id in ipairs(stale) do
+    redis.call("SADD", KEYS[1], id)
+end
+if #stale > 0 then
+    redis.call("ZREMRANGEBYSCORE", KEYS[2], "-inf", ARGV[3])
+end
+
+local ids = redis.call("SPOP", KEYS[1], ARGV[1])
+for _, id in ipairs(ids) do
+    redis.call("ZADD", KEYS[2], ARGV[2], id)
+end
+return ids
+"""
+
+# Releases a run's claims, leaving those taken over by a later run alone.
+# KEYS[1] claimed sorted set, KEYS[2] (optional) pending set to requeue to
+# ARGV[1] the run's claim score, ARGV[2..] document IDs
+RELEASE_LUA = """
+local released = 0
+for i = 2, #ARGV do
+    if tonumber(redis.call("ZSCORE", KEYS[1], ARGV[i])) == tonumber(ARGV[1]) then
+        redis.call("ZREM", KEYS[1], ARGV[i])
+        if #KEYS > 1 then
+            redis.call("SADD", KEYS[2], ARGV[i])
+        end
+        released = released + 1
+    end
+end
+return released
+"""
+
+
+def _get_redis():
+    from django_redis import get_redis_connection
+
+    return get_redis_connection("default")
+
+
+def processing_enqueue(*, document_ids: list[int]) -> None:
+    """
+    Queue documents for post-upload processing and schedule a batch run
+    DOCUMENTS_PROCESSING_BATCH_DELAY seconds out, unless one is already
+    scheduled. Redis errors propagate, for the caller to retry.
+    """
+    from apichallenge.documents.tasks import process_documents_batch
+
+    if not document_ids:
+        return
+    _get_redis().sadd(PENDING_KEY, *document_ids)
+
+    # Expires with the periodic run, which also covers a lost schedule.
+    if cache.add(SCHEDULED_KEY, 1, settings.DOCUMENTS_PROCESSING_INTERVAL):
+        process_documents_batch.apply_async(countdown=settings.DOCUMENTS_PROCESSING_BATCH_DELAY)
+
+
+def processing_take(*, count: int) -> tuple[list[int], float]:
+    """
+    Claim up to `count` queued documents, first requeueing the claims of
+    runs that didn't finish within DOCUMENTS_PROCESSING_CLAIM_TIMEOUT.
+    Returns the documents and the claim, to release them with.
+    """
+    now = time.time()
+    take = _get_redis().register_script(TAKE_LUA)
+    ids = take(
+        keys=[PENDING_KEY, CLAIMED_KEY],
+        args=[count, now, now - settings.DOCUMENTS_PROCESSING_CLAIM_TIMEOUT],
+    )
+    return [int(document_id) for document_id in ids], now
+
+
+def processing_done(*, document_ids: list[int], claim: float) -> None:
+    """
+    Release the claims of processed (or failed) documents, unless their
+    claim timed out and another run has taken them since.
+    """
+    if document_ids:
+        release = _get_redis().register_script(RELEASE_LUA)
+        release(keys=[CLAIMED_KEY], args=[claim, *document_ids])
+
+
+def processing_requeue(*, document_ids: list[int], claim: float) -> None:
+    """
+    Put back claimed documents whose run failed, for the next run to take,
+    unless their claim timed out and another run has taken them since.
+    """
+    if document_ids:
+        release = _get_redis().register_script(RELEASE_LUA)
+        release(keys=[CLAIMED_KEY, PENDING_KEY], args=[claim, *document_ids])
+
+
+def processing_unschedule() -> None:
+    """Called when a run starts: uploads from here on schedule another run."""
+    cache.delete(SCHEDULED_KEY)
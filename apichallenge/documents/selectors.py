@@ -1,10 +1,15 @@
 import hashlib
 import logging
+from collections.abc import Iterable
 
 from django.core.cache import cache
-from django.db.models import QuerySet
+from django.db import connection
+from django.db.models import Q, QuerySet
 
-from apichallenge.documents.models import Document, AuditLog
+from apichallenge.common.cache import acache_get, acache_set
+from apichallenge.common.db_routing import use_primary
+from apichallenge.common.metrics import record_cache_lookup
+from apichallenge.documents.models import Document, DocumentTombstone, AuditLog
 from apichallenge.documents.filters import DocumentFilter
 
 logger = logging.getLogger(__name__)
@@ -28,19 +33,23 @@ def document_list(*, filters: dict | None = None) -> QuerySet[Document]:
     cached_ids = cache.get(cache_key)
 
     if cached_ids is not None:
+        record_cache_lookup(cache="list", hit=True)
         logger.debug("Cache HIT for %s", cache_key)
         # Preserve ordering from cached IDs
         qs = Document.objects.select_related("uploaded_by").filter(id__in=cached_ids)
         return qs
 
+    record_cache_lookup(cache="list", hit=False)
     logger.debug("Cache MISS for %s", cache_key)
     qs = Document.objects.select_related("uploaded_by").all()
 
     if filters:
         qs = DocumentFilter(filters, queryset=qs).qs
 
-    # Cache the list of document IDs
-    doc_ids = list(qs.values_list("id", flat=True))
+    # Cache the list of document IDs. Read from the primary: a lagging
+    # replica would otherwise be cached for much longer than it lags.
+    with use_primary():
+        doc_ids = list(qs.values_list("id", flat=True))
     cache.set(cache_key, doc_ids, CACHE_TTL)
 
     return qs
@@ -52,31 +61,153 @@ def document_get(*, pk: int) -> Document | None:
     cached = cache.get(cache_key)
 
     if cached is not None:
+        record_cache_lookup(cache="detail", hit=True)
         logger.debug("Cache HIT for %s", cache_key)
         return cached
 
+    record_cache_lookup(cache="detail", hit=False)
     logger.debug("Cache MISS for %s", cache_key)
     try:
-        doc = Document.objects.select_related("uploaded_by").get(pk=pk)
+        with use_primary():
+            doc = Document.objects.select_related("uploaded_by").get(pk=pk)
         cache.set(cache_key, doc, CACHE_TTL)
         return doc
     except Document.DoesNotExist:
         return None
 
 
-def invalidate_document_cache(document_id: int | None = None) -> None:
-    """Invalidate document caches after create/update/delete."""
-    # Always invalidate list caches (prefix-based)
-    # django-redis supports delete_pattern
+async def adocument_list(*, filters: dict | None = None) -> QuerySet[Document]:
+    """Async counterpart of document_list(), sharing its cache entries."""
+    cache_key = _build_list_cache_key(filters)
+    cached_ids = await acache_get(cache_key)
+
+    if cached_ids is not None:
+        record_cache_lookup(cache="list", hit=True)
+        logger.debug("Cache HIT for %s", cache_key)
+        return Document.objects.select_related("uploaded_by").filter(id__in=cached_ids)
+
+    record_cache_lookup(cache="list", hit=False)
+    logger.debug("Cache MISS for %s", cache_key)
+    qs = Document.objects.select_related("uploaded_by").all()
+
+    if filters:
+        qs = DocumentFilter(filters, queryset=qs).qs
+
+    with use_primary():
+        doc_ids = [pk async for pk in qs.values_list("id", flat=True)]
+    await acache_set(cache_key, doc_ids, CACHE_TTL)
+
+    return qs
+
+
+async def adocument_get(*, pk: int) -> Document | None:
+    """Async counterpart of document_get(), sharing its cache entries."""
+    cache_key = f"documents:detail:{pk}"
+    cached = await acache_get(cache_key)
+
+    if cached is not None:
+        record_cache_lookup(cache="detail", hit=True)
+        logger.debug("Cache HIT for %s", cache_key)
+        return cached
+
+    record_cache_lookup(cache="detail", hit=False)
+    logger.debug("Cache MISS for %s", cache_key)
     try:
-        cache.delete_pattern("documents:list:*")
-    except AttributeError:
-        # Fallback for non-redis cache backends (e.g. in tests)
-        cache.clear()
+        with use_primary():
+            doc = await Document.objects.select_related("uploaded_by").aget(pk=pk)
+        await acache_set(cache_key, doc, CACHE_TTL)
+        return doc
+    except Document.DoesNotExist:
+        return None
 
-    # Invalidate specific document detail cache
-    if document_id is not None:
-        cache.delete(f"documents:detail:{document_id}")
+
+def document_preview_get(*, document: Document, size: int | None = None) -> dict | None:
+    """
+    Pick the preview rendition that best fits `size`: the smallest one at
+    least that large, else the largest available. Defaults to the smallest.
+    """
+    if not document.previews:
+        return None
+
+    sizes = sorted(int(s) for s in document.previews)
+    if size is None:
+        chosen = sizes[0]
+    else:
+        chosen = next((s for s in sizes if s >= size), sizes[-1])
+
+    return {"size": chosen, **document.previews[str(chosen)]}
+
+
+def _change_key(change: Document | DocumentTombstone) -> tuple[int, int]:
+    return change.change_xid, change.change_seq
+
+
+def _changes_settled_below() -> int | None:
+    """
+    The oldest transaction id still in progress: every transaction below it
+    has committed or rolled back, so no change can appear below it later.
+    None where writes are serialized (sqlite in tests).
+    """
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint")
+        return cursor.fetchone()[0]
+
+
+def document_changes_since(
+    *, after: tuple[int, int], limit: int
+) -> tuple[list[Document | DocumentTombstone], bool]:
+    """
+    Return up to `limit` documents and tombstones changed after the
+    `(change_xid, change_seq)` position `after`, in change order, and
+    whether more are pending.
+
+    Only changes of finished transactions are returned, so one that commits
+    late can't land behind a cursor that has moved on: a long transaction
+    holds the sync back instead. For the same reason this reads from the
+    primary, whose snapshot the changes are checked against.
+    """
+    xid, seq = after
+    changed_after = Q(change_xid__gt=xid) | Q(change_xid=xid, change_seq__gt=seq)
+
+    with use_primary():
+        settled_below = _changes_settled_below()
+        if settled_below is not None:
+            changed_after &= Q(change_xid__lt=settled_below)
+
+        documents = (
+            Document.objects.select_related("uploaded_by")
+            .filter(changed_after)
+            .order_by("change_xid", "change_seq")[: limit + 1]
+        )
+        tombstones = DocumentTombstone.objects.filter(changed_after).order_by("change_xid", "change_seq")[
+            : limit + 1
+        ]
+        changes = sorted([*documents, *tombstones], key=_change_key)
+    return changes[:limit], len(changes) > limit
+
+
+def invalidate_document_cache(
+    document_id: int | None = None, *, document_ids: Iterable[int] = (), lists: bool = True
+) -> None:
+    """
+    Invalidate document caches after create/update/delete. List caches only
+    hold IDs: `lists=False` skips them for changes that can't alter a list.
+    """
+    # Invalidate list caches (prefix-based)
+    # django-redis supports delete_pattern
+    if lists:
+        try:
+            cache.delete_pattern("documents:list:*")
+        except AttributeError:
+            # Fallback for non-redis cache backends (e.g. in tests)
+            cache.clear()
+
+    # Invalidate specific document detail caches
+    document_ids = {*document_ids, *([document_id] if document_id is not None else [])}
+    if document_ids:
+        cache.delete_many([f"documents:detail:{pk}" for pk in document_ids])
 
 
 def audit_log_list(*, document_id: int | None = None) -> QuerySet[AuditLog]:
@@ -1,8 +1,28 @@
-from django.db import transaction
-
-from apichallenge.documents.models import Document, AuditLog
+import logging
+from collections.abc import Callable
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from apichallenge.documents.models import (
+    DOCUMENT_CHANGE_SEQUENCE,
+    AuditLog,
+    Document,
+    DocumentTombstone,
+    OutboxMessage,
+    StorageDeletion,
+)
+from apichallenge.documents.notifications import notify_document_change, notify_document_processing
+from apichallenge.documents.outbox import outbox_enqueue
 from apichallenge.users.models import BaseUser
 
+logger = logging.getLogger(__name__)
+
 
 def _get_client_ip(request) -> str | None:
     """Extract client IP from request."""
@@ -14,6 +34,32 @@ def _get_client_ip(request) -> str | None:
     return request.META.get("REMOTE_ADDR")
 
 
+def document_change_next() -> dict[str, int]:
+    """
+    Allocate the next position in the global document change order, as the
+    `change_xid` and `change_seq` fields of the changed row or tombstone.
+
+    Sequence numbers are taken before commit, so they don't commit in order;
+    syncing clients follow the writing transaction's id instead (see
+    selectors.document_changes_since), with the sequence ordering the
+    changes of one transaction. Call it in the transaction that writes the change.
+    """
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_current_xact_id()::text::bigint, nextval(%s)", [DOCUMENT_CHANGE_SEQUENCE]
+            )
+            xid, seq = cursor.fetchone()
+        return {"change_xid": xid, "change_seq": seq}
+
+    # Other backends (sqlite in tests) have no sequences but serialize writes.
+    latest = max(
+        Document.objects.aggregate(seq=Max("change_seq"))["seq"] or 0,
+        DocumentTombstone.objects.aggregate(seq=Max("change_seq"))["seq"] or 0,
+    )
+    return {"change_xid": latest + 1, "change_seq": latest + 1}
+
+
 def create_audit_log(
     *,
     user: BaseUser,
@@ -51,6 +97,7 @@ def document_create(
         file_size=file.size,
         content_type=getattr(file, "content_type", ""),
         uploaded_by=uploaded_by,
+        **document_change_next(),
     )
     document.full_clean()
     document.save()
@@ -63,15 +110,10 @@ def document_create(
         details=f"Uploaded file: {file.name} ({file.size} bytes)",
     )
 
-    # Send real-time WebSocket notification
-    from apichallenge.documents.notifications import notify_document_change
-
+    # Side effects run after commit, from the outbox
     notify_document_change(action="created", document=document, user=uploaded_by)
-
-    # Invalidate list caches
-    from apichallenge.documents.selectors import invalidate_document_cache
-
-    invalidate_document_cache()
+    _document_cache_invalidate()
+    outbox_enqueue(topic=OutboxMessage.Topic.PROCESS, payload={"document_id": document.id})
 
     return document
 
@@ -99,15 +141,18 @@ def document_update(
 
     if file is not None:
         changes.append(f"file replaced: {document.file_name} → {file.name}")
-        # Delete old file from storage
-        if document.file:
-            document.file.delete(save=False)
+        # The old file and its previews are deleted from storage after the grace period
+        _document_files_delete(document=document)
         document.file = file
         document.file_name = file.name
         document.file_size = file.size
         document.content_type = getattr(file, "content_type", "")
+        document.processing_status = Document.ProcessingStatus.PENDING
+        document.processing_progress = 0
 
     if changes:
+        for field, value in document_change_next().items():
+            setattr(document, field, value)
         document.full_clean()
         document.save()
 
@@ -119,15 +164,11 @@ def document_update(
             details="; ".join(changes),
         )
 
-        # Send real-time WebSocket notification
-        from apichallenge.documents.notifications import notify_document_change
-
+        # Side effects run after commit, from the outbox
         notify_document_change(action="updated", document=document, user=updated_by)
-
-        # Invalidate caches
-        from apichallenge.documents.selectors import invalidate_document_cache
-
-        invalidate_document_cache(document_id=document.id)
+        _document_cache_invalidate(document_id=document.id)
+        if file is not None:
+            outbox_enqueue(topic=OutboxMessage.Topic.PROCESS, payload={"document_id": document.id})
 
     return document
 
@@ -151,14 +192,150 @@ def document_delete(
         details=f"Deleted document: {title} ({file_name})",
     )
 
-    # Delete file from storage
-    if document.file:
-        document.file.delete(save=False)
+    # The file and its previews are deleted from storage after the grace
+    # period, and stay if the deletion rolls back
+    _document_files_delete(document=document)
+
+    # Side effects run after commit, from the outbox; while the document still has its id
+    notify_document_change(action="deleted", document=document, user=deleted_by)
 
+    # Syncing clients learn about the deletion from its tombstone (signals.py)
     doc_id = document.id
     document.delete()
 
-    # Invalidate caches
+    _document_cache_invalidate(document_id=doc_id)
+
+
+def _document_files_delete(*, document: Document) -> None:
+    """
+    Queue a document's file and preview renditions for deletion from
+    storage once DOCUMENTS_STORAGE_DELETE_GRACE_PERIOD has passed.
+    """
+    keys = [preview["key"] for preview in document.previews.values()]
+    if document.file:
+        keys.insert(0, document.file.name)
+
+    purge_after = timezone.now() + timedelta(seconds=settings.DOCUMENTS_STORAGE_DELETE_GRACE_PERIOD)
+    StorageDeletion.objects.bulk_create(
+        StorageDeletion(key=key, document_id=document.id, purge_after=purge_after) for key in keys
+    )
+    document.previews = {}
+
+
+def storage_deletions_cancel(*, document_id: int | None = None, keys: list[str] | None = None) -> int:
+    """
+    Keep objects that are queued for deletion, by document or by key, e.g.
+    to restore a deleted document from a database backup. Only possible
+    within the grace period. Returns the number of cancelled deletions.
+    """
+    assert document_id is not None or keys is not None, "Pass a document_id or keys"
+
+    deletions = StorageDeletion.objects.filter(purge_after__gt=timezone.now())
+    if document_id is not None:
+        deletions = deletions.filter(document_id=document_id)
+    if keys is not None:
+        deletions = deletions.filter(key__in=keys)
+
+    cancelled, _ = deletions.delete()
+    return cancelled
+
+
+def _document_cache_invalidate(*, document_id: int | None = None) -> None:
+    """
+    Invalidate the list caches (and a document's detail cache) after commit:
+    invalidating before it would let a concurrent read cache the old rows again.
+    Done inline, so the writer's next read sees the change; the outbox repeats
+    it if that fails, and for reads that cached old rows just before the commit.
+    """
     from apichallenge.documents.selectors import invalidate_document_cache
 
-    invalidate_document_cache(document_id=doc_id)
+    transaction.on_commit(lambda: invalidate_document_cache(document_id=document_id), robust=True)
+    outbox_enqueue(topic=OutboxMessage.Topic.INVALIDATE_CACHE, payload={"document_id": document_id})
+
+
+def document_processing_update(*, document: Document, status: str, progress: int) -> bool:
+    """
+    Record the processing status and progress (percent) of a document's
+    current file and push them to its WebSocket clients. Status changes
+    are document changes for syncing clients; progress alone is not.
+    Returns False if the file was replaced or the document deleted meanwhile.
+    """
+    updates = {"processing_status": status, "processing_progress": progress}
+    status_changed = status != document.processing_status
+    # The change position must be taken in the transaction that writes it
+    with transaction.atomic():
+        if status_changed:
+            updates.update(document_change_next())
+        if not Document.objects.filter(pk=document.pk, file=document.file.name).update(**updates):
+            return False
+    document.processing_status = status
+    document.processing_progress = progress
+
+    from apichallenge.documents.selectors import invalidate_document_cache
+
+    invalidate_document_cache(document_id=document.id, lists=False)
+    notify_document_processing(document=document, status_changed=status_changed)
+    return True
+
+
+def document_previews_generate(
+    *, document: Document, on_progress: Callable[[int], None] | None = None
+) -> dict:
+    """
+    Render thumbnail previews for a document's file, store them next to
+    the original and record them on the document. `on_progress(percent)`
+    is called as the file is read, rendered and the previews are stored.
+    Returns {} if the file was replaced meanwhile.
+    Raises if the file can't be read or rendered.
+    """
+    progress = on_progress or (lambda percent: None)
+
+    from apichallenge.documents.previews import (
+        can_render_preview,
+        preview_etag,
+        preview_path,
+        previews_render,
+    )
+
+    if not document.file or not can_render_preview(document.content_type):
+        return {}
+
+    if document.file_size > settings.DOCUMENTS_PREVIEW_MAX_SOURCE_SIZE:
+        logger.info("Document #%s is too large for previews, skipping.", document.id)
+        return {}
+
+    with document.file.open("rb") as f:
+        data = f.read()
+    progress(30)
+
+    renditions = previews_render(data=data, content_type=document.content_type)
+    progress(60)
+
+    previews = {}
+    for i, (size, content) in enumerate(renditions.items(), start=1):
+        key = default_storage.save(
+            preview_path(file_name=document.file.name, size=size), ContentFile(content)
+        )
+        previews[str(size)] = {"key": key, "etag": preview_etag(content)}
+        progress(60 + 30 * i // len(renditions))
+
+    # Previews are derived data: don't bump updated_at or send notifications.
+    # Previews of a file that was replaced meanwhile are not recorded, and
+    # nothing else refers to them.
+    with transaction.atomic():
+        updated = Document.objects.filter(pk=document.pk, file=document.file.name).update(
+            previews=previews,
+            **document_change_next(),
+        )
+    if not updated:
+        from apichallenge.documents.storage import storage_objects_delete
+
+        storage_objects_delete(keys=[preview["key"] for preview in previews.values()])
+        return {}
+    document.previews = previews
+
+    from apichallenge.documents.selectors import invalidate_document_cache
+
+    invalidate_document_cache(document_id=document.id)
+
+    return previews
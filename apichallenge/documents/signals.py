@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from apichallenge.documents.models import Document, DocumentTombstone
+from apichallenge.documents.services import document_change_next
+
+
+@receiver(post_delete, sender=Document)
+def record_document_tombstone(sender, instance, **kwargs):
+    """Every deletion, also cascades from a deleted user and admin deletes, is a change for syncing clients."""
+    DocumentTombstone.objects.create(document_id=instance.pk, **document_change_next())
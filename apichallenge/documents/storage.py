@@ -0,0 +1,148 @@
+import asyncio
+import logging
+import weakref
+from collections.abc import AsyncIterator, Iterable, Iterator
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.files.storage import default_storage
+
+from apichallenge.common.metrics import instrument_s3_client
+
+logger = logging.getLogger(__name__)
+
+# S3 / MinIO hard limits
+LIST_OBJECTS_PAGE_SIZE = 1000
+DELETE_OBJECTS_BATCH_SIZE = 1000
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# One aiobotocore client per event loop, created on first use.
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, object]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _get_client_and_bucket(storage=None):
+    """Return the low-level boto3 client and bucket name behind a storage."""
+    storage = storage or default_storage
+    return storage.connection.meta.client, storage.bucket_name
+
+
+def storage_object_pages(*, prefix: str, storage=None) -> Iterator[list[dict]]:
+    """
+    Stream the objects under `prefix` one `list_objects_v2` page at a time.
+    Only a single page is held in memory, regardless of bucket size.
+    """
+    client, bucket = _get_client_and_bucket(storage)
+    paginator = client.get_paginator("list_objects_v2")
+
+    for page in paginator.paginate(
+        Bucket=bucket,
+        Prefix=prefix,
+        PaginationConfig={"PageSize": LIST_OBJECTS_PAGE_SIZE},
+    ):
+        yield page.get("Contents", [])
+
+
+def storage_objects_delete(
+    *, keys: Iterable[str], storage=None, failed: list[str] | None = None
+) -> int:
+    """
+    Delete `keys` with as few `DeleteObjects` calls as possible (one
+    `delete()` per key on non-S3 storages). Deleting a missing key succeeds.
+    Returns the number of keys the backend reported as deleted; the others
+    are appended to `failed`, if given.
+    """
+    storage = storage or default_storage
+    keys = list(keys)
+    deleted = 0
+
+    if not _is_s3_storage(storage):
+        for key in keys:
+            try:
+                storage.delete(key)
+            except Exception as e:
+                logger.warning("Failed to delete %s from storage: %s", key, e)
+                if failed is not None:
+                    failed.append(key)
+            else:
+                deleted += 1
+        return deleted
+
+    client, bucket = _get_client_and_bucket(storage)
+
+    for start in range(0, len(keys), DELETE_OBJECTS_BATCH_SIZE):
+        batch = keys[start:start + DELETE_OBJECTS_BATCH_SIZE]
+        response = client.delete_objects(
+            Bucket=bucket,
+            Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True},
+        )
+        errors = response.get("Errors", [])
+        for error in errors:
+            logger.warning(
+                "Failed to delete %s from storage: %s", error.get("Key"), error.get("Message")
+            )
+            if failed is not None:
+                failed.append(error.get("Key"))
+        deleted += len(batch) - len(errors)
+
+    return deleted
+
+
+async def _get_async_s3_client():
+    import aiobotocore.session
+
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        session = aiobotocore.session.get_session()
+        client = await session.create_client(
+            "s3",
+            endpoint_url=settings.AWS_S3_ENDPOINT_URL,
+            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+            use_ssl=settings.AWS_S3_USE_SSL,
+            verify=settings.AWS_S3_VERIFY,
+        ).__aenter__()
+        instrument_s3_client(client)
+        _async_clients[loop] = client
+    return client
+
+
+def _is_s3_storage(storage) -> bool:
+    return hasattr(storage, "bucket_name") and hasattr(storage, "connection")
+
+
+def _supports_async_s3(storage) -> bool:
+    try:
+        import aiobotocore  # noqa: F401
+        from storages.backends.s3 import S3Storage
+    except ImportError:
+        return False
+    # The aiobotocore client is built from the AWS_* settings, as S3Storage's is.
+    return isinstance(storage, S3Storage)
+
+
+async def astorage_stream(*, name: str, storage=None) -> AsyncIterator[bytes]:
+    """
+    Stream a stored file in chunks without blocking the event loop.
+    S3 / MinIO objects are read with aiobotocore; other backends (or a
+    missing aiobotocore) fall back to the sync file API in a thread.
+    """
+    storage = storage or default_storage
+
+    if _supports_async_s3(storage):
+        client = await _get_async_s3_client()
+        response = await client.get_object(Bucket=storage.bucket_name, Key=name)
+        async with response["Body"] as body:
+            while chunk := await body.read(STREAM_CHUNK_SIZE):
+                yield chunk
+        return
+
+    f = await sync_to_async(storage.open, thread_sensitive=False)(name, "rb")
+    try:
+        while chunk := await sync_to_async(f.read, thread_sensitive=False)(STREAM_CHUNK_SIZE):
+            yield chunk
+    finally:
+        await sync_to_async(f.close, thread_sensitive=False)()
@@ -1,25 +1,129 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
 
 from celery import shared_task
+from django.conf import settings
+from django.db import connections, models, transaction
+from django.utils import timezone
 
-from apichallenge.documents.models import Document
+from apichallenge.common.task_status import StatusTrackedTask
+from apichallenge.documents.models import Document, DocumentTombstone, StorageDeletion
+from apichallenge.documents.outbox import outbox_relay
+from apichallenge.documents.processing_queue import (
+    processing_done,
+    processing_requeue,
+    processing_take,
+    processing_unschedule,
+)
+from apichallenge.documents.services import document_previews_generate, document_processing_update
+from apichallenge.documents.storage import (
+    DELETE_OBJECTS_BATCH_SIZE,
+    storage_object_pages,
+    storage_objects_delete,
+)
 
 logger = logging.getLogger(__name__)
 
 
-@shared_task(bind=True, max_retries=3)
+# The document's processing_status is its result.
+@shared_task(bind=True, max_retries=3, ignore_result=True)
 def process_document_after_upload(self, document_id: int):
     """
     Background task that runs after a document is uploaded.
     Can be extended for: virus scanning, thumbnail generation,
     metadata extraction, indexing, etc.
+
+    Uploads are normally processed in batches by process_documents_batch;
+    this processes a single document.
     """
     try:
-        document = Document.objects.get(id=document_id)
+        document = Document.objects.select_related("uploaded_by").get(id=document_id)
     except Document.DoesNotExist:
         logger.warning("Document %s not found for processing.", document_id)
         return
 
+    _process_document(document)
+
+
+@shared_task(ignore_result=True, soft_time_limit=60 * 5, time_limit=60 * 5 + 30)
+def process_documents_batch(max_batches: int = 4) -> int:
+    """
+    Process the documents queued by processing_enqueue(), in batches of
+    DOCUMENTS_PROCESSING_BATCH_SIZE: each batch is loaded with one query and
+    processed by up to DOCUMENTS_PROCESSING_CONCURRENCY threads, which
+    overlap the storage reads and writes. Scheduled after uploads and
+    periodically (DOCUMENTS_PROCESSING_INTERVAL).
+    """
+    if not settings.DOCUMENTS_PROCESSING_BATCHED:
+        return 0
+    processing_unschedule()
+
+    batch_size = settings.DOCUMENTS_PROCESSING_BATCH_SIZE
+    processed = 0
+    for _ in range(max_batches):
+        document_ids, claim = processing_take(count=batch_size)
+        if not document_ids:
+            break
+        try:
+            documents = list(Document.objects.select_related("uploaded_by").filter(id__in=document_ids))
+            _process_documents(documents)
+        except Exception:
+            # Not processed (e.g. the batch didn't load, or the time limit hit):
+            # back to the queue. Should that fail too, the claim timeout requeues them.
+            processing_requeue(document_ids=document_ids, claim=claim)
+            raise
+        processing_done(document_ids=document_ids, claim=claim)
+        processed += len(document_ids)
+        if len(document_ids) < batch_size:
+            break
+    else:
+        # More may be queued: continue in a new task, within its own time limit.
+        process_documents_batch.delay()
+
+    if processed:
+        logger.info("Processed a batch of %s documents.", processed)
+    return processed
+
+
+def _process_documents(documents: list[Document]) -> None:
+    concurrency = min(settings.DOCUMENTS_PROCESSING_CONCURRENCY, len(documents))
+    if concurrency <= 1:
+        for document in documents:
+            _process_document_logged(document)
+        return
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(_process_document_in_thread, documents))
+
+
+def _process_document_in_thread(document: Document) -> None:
+    try:
+        _process_document_logged(document)
+    finally:
+        # Database connections are per thread; don't leave them open.
+        connections.close_all()
+
+
+def _process_document_logged(document: Document) -> None:
+    """A failed document is marked failed; the rest of its batch goes on."""
+    try:
+        _process_document(document)
+    except Exception:
+        logger.exception("Document #%s processing failed.", document.id)
+
+
+def _process_document(document: Document) -> None:
+    """
+    Move the document through pending → processing → ready (or failed),
+    reporting progress on the way; each step is pushed to WebSocket clients.
+    """
+    Status = Document.ProcessingStatus
+
+    if document.processing_status == Status.READY:
+        logger.info("Document #%s is already processed, skipping.", document.id)
+        return
+
     logger.info(
         "Processing document #%s: %s (%s bytes)",
         document.id,
@@ -27,15 +131,166 @@ def process_document_after_upload(self, document_id: int):
         document.file_size,
     )
 
+    def report(progress: int) -> None:
+        document_processing_update(document=document, status=Status.PROCESSING, progress=progress)
+
+    if not document_processing_update(document=document, status=Status.PROCESSING, progress=0):
+        logger.info("Document #%s file changed before processing, skipping.", document.id)
+        return
+
+    try:
+        previews = document_previews_generate(document=document, on_progress=report)
+    except Exception:
+        document_processing_update(
+            document=document, status=Status.FAILED, progress=document.processing_progress
+        )
+        raise
+    if previews:
+        logger.info("Document #%s previews rendered: %s", document.id, sorted(previews, key=int))
+
+    document_processing_update(document=document, status=Status.READY, progress=100)
     logger.info("Document #%s processing complete.", document.id)
 
 
-@shared_task
-def cleanup_orphaned_files():
+# Acked on receipt: an unacked message is requeued by RabbitMQ after its
+# consumer_timeout (30 minutes), before this task's time limit. The next
+# daily run picks up whatever a lost run left.
+@shared_task(
+    base=StatusTrackedTask, acks_late=False, soft_time_limit=60 * 60, time_limit=60 * 60 + 60
+)
+def cleanup_orphaned_files(dry_run: bool | None = None) -> dict:
     """
     Periodic task to remove files in storage that are no longer
     referenced by any Document record.
+
+    Storage is walked one `list_objects_v2` page at a time and each page
+    is matched against `Document.file` with a single query, so memory use
+    stays constant however large the bucket grows. Objects younger than
+    DOCUMENTS_ORPHAN_GRACE_PERIOD are skipped: they may belong to an
+    upload whose transaction has not committed yet. So are objects queued
+    for deletion, which are kept until their grace period ends.
+    """
+    if dry_run is None:
+        dry_run = settings.DOCUMENTS_ORPHAN_CLEANUP_DRY_RUN
+
+    cutoff = timezone.now() - timedelta(seconds=settings.DOCUMENTS_ORPHAN_GRACE_PERIOD)
+    stats = {"scanned": 0, "skipped_recent": 0, "referenced": 0, "orphaned": 0, "deleted": 0}
+    pending: list[str] = []
+
+    logger.info("Running orphaned file cleanup (dry_run=%s)...", dry_run)
+
+    for page in storage_object_pages(prefix=settings.DOCUMENTS_STORAGE_PREFIX):
+        stats["scanned"] += len(page)
+
+        candidates = []
+        for obj in page:
+            if obj["LastModified"] > cutoff:
+                stats["skipped_recent"] += 1
+                continue
+            candidates.append(obj["Key"])
+
+        if not candidates:
+            continue
+
+        referenced = set(
+            Document.objects.filter(file__in=candidates).values_list("file", flat=True)
+        )
+        referenced.update(
+            StorageDeletion.objects.filter(key__in=candidates).values_list("key", flat=True)
+        )
+        orphans = [key for key in candidates if key not in referenced]
+        stats["referenced"] += len(candidates) - len(orphans)
+        stats["orphaned"] += len(orphans)
+
+        if dry_run:
+            for key in orphans:
+                logger.info("Orphaned file (dry run): %s", key)
+            continue
+
+        pending.extend(orphans)
+        if len(pending) >= DELETE_OBJECTS_BATCH_SIZE:
+            stats["deleted"] += storage_objects_delete(keys=pending)
+            pending = []
+
+    if pending:
+        stats["deleted"] += storage_objects_delete(keys=pending)
+
+    logger.info("Orphaned file cleanup complete: %s", stats)
+    return stats
+
+
+@shared_task(ignore_result=True)
+def purge_storage_deletions() -> int:
+    """
+    Periodic task to delete the objects whose deletion grace period has
+    ended, DELETE_OBJECTS_BATCH_SIZE keys per `DeleteObjects` call. Keys
+    that fail are retried on later runs, up to DOCUMENTS_STORAGE_PURGE_MAX_ATTEMPTS.
+    """
+    purged = 0
+    while True:
+        with transaction.atomic():
+            deletions = list(
+                StorageDeletion.objects.select_for_update(skip_locked=True)
+                .filter(
+                    purge_after__lte=timezone.now(),
+                    attempts__lt=settings.DOCUMENTS_STORAGE_PURGE_MAX_ATTEMPTS,
+                )
+                .order_by("purge_after")[:DELETE_OBJECTS_BATCH_SIZE]
+            )
+            if not deletions:
+                break
+
+            failed: list[str] = []
+            purged += storage_objects_delete(keys=[d.key for d in deletions], failed=failed)
+            failed_keys = set(failed)
+            failed_ids = {d.id for d in deletions if d.key in failed_keys}
+            StorageDeletion.objects.filter(id__in=[d.id for d in deletions if d.id not in failed_ids]).delete()
+            StorageDeletion.objects.filter(id__in=failed_ids).update(attempts=models.F("attempts") + 1)
+
+        # Failed keys wait for the next run.
+        if failed_ids or len(deletions) < DELETE_OBJECTS_BATCH_SIZE:
+            break
+
+    if purged:
+        logger.info("Purged %s objects from storage.", purged)
+    return purged
+
+
+@shared_task(base=StatusTrackedTask)
+def prune_document_tombstones() -> int:
+    """
+    Periodic task to drop tombstones older than DOCUMENTS_SYNC_TOMBSTONE_TTL,
+    DOCUMENTS_SYNC_TOMBSTONE_PRUNE_BATCH_SIZE rows per DELETE so a large
+    backlog never holds long locks. Sync cursors expire after the same
+    period, so no client still needs them.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.DOCUMENTS_SYNC_TOMBSTONE_TTL)
+    batch_size = settings.DOCUMENTS_SYNC_TOMBSTONE_PRUNE_BATCH_SIZE
+    pruned = 0
+    while True:
+        ids = list(
+            DocumentTombstone.objects.filter(deleted_at__lt=cutoff)
+            .order_by("id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        deleted, _ = DocumentTombstone.objects.filter(id__in=ids).delete()
+        pruned += deleted
+        if len(ids) < batch_size:
+            break
+
+    logger.info("Pruned %s document tombstones.", pruned)
+    return pruned
+
+
+@shared_task(ignore_result=True)
+def relay_outbox() -> int:
+    """
+    Perform the side effects recorded in the outbox by document writes.
+    Scheduled after each commit and periodically (DOCUMENTS_OUTBOX_RELAY_INTERVAL).
     """
-    logger.info("Running orphaned file cleanup...")
-    # Implementation depends on storage backend
-    logger.info("Orphaned file cleanup complete.")
+    relayed = outbox_relay()
+    if relayed:
+        logger.info("Relayed %s outbox messages.", relayed)
+    return relayed
@@ -0,0 +1,62 @@
+from asgiref.sync import sync_to_async
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.cache import cache
+from django.test import TransactionTestCase, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apichallenge.users.models import BaseUser, Role
+from apichallenge.documents.models import AuditLog
+from apichallenge.documents.services import document_create
+
+
+class AsyncDocumentApiTests(TransactionTestCase):
+    """Test the async (ASGI) read endpoints."""
+
+    def setUp(self):
+        default_storage.clear()
+        self.viewer = BaseUser.objects.create_user(
+            username="viewer_async", password="Viewer@12345", role=Role.VIEWER
+        )
+        self.doc = document_create(
+            title="Async",
+            file=SimpleUploadedFile("a.txt", b"async body", content_type="text/plain"),
+            uploaded_by=self.viewer,
+        )
+        self.auth = {"headers": {"Authorization": f"Bearer {AccessToken.for_user(self.viewer)}"}}
+
+    async def test_list(self):
+        resp = await self.async_client.get("/api/documents/async/?limit=5", **self.auth)
+        self.assertEqual(resp.status_code, 200)
+        data = resp.json()
+        self.assertEqual(data["count"], 1)
+        self.assertEqual(data["limit"], 5)
+        self.assertEqual(data["results"][0]["title"], "Async")
+
+    async def test_list_unauthenticated(self):
+        resp = await self.async_client.get("/api/documents/async/")
+        self.assertEqual(resp.status_code, 401)
+
+    async def test_detail_not_found(self):
+        resp = await self.async_client.get("/api/documents/async/99999/", **self.auth)
+        self.assertEqual(resp.status_code, 404)
+
+    async def test_download_streams_file(self):
+        resp = await self.async_client.get(f"/api/documents/async/{self.doc.id}/download/", **self.auth)
+        self.assertEqual(resp.status_code, 200)
+        body = b"".join([chunk async for chunk in resp.streaming_content])
+        self.assertEqual(body, b"async body")
+        logged = await sync_to_async(
+            AuditLog.objects.filter(document_id=self.doc.id, action=AuditLog.Action.DOWNLOAD).count
+        )()
+        self.assertEqual(logged, 1)
+
+    @override_settings(API_THROTTLE_ENABLED=True, API_THROTTLE_RATES={"read": {"default": "1/min"}})
+    async def test_list_throttled(self):
+        await sync_to_async(cache.clear)()
+        resp = await self.async_client.get("/api/documents/async/", **self.auth)
+        self.assertEqual(resp["RateLimit-Limit"], "1")
+
+        resp = await self.async_client.get("/api/documents/async/", **self.auth)
+        self.assertEqual(resp.status_code, 429)
+        self.assertIn("Retry-After", resp)
@@ -0,0 +1,219 @@
+import asyncio
+from collections import deque
+from unittest import mock
+
+import fakeredis
+from channels.db import database_sync_to_async
+from channels.testing import WebsocketCommunicator
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from prometheus_client import REGISTRY
+from rest_framework_simplejwt.tokens import AccessToken
+
+from config.asgi import application
+from apichallenge.users.models import BaseUser, Role
+from apichallenge.documents.consumers import CLOSE_SLOW_CONSUMER, DocumentNotificationConsumer
+from apichallenge.documents.event_stream import EventStreamGap, event_stream_append, event_stream_read_after
+from apichallenge.documents.models import Document
+from apichallenge.documents.notifications import notify_document_change
+
+
+class DocumentNotificationConsumerTests(TransactionTestCase):
+    """Test WebSocket authentication and targeted notification groups."""
+
+    def setUp(self):
+        self.editor = BaseUser.objects.create_user(
+            username="editor_ws", password="Editor@12345", role=Role.EDITOR
+        )
+        self.viewer = BaseUser.objects.create_user(
+            username="viewer_ws", password="Viewer@12345", role=Role.VIEWER
+        )
+        self.doc = Document.objects.create(
+            title="WS", file="documents/1/ws.txt", file_name="ws.txt", uploaded_by=self.editor
+        )
+        self.other_doc = Document.objects.create(
+            title="Other", file="documents/1/other.txt", file_name="other.txt", uploaded_by=self.editor
+        )
+
+    def _connect(self, user, **kwargs):
+        token = str(AccessToken.for_user(user))
+        return WebsocketCommunicator(application, f"/ws/documents/?token={token}", **kwargs)
+
+    async def _notify(self, document):
+        await database_sync_to_async(notify_document_change)(
+            action="updated", document=document, user=self.editor
+        )
+
+    async def test_rejects_anonymous(self):
+        communicator = WebsocketCommunicator(application, "/ws/documents/")
+        connected, _ = await communicator.connect()
+        self.assertFalse(connected)
+
+    async def test_token_subprotocol(self):
+        token = str(AccessToken.for_user(self.viewer))
+        communicator = WebsocketCommunicator(
+            application, "/ws/documents/", subprotocols=["access_token", token]
+        )
+        connected, subprotocol = await communicator.connect()
+        self.assertTrue(connected)
+        self.assertEqual(subprotocol, "access_token")
+        await communicator.disconnect()
+
+    async def test_only_subscribed_documents_are_delivered(self):
+        communicator = self._connect(self.viewer)
+        await communicator.connect()
+
+        await communicator.send_json_to({"action": "subscribe", "documents": [self.doc.id]})
+        ack = await communicator.receive_json_from()
+        self.assertEqual(ack["documents"], [self.doc.id])
+
+        await self._notify(self.other_doc)
+        await self._notify(self.doc)
+        event = await communicator.receive_json_from()
+        self.assertEqual(event["document"]["id"], self.doc.id)
+        self.assertTrue(await communicator.receive_nothing())
+        await communicator.disconnect()
+
+    async def test_uploader_receives_event_once(self):
+        communicator = self._connect(self.editor)
+        await communicator.connect()
+        await communicator.send_json_to({"action": "subscribe", "documents": [self.doc.id], "feed": True})
+        await communicator.receive_json_from()
+
+        await self._notify(self.doc)
+        event = await communicator.receive_json_from()
+        self.assertEqual(event["type"], "updated")
+        self.assertTrue(await communicator.receive_nothing())
+        await communicator.disconnect()
+
+
+@override_settings(DOCUMENTS_EVENT_STREAM_ENABLED=True, DOCUMENTS_EVENT_STREAM_MAXLEN=3)
+class DocumentEventReplayTests(TransactionTestCase):
+    """Test resuming a WebSocket connection from the last seen event."""
+
+    def setUp(self):
+        self.editor = BaseUser.objects.create_user(
+            username="editor_replay", password="Editor@12345", role=Role.EDITOR
+        )
+        self.doc = Document.objects.create(
+            title="R", file="documents/1/r.txt", file_name="r.txt", uploaded_by=self.editor
+        )
+        self.token = str(AccessToken.for_user(self.editor))
+        patcher = mock.patch(
+            "apichallenge.documents.event_stream._get_redis", return_value=fakeredis.FakeRedis()
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def _notify(self, title):
+        self.doc.title = title
+        await database_sync_to_async(notify_document_change)(
+            action="updated", document=self.doc, user=self.editor
+        )
+
+    async def test_replays_missed_events(self):
+        communicator = WebsocketCommunicator(application, f"/ws/documents/?token={self.token}")
+        await communicator.connect()
+        await self._notify("first")
+        first = await communicator.receive_json_from()
+        await communicator.disconnect()
+
+        await self._notify("missed")
+
+        communicator = WebsocketCommunicator(
+            application, f"/ws/documents/?token={self.token}&last_event_id={first['id']}"
+        )
+        await communicator.connect()
+        replay = await communicator.receive_json_from()
+        self.assertEqual(replay["type"], "replay")
+        self.assertEqual([e["document"]["title"] for e in replay["events"]], ["missed"])
+
+        await self._notify("live")
+        live = await communicator.receive_json_from()
+        self.assertEqual(live["document"]["title"], "live")
+        await communicator.disconnect()
+
+    async def test_resync_when_events_were_trimmed(self):
+        for i in range(5):
+            await self._notify(f"event {i}")
+
+        communicator = WebsocketCommunicator(
+            application, f"/ws/documents/?token={self.token}&last_event_id=1-0"
+        )
+        await communicator.connect()
+        self.assertEqual(await communicator.receive_json_from(), {"type": "resync"})
+        await communicator.disconnect()
+
+    def test_replay_from_the_trim_boundary(self):
+        events = [([str(i)], {"n": i}) for i in range(4)]
+        event_stream_append(events)
+
+        # The first event was trimmed; nothing after it was.
+        replay = event_stream_read_after(last_event_id=events[0][1]["id"], groups={"1", "2", "3"})
+        self.assertEqual([event["n"] for event in replay], [1, 2, 3])
+        with self.assertRaises(EventStreamGap):
+            event_stream_read_after(last_event_id="1-0", groups={"1"})
+
+    async def test_resync_when_the_stream_is_gone(self):
+        communicator = WebsocketCommunicator(
+            application, f"/ws/documents/?token={self.token}&last_event_id=1-0"
+        )
+        await communicator.connect()
+        self.assertEqual(await communicator.receive_json_from(), {"type": "resync"})
+        await communicator.disconnect()
+
+
+class SlowConsumerTests(SimpleTestCase):
+    """Test the bounded per-connection send queue."""
+
+    def _consumer(self):
+        consumer = DocumentNotificationConsumer()
+        consumer.user = mock.Mock(id=1)
+        consumer.outbox = deque()
+        consumer.outbox_ready = asyncio.Event()
+        consumer.dropped_frames = 0
+        consumer.closing = False
+        consumer.close = mock.AsyncMock()
+        return consumer
+
+    @override_settings(DOCUMENTS_WS_SEND_QUEUE_SIZE=2, DOCUMENTS_WS_OVERFLOW_POLICY="drop_oldest")
+    async def test_drop_oldest(self):
+        dropped = REGISTRY.get_sample_value("ws_dropped_frames_total")
+        queued = REGISTRY.get_sample_value("ws_queued_frames")
+
+        consumer = self._consumer()
+        for i in range(4):
+            await consumer._enqueue({"n": i})
+        self.assertEqual(list(consumer.outbox), [{"n": 2}, {"n": 3}])
+        self.assertEqual(consumer.dropped_frames, 2)
+        self.assertEqual(REGISTRY.get_sample_value("ws_dropped_frames_total"), dropped + 2)
+        self.assertEqual(REGISTRY.get_sample_value("ws_queued_frames"), queued + 2)
+
+    @override_settings(DOCUMENTS_WS_SEND_QUEUE_SIZE=2, DOCUMENTS_WS_OVERFLOW_POLICY="coalesce")
+    async def test_coalesce_into_resync(self):
+        consumer = self._consumer()
+        for i in range(3):
+            await consumer._enqueue({"n": i})
+        self.assertEqual(list(consumer.outbox), [{"type": "resync"}])
+
+    @override_settings(DOCUMENTS_WS_SEND_QUEUE_SIZE=2, DOCUMENTS_WS_OVERFLOW_POLICY="disconnect")
+    async def test_disconnect_slow_consumer(self):
+        disconnects = REGISTRY.get_sample_value("ws_slow_consumer_disconnects_total")
+
+        consumer = self._consumer()
+        for i in range(3):
+            await consumer._enqueue({"n": i})
+        consumer.close.assert_awaited_once_with(code=CLOSE_SLOW_CONSUMER)
+        self.assertEqual(REGISTRY.get_sample_value("ws_slow_consumer_disconnects_total"), disconnects + 1)
+        await consumer._enqueue({"n": 4})
+        self.assertEqual(len(consumer.outbox), 2)
+
+    async def test_send_failure_closes_the_connection(self):
+        consumer = self._consumer()
+        consumer.send_json = mock.AsyncMock(side_effect=OSError("connection reset"))
+
+        await consumer._enqueue({"n": 1})
+        with self.assertLogs("apichallenge.documents.consumers", "ERROR"):
+            await consumer._send_outbox()
+
+        consumer.close.assert_awaited_once_with()
+        self.assertTrue(consumer.closing)
@@ -1,3 +1,5 @@
+from django.core.cache import cache
+from django.core.files.storage import default_storage
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import TestCase
 from rest_framework import status
@@ -74,6 +76,8 @@ class DocumentAPITests(TestCase):
     """Test API endpoints with RBAC."""
 
     def setUp(self):
+        cache.clear()
+        default_storage.clear()
         self.client = APIClient()
         self.admin = BaseUser.objects.create_user(
             username="admin_api", password="Admin@12345", role=Role.ADMIN
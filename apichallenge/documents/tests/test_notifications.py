@@ -0,0 +1,88 @@
+from unittest import mock
+
+from django.db import transaction
+from django.test import TransactionTestCase, SimpleTestCase
+
+from apichallenge.users.models import BaseUser, Role
+from apichallenge.documents.models import Document, OutboxMessage
+from apichallenge.documents.notifications import (
+    FEED_GROUP,
+    document_group_name,
+    notify_document_change,
+    publish_document_events,
+    user_group_name,
+)
+
+
+class _RecordingChannelLayer:
+    def __init__(self):
+        self.sent = []
+
+    async def group_send(self, group, message):
+        self.sent.append((group, message))
+
+
+def _event(document_id, action="updated", title="t"):
+    return {
+        "event_id": f"{document_id}-{title}",
+        "action": action,
+        "document": {"id": document_id, "title": title, "file_name": "f"},
+        "user": "u",
+        "timestamp": "now",
+    }
+
+
+class NotifyOnCommitTests(TransactionTestCase):
+    """Test that notifications are only published after a successful commit."""
+
+    def setUp(self):
+        self.editor = BaseUser.objects.create_user(
+            username="editor_notify", password="Editor@12345", role=Role.EDITOR
+        )
+        self.doc = Document.objects.create(
+            title="N", file="documents/1/n.txt", file_name="n.txt", uploaded_by=self.editor
+        )
+
+    @mock.patch("apichallenge.documents.notifications.publish_document_events")
+    def test_not_published_on_rollback(self, publish):
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                notify_document_change(action="updated", document=self.doc, user=self.editor)
+                raise RuntimeError
+        publish.assert_not_called()
+        self.assertFalse(OutboxMessage.objects.exists())
+
+    @mock.patch("apichallenge.documents.notifications.publish_document_events")
+    def test_published_after_commit(self, publish):
+        with transaction.atomic():
+            notify_document_change(action="updated", document=self.doc, user=self.editor)
+            publish.assert_not_called()
+        publish.assert_called_once()
+        self.assertFalse(OutboxMessage.objects.exists())
+
+        [(groups, event)] = publish.call_args.args[0]
+        self.assertEqual(
+            groups, [document_group_name(self.doc.id), user_group_name(self.editor.id), FEED_GROUP]
+        )
+
+
+class PublishDocumentEventsTests(SimpleTestCase):
+    """Test that a batch of events reaches each group as one message."""
+
+    def test_batches_and_coalesces_events(self):
+        layer = _RecordingChannelLayer()
+
+        with mock.patch("channels.layers.get_channel_layer", return_value=layer):
+            publish_document_events([
+                (["g1", "g2"], _event(1, title="a")),
+                (["g1"], _event(1, title="b")),
+                (["g1"], _event(2, action="created")),
+            ])
+
+        messages = dict(layer.sent)
+        self.assertEqual(len(layer.sent), 2)
+        self.assertEqual(
+            [(e["document"]["id"], e["document"]["title"]) for e in messages["g1"]["events"]],
+            [(1, "b"), (2, "t")],
+        )
+        self.assertEqual(len(messages["g2"]["events"]), 1)
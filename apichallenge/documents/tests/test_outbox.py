@@ -0,0 +1,88 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apichallenge.documents.models import Document, OutboxMessage
+from apichallenge.documents.outbox import HANDLERS, outbox_enqueue, outbox_relay, outbox_relay_batch
+from apichallenge.documents.services import document_delete
+from apichallenge.users.models import BaseUser, Role
+
+Topic = OutboxMessage.Topic
+
+
+class OutboxRelayTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_performs_batches_per_topic_and_deletes_them(self):
+        handler = mock.Mock()
+        with mock.patch.dict(HANDLERS, {Topic.PROCESS: handler}):
+            outbox_enqueue(topic=Topic.PROCESS, payload={"document_id": 1})
+            outbox_enqueue(topic=Topic.PROCESS, payload={"document_id": 2})
+
+            self.assertEqual(outbox_relay(), 2)
+
+        handler.assert_called_once_with([{"document_id": 1}, {"document_id": 2}])
+        self.assertFalse(OutboxMessage.objects.exists())
+
+    def test_cache_invalidation(self):
+        cache.set("documents:detail:7", "stale")
+        outbox_enqueue(topic=Topic.INVALIDATE_CACHE, payload={"document_id": 7})
+
+        outbox_relay()
+        self.assertIsNone(cache.get("documents:detail:7"))
+
+    @override_settings(DOCUMENTS_OUTBOX_MAX_ATTEMPTS=2)
+    def test_failed_messages_back_off_until_max_attempts(self):
+        failing = mock.Mock(side_effect=ConnectionError("down"))
+        with mock.patch.dict(HANDLERS, {Topic.NOTIFY: failing}):
+            message = outbox_enqueue(topic=Topic.NOTIFY, payload={"groups": [], "event": {}})
+
+            self.assertEqual(outbox_relay_batch(), 1)
+            message.refresh_from_db()
+            self.assertEqual(message.attempts, 1)
+            self.assertGreater(message.available_at, timezone.now())
+            self.assertIn("down", message.last_error)
+
+            # Not due yet
+            self.assertEqual(outbox_relay_batch(), 0)
+
+            OutboxMessage.objects.update(available_at=timezone.now() - timedelta(seconds=1))
+            outbox_relay_batch()
+            message.refresh_from_db()
+            self.assertEqual(message.attempts, 2)
+
+            # Given up on: kept for inspection, no longer taken
+            OutboxMessage.objects.update(available_at=timezone.now() - timedelta(seconds=1))
+            self.assertEqual(outbox_relay_batch(), 0)
+
+    def test_document_delete_records_its_side_effects(self):
+        admin = BaseUser.objects.create_user(username="outbox_admin", password="Admin@12345", role=Role.ADMIN)
+        document = Document.objects.create(
+            title="O", file="documents/1/o.txt", file_name="o.txt", uploaded_by=admin
+        )
+
+        document_delete(document=document, deleted_by=admin)
+
+        self.assertEqual(
+            list(OutboxMessage.objects.values_list("topic", flat=True)),
+            [Topic.NOTIFY, Topic.INVALIDATE_CACHE],
+        )
+
+    def test_document_delete_invalidates_the_cache_on_commit(self):
+        admin = BaseUser.objects.create_user(username="outbox_admin", password="Admin@12345", role=Role.ADMIN)
+        document = Document.objects.create(
+            title="O", file="documents/1/o.txt", file_name="o.txt", uploaded_by=admin
+        )
+        key = f"documents:detail:{document.id}"
+        cache.set(key, "stale")
+
+        # Not waiting for the relay
+        with mock.patch.dict(HANDLERS, {Topic.INVALIDATE_CACHE: mock.Mock(side_effect=ConnectionError("down"))}):
+            with self.captureOnCommitCallbacks(execute=True):
+                document_delete(document=document, deleted_by=admin)
+
+        self.assertIsNone(cache.get(key))
@@ -0,0 +1,84 @@
+import io
+
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apichallenge.users.models import BaseUser, Role
+from apichallenge.documents.models import Document
+from apichallenge.documents.previews import preview_path
+from apichallenge.documents.services import document_create, document_previews_generate
+
+
+def _make_image(name="photo.png", size=(800, 600)):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color=(200, 30, 30)).save(buffer, format="PNG")
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/png")
+
+
+@override_settings(DOCUMENTS_PREVIEW_SIZES=[64, 256])
+class DocumentPreviewTests(TestCase):
+    """Test preview rendition generation and the preview endpoint."""
+
+    def setUp(self):
+        default_storage.clear()
+        self.client = APIClient()
+        self.admin = BaseUser.objects.create_user(
+            username="admin_preview", password="Admin@12345", role=Role.ADMIN
+        )
+        self.viewer = BaseUser.objects.create_user(
+            username="viewer_preview", password="Viewer@12345", role=Role.VIEWER
+        )
+
+    def test_generate_previews_for_image(self):
+        doc = document_create(title="Photo", file=_make_image(), uploaded_by=self.admin)
+        previews = document_previews_generate(document=doc)
+        self.assertEqual(sorted(previews), ["256", "64"])
+        doc.refresh_from_db()
+        self.assertEqual(doc.previews, previews)
+
+    def test_previews_of_a_replaced_file_are_deleted(self):
+        doc = document_create(title="Photo", file=_make_image(), uploaded_by=self.admin)
+        Document.objects.filter(pk=doc.pk).update(file="documents/1/other.png")
+
+        self.assertEqual(document_previews_generate(document=doc), {})
+        for size in (64, 256):
+            self.assertFalse(default_storage.exists(preview_path(file_name=doc.file.name, size=size)))
+
+    def test_no_previews_for_text(self):
+        doc = document_create(
+            title="Text",
+            file=SimpleUploadedFile("a.txt", b"hello", content_type="text/plain"),
+            uploaded_by=self.admin,
+        )
+        self.assertEqual(document_previews_generate(document=doc), {})
+        self.client.force_authenticate(user=self.viewer)
+        resp = self.client.get(f"/api/documents/{doc.id}/preview/")
+        self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_preview_endpoint_etag(self):
+        doc = document_create(title="Photo", file=_make_image(), uploaded_by=self.admin)
+        document_previews_generate(document=doc)
+        self.client.force_authenticate(user=self.viewer)
+
+        resp = self.client.get(f"/api/documents/{doc.id}/preview/?size=100")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp["Content-Type"], "image/webp")
+        self.assertIn("immutable", resp["Cache-Control"])
+        image = Image.open(io.BytesIO(b"".join(resp.streaming_content)))
+        self.assertEqual(max(image.size), 256)
+
+        etag = resp["ETag"]
+        for if_none_match, expected in [
+            (etag, status.HTTP_304_NOT_MODIFIED),
+            (f'"other", W/{etag}', status.HTTP_304_NOT_MODIFIED),
+            ("*", status.HTTP_304_NOT_MODIFIED),
+            (f'"x{etag[1:]}', status.HTTP_200_OK),
+        ]:
+            resp = self.client.get(
+                f"/api/documents/{doc.id}/preview/?size=100", HTTP_IF_NONE_MATCH=if_none_match
+            )
+            self.assertEqual(resp.status_code, expected, if_none_match)
@@ -0,0 +1,114 @@
+import io
+from unittest import mock
+
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from PIL import Image
+
+from apichallenge.users.models import BaseUser, Role
+from apichallenge.documents.consumers import DocumentNotificationConsumer
+from apichallenge.documents.models import Document
+from apichallenge.documents.notifications import coalesce_events
+from apichallenge.documents.services import document_create, document_update
+from apichallenge.documents.tasks import process_document_after_upload
+
+Status = Document.ProcessingStatus
+
+
+def _make_image(name="photo.png"):
+    buffer = io.BytesIO()
+    Image.new("RGB", (400, 300), color=(30, 200, 30)).save(buffer, format="PNG")
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/png")
+
+
+@override_settings(DOCUMENTS_PREVIEW_SIZES=[64, 256])
+class DocumentProcessingTests(TestCase):
+    """Test the processing states and the events pushed for them."""
+
+    def setUp(self):
+        default_storage.clear()
+        self.editor = BaseUser.objects.create_user(
+            username="editor_processing", password="Editor@12345", role=Role.EDITOR
+        )
+        self.document = document_create(title="Photo", file=_make_image(), uploaded_by=self.editor)
+
+    def _process(self):
+        with mock.patch("apichallenge.documents.notifications.publish_document_events") as publish:
+            process_document_after_upload(self.document.id)
+        self.replayed = [
+            event["processing"]
+            for call in publish.call_args_list
+            if call.kwargs["replayable"]
+            for _, event in call.args[0]
+        ]
+        return [event["processing"] for call in publish.call_args_list for _, event in call.args[0]]
+
+    def test_new_documents_are_pending(self):
+        self.assertEqual(self.document.processing_status, Status.PENDING)
+        self.assertEqual(self.document.processing_progress, 0)
+
+    def test_transitions_are_recorded_and_pushed(self):
+        pushed = self._process()
+
+        self.assertEqual(pushed[0], {"status": "processing", "progress": 0})
+        self.assertEqual(pushed[-1], {"status": "ready", "progress": 100})
+        progress = [p["progress"] for p in pushed]
+        self.assertEqual(progress, sorted(progress))
+        # Only the status changes are kept for replay
+        self.assertEqual([p["status"] for p in self.replayed], ["processing", "ready"])
+
+        self.document.refresh_from_db()
+        self.assertEqual(self.document.processing_status, Status.READY)
+        self.assertEqual(self.document.processing_progress, 100)
+
+        # Processing the same file again is a no-op
+        self.assertEqual(self._process(), [])
+
+    def test_failure(self):
+        with mock.patch(
+            "apichallenge.documents.tasks.document_previews_generate", side_effect=OSError("storage down")
+        ), self.assertRaises(OSError):
+            self._process()
+
+        self.document.refresh_from_db()
+        self.assertEqual(self.document.processing_status, Status.FAILED)
+
+    def test_unrenderable_file_fails(self):
+        with mock.patch(
+            "apichallenge.documents.previews.previews_render", side_effect=OSError("truncated image")
+        ), self.assertRaises(OSError):
+            self._process()
+
+        self.document.refresh_from_db()
+        self.assertEqual(self.document.processing_status, Status.FAILED)
+        self.assertEqual(self.document.previews, {})
+
+    def test_replaced_file_is_pending_again(self):
+        self._process()
+        document = document_update(
+            document=self.document, file=_make_image("other.png"), updated_by=self.editor
+        )
+        self.assertEqual(document.processing_status, Status.PENDING)
+        self.assertEqual(document.processing_progress, 0)
+
+
+class ProcessingEventTests(SimpleTestCase):
+    def _event(self, progress):
+        return {
+            "event_id": str(progress),
+            "action": "processing",
+            "document": {"id": 1, "title": "t", "file_name": "f"},
+            "user": "u",
+            "timestamp": "now",
+            "processing": {"status": "processing", "progress": progress},
+        }
+
+    def test_only_the_latest_progress_is_sent(self):
+        events = coalesce_events([self._event(30), self._event(60)])
+        self.assertEqual([e["processing"]["progress"] for e in events], [60])
+
+    def test_frame_carries_the_processing_state(self):
+        frame = DocumentNotificationConsumer._event_frame(self._event(30))
+        self.assertEqual(frame["type"], "processing")
+        self.assertEqual(frame["processing"], {"status": "processing", "progress": 30})
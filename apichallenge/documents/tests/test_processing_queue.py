@@ -0,0 +1,124 @@
+import time
+from unittest import mock
+
+import fakeredis
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+
+from apichallenge.users.models import BaseUser, Role
+from apichallenge.documents.models import Document, OutboxMessage
+from apichallenge.documents.outbox import outbox_relay
+from apichallenge.documents.processing_queue import (
+    CLAIMED_KEY,
+    PENDING_KEY,
+    processing_done,
+    processing_enqueue,
+    processing_take,
+)
+from apichallenge.documents.services import document_create
+from apichallenge.documents.tasks import process_documents_batch
+
+Status = Document.ProcessingStatus
+
+
+@override_settings(DOCUMENTS_PROCESSING_BATCHED=True, DOCUMENTS_PROCESSING_CONCURRENCY=1)
+class ProcessingQueueTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.redis = fakeredis.FakeRedis()
+        patcher = mock.patch("apichallenge.documents.processing_queue._get_redis", return_value=self.redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        publisher = mock.patch("apichallenge.documents.notifications.publish_document_events")
+        publisher.start()
+        self.addCleanup(publisher.stop)
+
+        self.editor = BaseUser.objects.create_user(
+            username="editor_batch", password="Editor@12345", role=Role.EDITOR
+        )
+
+    def _document(self, name="notes.txt"):
+        return document_create(
+            title=name, file=SimpleUploadedFile(name, b"text", content_type="text/plain"), uploaded_by=self.editor
+        )
+
+    def test_enqueues_are_collapsed_and_schedule_one_run(self):
+        with mock.patch("apichallenge.documents.tasks.process_documents_batch.apply_async") as schedule:
+            processing_enqueue(document_ids=[1, 2])
+            processing_enqueue(document_ids=[2])
+
+        self.assertEqual(self.redis.smembers(PENDING_KEY), {b"1", b"2"})
+        schedule.assert_called_once()
+
+    def test_outbox_queues_uploads_for_a_batch(self):
+        document = self._document()
+
+        with mock.patch("apichallenge.documents.tasks.process_documents_batch.apply_async"):
+            outbox_relay()
+
+        self.assertFalse(OutboxMessage.objects.filter(topic=OutboxMessage.Topic.PROCESS).exists())
+        self.assertEqual(self.redis.smembers(PENDING_KEY), {str(document.id).encode()})
+
+    def test_batch_processes_every_queued_document(self):
+        documents = [self._document(f"doc{i}.txt") for i in range(3)]
+        self.redis.sadd(PENDING_KEY, *[document.id for document in documents])
+
+        with override_settings(DOCUMENTS_PROCESSING_BATCH_SIZE=2):
+            self.assertEqual(process_documents_batch(), 3)
+
+        for document in documents:
+            document.refresh_from_db()
+            self.assertEqual(document.processing_status, Status.READY)
+        self.assertEqual(self.redis.zcard(CLAIMED_KEY), 0)
+
+    def test_a_failing_document_does_not_stop_its_batch(self):
+        failing, other = self._document("bad.txt"), self._document("good.txt")
+        self.redis.sadd(PENDING_KEY, failing.id, other.id)
+
+        with mock.patch(
+            "apichallenge.documents.tasks.document_previews_generate",
+            side_effect=lambda *, document, on_progress: self._fail_for(document, failing.id),
+        ):
+            process_documents_batch()
+
+        failing.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(failing.processing_status, Status.FAILED)
+        self.assertEqual(other.processing_status, Status.READY)
+
+    @staticmethod
+    def _fail_for(document, document_id):
+        if document.id == document_id:
+            raise OSError("unreadable")
+        return {}
+
+    def test_a_failed_batch_is_requeued(self):
+        document = self._document()
+        self.redis.sadd(PENDING_KEY, document.id)
+
+        with mock.patch("apichallenge.documents.tasks._process_documents", side_effect=OSError("db gone")):
+            with self.assertRaises(OSError):
+                process_documents_batch()
+
+        self.assertEqual(self.redis.smembers(PENDING_KEY), {str(document.id).encode()})
+        self.assertEqual(self.redis.zcard(CLAIMED_KEY), 0)
+
+    def test_claims_of_a_dead_run_are_requeued(self):
+        with override_settings(DOCUMENTS_PROCESSING_CLAIM_TIMEOUT=60):
+            self.redis.zadd(CLAIMED_KEY, {"7": time.time() - 120, "8": time.time()})
+
+            self.assertEqual(processing_take(count=10)[0], [7])
+
+        self.assertEqual(self.redis.zrange(CLAIMED_KEY, 0, -1), [b"8", b"7"])
+
+    def test_a_timed_out_run_leaves_the_new_claim(self):
+        self.redis.sadd(PENDING_KEY, 7)
+        with override_settings(DOCUMENTS_PROCESSING_CLAIM_TIMEOUT=0):
+            _, stale_claim = processing_take(count=10)
+            time.sleep(0.01)
+            self.assertEqual(processing_take(count=10)[0], [7])
+
+        processing_done(document_ids=[7], claim=stale_claim)
+        self.assertEqual(self.redis.zrange(CLAIMED_KEY, 0, -1), [b"7"])
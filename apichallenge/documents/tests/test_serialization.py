@@ -0,0 +1,97 @@
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from apichallenge.api.renderers import ORJSONRenderer
+from apichallenge.documents.apis import (
+    AuditLogListSerializer,
+    AuditLogOutputSerializer,
+    DocumentListSerializer,
+    DocumentOutputSerializer,
+)
+from apichallenge.documents.models import AuditLog, Document
+from apichallenge.documents.services import create_audit_log, document_create
+from apichallenge.users.models import BaseUser, Role
+
+
+class ValuesSerializerTests(TestCase):
+    """The fast list path must produce exactly what the ModelSerializers produce."""
+
+    def setUp(self):
+        self.admin = BaseUser.objects.create_user(
+            username="fast_admin", password="Admin@12345", role=Role.ADMIN
+        )
+        self.document = document_create(
+            title="Fast — ünïcode",
+            file=SimpleUploadedFile("a.txt", b"body", content_type="text/plain"),
+            uploaded_by=self.admin,
+        )
+        Document.objects.filter(pk=self.document.pk).update(previews={"512": {}, "128": {}})
+
+    def test_document_list_identical(self):
+        qs = Document.objects.select_related("uploaded_by").all()
+        self.assertEqual(
+            DocumentListSerializer(DocumentListSerializer.values(qs), many=True).data,
+            DocumentOutputSerializer(qs, many=True).data,
+        )
+
+    def test_audit_log_list_identical(self):
+        create_audit_log(user=None, document=None, action=AuditLog.Action.READ)
+        qs = AuditLog.objects.select_related("user", "document").all()
+        self.assertGreater(qs.count(), 1)
+        self.assertEqual(
+            AuditLogListSerializer(AuditLogListSerializer.values(qs), many=True).data,
+            AuditLogOutputSerializer(qs, many=True).data,
+        )
+
+    def test_orjson_renderer_identical(self):
+        qs = Document.objects.select_related("uploaded_by").all()
+        data = {"results": DocumentOutputSerializer(qs, many=True).data, "sep": "a\u2028b"}
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+
+class SparseFieldsetTests(TestCase):
+    """Test `fields=` / `exclude=` on the document list."""
+
+    def setUp(self):
+        self.admin = BaseUser.objects.create_user(
+            username="sparse_admin", password="Admin@12345", role=Role.ADMIN
+        )
+        document_create(
+            title="Sparse",
+            description="long " * 100,
+            file=SimpleUploadedFile("a.txt", b"body", content_type="text/plain"),
+            uploaded_by=self.admin,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+
+    def test_fields_narrow_output_and_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.get("/api/documents/?fields=id,title")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(list(resp.data["results"][0]), ["id", "title"])
+
+        page_sql = queries.captured_queries[-1]["sql"]
+        self.assertNotIn("description", page_sql)
+        self.assertNotIn("JOIN", page_sql)
+
+    def test_username_joins_user(self):
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.get("/api/documents/?fields=id,uploaded_by_username")
+        self.assertEqual(resp.data["results"][0]["uploaded_by_username"], "sparse_admin")
+        self.assertIn("JOIN", queries.captured_queries[-1]["sql"])
+
+    def test_exclude(self):
+        resp = self.client.get("/api/documents/?exclude=description,preview_sizes")
+        result = resp.data["results"][0]
+        self.assertNotIn("description", result)
+        self.assertNotIn("preview_sizes", result)
+        self.assertIn("title", result)
+
+    def test_unknown_field_rejected(self):
+        resp = self.client.get("/api/documents/?fields=id,password")
+        self.assertEqual(resp.status_code, 400)
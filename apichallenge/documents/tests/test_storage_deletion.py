@@ -0,0 +1,83 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apichallenge.documents.models import Document, StorageDeletion
+from apichallenge.documents.services import document_delete, storage_deletions_cancel
+from apichallenge.documents.tasks import purge_storage_deletions
+from apichallenge.users.models import BaseUser, Role
+
+
+@override_settings(DOCUMENTS_STORAGE_DELETE_GRACE_PERIOD=60 * 60)
+class StorageDeletionTests(TestCase):
+    """Test deferred, batched deletion of replaced and deleted files."""
+
+    def setUp(self):
+        self.admin = BaseUser.objects.create_user(
+            username="admin_purge", password="Admin@12345", role=Role.ADMIN
+        )
+        self.document = Document.objects.create(
+            title="P",
+            file="documents/1/p.txt",
+            file_name="p.txt",
+            uploaded_by=self.admin,
+            previews={"128": {"key": "previews/p_128.webp", "etag": "x"}},
+        )
+
+    def _purge(self, failed_keys=()):
+        def delete(*, keys, failed):
+            failed.extend(key for key in keys if key in failed_keys)
+            return len(keys) - len(failed)
+
+        with mock.patch(
+            "apichallenge.documents.tasks.storage_objects_delete", side_effect=delete
+        ) as storage_delete:
+            purged = purge_storage_deletions()
+        return purged, storage_delete
+
+    def _expire_grace_period(self):
+        StorageDeletion.objects.update(purge_after=timezone.now() - timedelta(seconds=1))
+
+    def test_delete_queues_the_files_without_touching_storage(self):
+        pk = self.document.pk
+        with mock.patch("django.core.files.storage.default_storage.delete") as storage_delete:
+            document_delete(document=self.document, deleted_by=self.admin)
+        storage_delete.assert_not_called()
+
+        deletion_keys = StorageDeletion.objects.filter(document_id=pk).values_list("key", flat=True)
+        self.assertCountEqual(deletion_keys, ["documents/1/p.txt", "previews/p_128.webp"])
+        self.assertTrue(all(
+            d.purge_after > timezone.now() + timedelta(minutes=59) for d in StorageDeletion.objects.all()
+        ))
+
+    def test_purges_in_one_batch_after_the_grace_period(self):
+        pk = self.document.pk
+        document_delete(document=self.document, deleted_by=self.admin)
+
+        purged, storage_delete = self._purge()
+        self.assertEqual(purged, 0)
+        storage_delete.assert_not_called()
+
+        self._expire_grace_period()
+        purged, storage_delete = self._purge()
+        self.assertEqual(purged, 2)
+        storage_delete.assert_called_once()
+        self.assertFalse(StorageDeletion.objects.filter(document_id=pk).exists())
+
+    def test_failed_keys_are_kept_for_a_later_run(self):
+        document_delete(document=self.document, deleted_by=self.admin)
+        self._expire_grace_period()
+
+        purged, _ = self._purge(failed_keys={"previews/p_128.webp"})
+        self.assertEqual(purged, 1)
+        remaining = StorageDeletion.objects.get()
+        self.assertEqual((remaining.key, remaining.attempts), ("previews/p_128.webp", 1))
+
+    def test_cancel_within_the_grace_period(self):
+        pk = self.document.pk
+        document_delete(document=self.document, deleted_by=self.admin)
+
+        self.assertEqual(storage_deletions_cancel(document_id=pk), 2)
+        self.assertFalse(StorageDeletion.objects.exists())
@@ -0,0 +1,105 @@
+import base64
+import json
+import time
+
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apichallenge.users.models import BaseUser, Role
+from apichallenge.documents.models import Document, DocumentTombstone
+from apichallenge.documents.services import document_update, document_delete
+from apichallenge.documents.tasks import prune_document_tombstones
+
+
+class DocumentSyncApiTests(TestCase):
+    """Test the changes-since sync endpoint."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = BaseUser.objects.create_user(
+            username="admin_sync", password="Admin@12345", role=Role.ADMIN
+        )
+        self.client.force_authenticate(user=self.admin)
+        self.docs = [
+            Document.objects.create(
+                title=f"Doc {i}",
+                file=f"documents/1/{i}.txt",
+                file_name=f"{i}.txt",
+                uploaded_by=self.admin,
+                change_seq=i + 1,
+            )
+            for i in range(3)
+        ]
+
+    def _sync(self, cursor=None, **params):
+        if cursor:
+            params["cursor"] = cursor
+        resp = self.client.get("/api/documents/sync/", params)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        return resp.data
+
+    def test_initial_sync_in_pages(self):
+        first = self._sync(limit=2)
+        self.assertEqual(len(first["changed"]), 2)
+        self.assertTrue(first["has_more"])
+
+        second = self._sync(first["cursor"], limit=2)
+        self.assertEqual([d["id"] for d in second["changed"]], [self.docs[2].id])
+        self.assertFalse(second["has_more"])
+
+    def test_only_changes_since_cursor(self):
+        cursor = self._sync()["cursor"]
+
+        deleted_id = self.docs[1].id
+        document_update(document=self.docs[0], title="Renamed", updated_by=self.admin)
+        document_delete(document=self.docs[1], deleted_by=self.admin)
+
+        data = self._sync(cursor)
+        self.assertEqual([d["title"] for d in data["changed"]], ["Renamed"])
+        self.assertEqual(data["deleted"], [deleted_id])
+        self.assertEqual(self._sync(data["cursor"])["changed"], [])
+
+    def test_changes_in_transaction_order(self):
+        # Transaction 9 took its sequence number before transaction 8, but commits later
+        late, early = (
+            Document.objects.create(
+                title=title, file=f"documents/1/{title}.txt", file_name=f"{title}.txt",
+                uploaded_by=self.admin, change_xid=xid, change_seq=seq,
+            )
+            for title, xid, seq in (("late", 9, 6), ("early", 8, 7))
+        )
+
+        ids = [d["id"] for d in self._sync()["changed"]]
+        self.assertEqual(ids[-2:], [early.id, late.id])
+
+    def test_cascade_deletions_leave_tombstones(self):
+        cursor = self._sync()["cursor"]
+
+        self.admin.delete()
+
+        data = self._sync(cursor)
+        self.assertEqual(sorted(data["deleted"]), sorted(d.id for d in self.docs))
+
+    def test_invalid_cursor(self):
+        resp = self.client.get("/api/documents/sync/", {"cursor": "not-a-cursor"})
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_cursor_without_transaction_id_expired(self):
+        raw = json.dumps({"s": 1, "t": int(time.time())}).encode()
+        resp = self.client.get("/api/documents/sync/", {"cursor": base64.urlsafe_b64encode(raw).decode()})
+        self.assertEqual(resp.status_code, status.HTTP_410_GONE)
+
+    @override_settings(DOCUMENTS_SYNC_TOMBSTONE_TTL=-1)
+    def test_expired_cursor(self):
+        cursor = self._sync()["cursor"]
+        resp = self.client.get("/api/documents/sync/", {"cursor": cursor})
+        self.assertEqual(resp.status_code, status.HTTP_410_GONE)
+
+    @override_settings(DOCUMENTS_SYNC_TOMBSTONE_TTL=-1, DOCUMENTS_SYNC_TOMBSTONE_PRUNE_BATCH_SIZE=2)
+    def test_prune_tombstones_in_batches(self):
+        for doc in self.docs:
+            document_delete(document=doc, deleted_by=self.admin)
+
+        self.assertEqual(prune_document_tombstones(), 3)
+        self.assertFalse(DocumentTombstone.objects.exists())
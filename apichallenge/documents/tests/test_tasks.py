@@ -0,0 +1,59 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apichallenge.users.models import BaseUser, Role
+from apichallenge.documents.models import Document, StorageDeletion
+from apichallenge.documents.tasks import cleanup_orphaned_files
+
+
+def _obj(key, age=timedelta(days=2)):
+    return {"Key": key, "LastModified": timezone.now() - age}
+
+
+@override_settings(DOCUMENTS_ORPHAN_GRACE_PERIOD=60 * 60 * 24)
+class CleanupOrphanedFilesTests(TestCase):
+    """Test the periodic orphaned file cleanup."""
+
+    def setUp(self):
+        self.admin = BaseUser.objects.create_user(
+            username="admin_cleanup", password="Admin@12345", role=Role.ADMIN
+        )
+        Document.objects.create(
+            title="Kept", file="documents/1/kept.txt", file_name="kept.txt", uploaded_by=self.admin
+        )
+        self.pages = [
+            [_obj("documents/1/kept.txt"), _obj("documents/1/orphan-a.txt")],
+            [_obj("documents/1/orphan-b.txt"), _obj("documents/1/fresh.txt", age=timedelta(minutes=5))],
+        ]
+
+    def _run(self, **kwargs):
+        with mock.patch(
+            "apichallenge.documents.tasks.storage_object_pages", return_value=iter(self.pages)
+        ), mock.patch(
+            "apichallenge.documents.tasks.storage_objects_delete", side_effect=lambda keys: len(keys)
+        ) as delete:
+            stats = cleanup_orphaned_files(**kwargs)
+        return stats, delete
+
+    def test_deletes_only_old_unreferenced_objects(self):
+        stats, delete = self._run(dry_run=False)
+        delete.assert_called_once_with(keys=["documents/1/orphan-a.txt", "documents/1/orphan-b.txt"])
+        self.assertEqual(stats["scanned"], 4)
+        self.assertEqual(stats["referenced"], 1)
+        self.assertEqual(stats["skipped_recent"], 1)
+        self.assertEqual(stats["deleted"], 2)
+
+    def test_skips_objects_queued_for_deletion(self):
+        StorageDeletion.objects.create(key="documents/1/orphan-a.txt", purge_after=timezone.now())
+        stats, delete = self._run(dry_run=False)
+        delete.assert_called_once_with(keys=["documents/1/orphan-b.txt"])
+        self.assertEqual(stats["referenced"], 2)
+
+    def test_dry_run_deletes_nothing(self):
+        stats, delete = self._run(dry_run=True)
+        delete.assert_not_called()
+        self.assertEqual(stats["orphaned"], 2)
+        self.assertEqual(stats["deleted"], 0)
@@ -0,0 +1,94 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apichallenge.api.throttling import parse_rate
+from apichallenge.documents import apis
+from apichallenge.documents.services import document_create
+from apichallenge.users.models import BaseUser, Role
+
+
+class ParseRateTests(TestCase):
+    def test_parse_rate(self):
+        rate = parse_rate("120/min")
+        self.assertEqual(rate.capacity, 120)
+        self.assertEqual(rate.refill, 2)
+
+        rate = parse_rate("20MB/s")
+        self.assertEqual(rate.capacity, 20 * 1024 * 1024)
+        self.assertEqual(rate.refill, 20 * 1024 * 1024)
+
+        self.assertEqual(parse_rate("30/10s").refill, 3)
+
+    def test_invalid_rate(self):
+        with self.assertRaises(ValueError):
+            parse_rate("fast")
+
+
+@override_settings(API_THROTTLE_ENABLED=True)
+class TokenBucketThrottleTests(TestCase):
+    """Test token-bucket throttling of the document endpoints."""
+
+    def setUp(self):
+        cache.clear()
+        self.viewer = BaseUser.objects.create_user(
+            username="throttle_viewer", password="Viewer@12345", role=Role.VIEWER
+        )
+        self.admin = BaseUser.objects.create_user(
+            username="throttle_admin", password="Admin@12345", role=Role.ADMIN
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.viewer)
+
+    @override_settings(API_THROTTLE_RATES={"read": {"default": "2/min", "admin": "10/min"}})
+    def test_read_budget_per_role(self):
+        first = self.client.get("/api/documents/")
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(first["RateLimit-Limit"], "2")
+        self.assertEqual(first["RateLimit-Remaining"], "1")
+
+        self.client.get("/api/documents/")
+        resp = self.client.get("/api/documents/")
+        self.assertEqual(resp.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(resp["RateLimit-Remaining"], "0")
+        self.assertIn("Retry-After", resp)
+
+        # Other users and roles have their own buckets.
+        self.client.force_authenticate(user=self.admin)
+        self.assertEqual(self.client.get("/api/documents/").status_code, status.HTTP_200_OK)
+
+    @override_settings(
+        API_THROTTLE_RATES={"read": {"default": "100/min"}, "documents.upload": {"default": "1/min"}}
+    )
+    def test_upload_budget_separate_from_reads(self):
+        editor = BaseUser.objects.create_user(
+            username="throttle_editor", password="Editor@12345", role=Role.EDITOR
+        )
+        self.client.force_authenticate(user=editor)
+
+        self.client.post("/api/documents/", {"title": "a"}, format="multipart")
+        resp = self.client.post("/api/documents/", {"title": "b"}, format="multipart")
+        self.assertEqual(resp.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(self.client.get("/api/documents/").status_code, status.HTTP_200_OK)
+
+    @override_settings(API_THROTTLE_RATES={"documents.download": {"default": "15B/min"}})
+    def test_download_budget_in_bytes(self):
+        document = document_create(
+            title="Doc",
+            file=SimpleUploadedFile("test.txt", b"hello world", content_type="text/plain"),
+            uploaded_by=self.admin,
+        )
+
+        with mock.patch.object(apis, "document_get", wraps=apis.document_get) as document_get:
+            resp = self.client.get(f"/api/documents/{document.id}/download/")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp["RateLimit-Remaining"], "4")
+        # Fetched once for the throttle and the response
+        document_get.assert_called_once()
+
+        resp = self.client.get(f"/api/documents/{document.id}/download/")
+        self.assertEqual(resp.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
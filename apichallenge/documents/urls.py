@@ -1,19 +1,39 @@
 from django.urls import path
 
+from apichallenge.documents.async_apis import (
+    AsyncDocumentListApi,
+    AsyncDocumentDetailApi,
+    AsyncDocumentDownloadApi,
+)
 from apichallenge.documents.apis import (
     DocumentListCreateApi,
+    DocumentSyncApi,
     DocumentDetailApi,
     DocumentDownloadApi,
+    DocumentPreviewApi,
     AuditLogListApi,
     AdminUserListCreateApi,
     AdminUserRoleUpdateApi,
+    AdminDatabaseStatsApi,
+    AdminTaskStatusApi,
 )
 
 urlpatterns = [
     # Document CRUD
     path("", DocumentListCreateApi.as_view(), name="document-list-create"),
+    path("sync/", DocumentSyncApi.as_view(), name="document-sync"),
     path("<int:pk>/", DocumentDetailApi.as_view(), name="document-detail"),
     path("<int:pk>/download/", DocumentDownloadApi.as_view(), name="document-download"),
+    path("<int:pk>/preview/", DocumentPreviewApi.as_view(), name="document-preview"),
+
+    # Async read endpoints (served by the ASGI workers)
+    path("async/", AsyncDocumentListApi.as_view(), name="async-document-list"),
+    path("async/<int:pk>/", AsyncDocumentDetailApi.as_view(), name="async-document-detail"),
+    path(
+        "async/<int:pk>/download/",
+        AsyncDocumentDownloadApi.as_view(),
+        name="async-document-download",
+    ),
 
     # Audit logs (admin only)
     path("audit-logs/", AuditLogListApi.as_view(), name="audit-log-list"),
@@ -25,4 +45,6 @@ urlpatterns = [
         AdminUserRoleUpdateApi.as_view(),
         name="admin-user-role-update",
     ),
+    path("admin/db-stats/", AdminDatabaseStatsApi.as_view(), name="admin-db-stats"),
+    path("admin/tasks/<str:task_id>/", AdminTaskStatusApi.as_view(), name="admin-task-status"),
 ]
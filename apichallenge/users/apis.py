@@ -6,7 +6,7 @@ from rest_framework import serializers
 from django.core.validators import MinLengthValidator
 
 from drf_spectacular.utils import extend_schema
-from rest_framework_simplejwt.tokens import RefreshToken
+from apichallenge.authentication.tokens import RoleRefreshToken
 
 from apichallenge.users.models import BaseUser
 from apichallenge.users.services import register
@@ -48,7 +48,7 @@ class RegisterApi(APIView):
             fields = ("username", "token", "created_at", "updated_at")
 
         def get_token(self, user):
-            refresh = RefreshToken.for_user(user)
+            refresh = RoleRefreshToken.for_user(user)
             return {
                 "refresh": str(refresh),
                 "access": str(refresh.access_token),
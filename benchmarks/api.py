@@ -0,0 +1,311 @@
+"""
+API hot path benchmark suite: document list (cold and warm cache), detail,
+download and upload throughput, audit log listing at scale and WebSocket
+fan-out, each through the whole stack (middleware, JWT auth, views).
+
+    python -m benchmarks.api --output results.json
+    python -m benchmarks.compare baseline.json results.json
+
+Hermetic (benchmarks/settings.py: SQLite, fakeredis, in-memory files,
+eager Celery) and prints one JSON object with the timings in milliseconds
+and throughputs per second, tagged with the git commit it ran on.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+
+
+def _setup():
+    # Always the hermetic settings, whatever the environment points at.
+    os.environ["DJANGO_SETTINGS_MODULE"] = "benchmarks.settings"
+    import django
+
+    django.setup()
+
+    from django.conf import settings
+    from django.core.management import call_command
+
+    database = settings.DATABASES["default"]
+    if database["ENGINE"] == "django.db.backends.sqlite3" and os.path.exists(database["NAME"]):
+        os.remove(database["NAME"])
+    call_command("migrate", interactive=False, verbosity=0)
+    call_command("flush", interactive=False, verbosity=0)
+
+
+def _time(func, repeat: int, *, before=None) -> dict:
+    """Time `func` `repeat` times; `before` runs untimed ahead of each call."""
+    samples = []
+    for _ in range(repeat):
+        if before:
+            before()
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    median = statistics.median(samples)
+    return {
+        "median_ms": round(median, 4),
+        "p95_ms": round(sorted(samples)[int(len(samples) * 0.95) - 1], 4),
+        "ops_per_s": round(1000 / median, 1) if median else None,
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _seed(*, documents: int, audit_logs: int):
+    from apichallenge.documents.models import AuditLog, Document
+    from apichallenge.users.models import BaseUser, Role
+
+    admin = BaseUser.objects.create_user(username="bench_admin", password="Admin@12345", role=Role.ADMIN)
+    editor = BaseUser.objects.create_user(username="bench_editor", password="Editor@12345", role=Role.EDITOR)
+    Document.objects.bulk_create(
+        Document(
+            title=f"Quarterly report {i}",
+            description="Lorem ipsum dolor sit amet, consectetur adipiscing elit.",
+            file=f"documents/{editor.id}/{i:032x}.pdf",
+            file_name=f"report-{i}.pdf",
+            file_size=1024 * i,
+            content_type="application/pdf",
+            uploaded_by=editor,
+            processing_status=Document.ProcessingStatus.READY,
+            processing_progress=100,
+        )
+        for i in range(1, documents + 1)
+    )
+    document_ids = list(Document.objects.values_list("id", flat=True))
+    AuditLog.objects.bulk_create(
+        (
+            AuditLog(
+                user=editor,
+                document_id=document_ids[i % len(document_ids)],
+                action=AuditLog.Action.READ,
+                document_title=f"Quarterly report {i}",
+                ip_address="127.0.0.1",
+            )
+            for i in range(audit_logs)
+        ),
+        batch_size=5000,
+    )
+    return admin, editor
+
+
+def _client(user):
+    from rest_framework.test import APIClient
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+    return client
+
+
+def _get(client, url: str):
+    response = client.get(url)
+    assert response.status_code == 200, (url, response.status_code)
+    return response
+
+
+def bench_reads(*, admin, editor, repeat: int, audit_logs: int) -> dict:
+    from django.core.cache import cache
+
+    from apichallenge.documents.models import Document
+
+    client = _client(editor)
+    document_id = Document.objects.values_list("id", flat=True).first()
+
+    _get(client, "/api/documents/")  # fill the cache
+    results = {
+        "document_list_cold": _time(lambda: _get(client, "/api/documents/"), repeat, before=cache.clear),
+        "document_list_warm": _time(lambda: _get(client, "/api/documents/"), repeat),
+        "document_detail": _time(lambda: _get(client, f"/api/documents/{document_id}/"), repeat),
+    }
+
+    admin_client = _client(admin)
+    deep = max(audit_logs - 20, 0)
+    results["audit_log_first_page"] = _time(lambda: _get(admin_client, "/api/documents/audit-logs/"), repeat)
+    results["audit_log_deep_page"] = _time(
+        lambda: _get(admin_client, f"/api/documents/audit-logs/?offset={deep}"), repeat
+    )
+    results["audit_log_by_document"] = _time(
+        lambda: _get(admin_client, f"/api/documents/audit-logs/?document_id={document_id}"), repeat
+    )
+    return results
+
+
+def bench_download(*, editor, size_mb: int, repeat: int) -> dict:
+    from django.core.files.base import ContentFile
+    from django.core.files.storage import default_storage
+
+    from apichallenge.documents.models import Document
+
+    size = size_mb * 1024 * 1024
+    key = default_storage.save(f"documents/{editor.id}/download.bin", ContentFile(os.urandom(size)))
+    document = Document.objects.create(
+        title="Download",
+        file=key,
+        file_name="download.bin",
+        file_size=size,
+        content_type="application/octet-stream",
+        uploaded_by=editor,
+    )
+    client = _client(editor)
+
+    def download():
+        response = _get(client, f"/api/documents/{document.id}/download/")
+        assert sum(len(chunk) for chunk in response.streaming_content) == size
+
+    result = _time(download, repeat)
+    result["mb_per_s"] = round(size_mb / (result["median_ms"] / 1000), 1)
+    return result
+
+
+def bench_upload(*, editor, size_kb: int, repeat: int) -> dict:
+    from django.core.files.uploadedfile import SimpleUploadedFile
+
+    client = _client(editor)
+    payload = os.urandom(size_kb * 1024)
+    count = iter(range(repeat))
+
+    def upload():
+        i = next(count)
+        response = client.post(
+            "/api/documents/",
+            {
+                "title": f"Upload {i}",
+                "file": SimpleUploadedFile(f"upload-{i}.txt", payload, content_type="text/plain"),
+            },
+            format="multipart",
+        )
+        assert response.status_code == 201, response.status_code
+
+    # Includes the eager post-upload processing run on commit.
+    result = _time(upload, repeat)
+    result["mb_per_s"] = round(size_kb / 1024 / (result["median_ms"] / 1000), 2)
+    return result
+
+
+async def _fan_out(*, editor, clients: int, repeat: int) -> dict:
+    from asgiref.sync import sync_to_async
+    from channels.testing import WebsocketCommunicator
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from config.asgi import application
+    from apichallenge.documents.models import Document
+    from apichallenge.documents.notifications import notify_document_processing
+
+    token = str(AccessToken.for_user(editor))
+    document = await sync_to_async(
+        lambda: Document.objects.select_related("uploaded_by").filter(uploaded_by=editor).first()
+    )()
+
+    communicators = [WebsocketCommunicator(application, f"/ws/documents/?token={token}") for _ in range(clients)]
+    for communicator in communicators:
+        connected, _ = await communicator.connect()
+        assert connected
+
+    samples = []
+    try:
+        for i in range(repeat):
+            document.processing_progress = i % 100
+            start = time.perf_counter()
+            await sync_to_async(notify_document_processing)(document=document, status_changed=False)
+            await asyncio.gather(*(c.receive_json_from(timeout=10) for c in communicators))
+            samples.append((time.perf_counter() - start) * 1000)
+    finally:
+        for communicator in communicators:
+            await communicator.disconnect()
+
+    median = statistics.median(samples)
+    return {
+        "clients": clients,
+        "median_ms": round(median, 4),
+        "p95_ms": round(sorted(samples)[int(len(samples) * 0.95) - 1], 4),
+        "deliveries_per_s": round(clients * 1000 / median, 1),
+    }
+
+
+def run(
+    *,
+    repeat: int,
+    documents: int,
+    audit_logs: int,
+    download_mb: int,
+    upload_kb: int,
+    ws_clients: int,
+) -> dict:
+    _setup()
+
+    import django
+    from django.conf import settings
+    from django.db import connection
+
+    admin, editor = _seed(documents=documents, audit_logs=audit_logs)
+
+    results = bench_reads(admin=admin, editor=editor, repeat=repeat, audit_logs=audit_logs)
+    results["download"] = bench_download(editor=editor, size_mb=download_mb, repeat=max(repeat // 10, 5))
+    results["upload"] = bench_upload(editor=editor, size_kb=upload_kb, repeat=max(repeat // 2, 10))
+    results["websocket_fan_out"] = asyncio.run(
+        _fan_out(editor=editor, clients=ws_clients, repeat=max(repeat // 5, 10))
+    )
+
+    return {
+        "benchmark": "api",
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": {
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "cache": settings.CACHES["default"]["BACKEND"].rsplit(".", 1)[-1],
+        },
+        "parameters": {
+            "repeat": repeat,
+            "documents": documents,
+            "audit_logs": audit_logs,
+            "download_mb": download_mb,
+            "upload_kb": upload_kb,
+            "ws_clients": ws_clients,
+        },
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=100)
+    parser.add_argument("--documents", type=int, default=1000)
+    parser.add_argument("--audit-logs", type=int, default=100_000)
+    parser.add_argument("--download-mb", type=int, default=16)
+    parser.add_argument("--upload-kb", type=int, default=256)
+    parser.add_argument("--ws-clients", type=int, default=100)
+    parser.add_argument("--output", help="also write the result to this file")
+    args = parser.parse_args()
+
+    result = run(
+        repeat=args.repeat,
+        documents=args.documents,
+        audit_logs=args.audit_logs,
+        download_mb=args.download_mb,
+        upload_kb=args.upload_kb,
+        ws_clients=args.ws_clients,
+    )
+    output = json.dumps(result)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Compare two benchmark results (JSON, as printed by the benchmarks) and
+flag regressions: timings (*_ms) that grew, or throughputs (*_per_s) that
+fell, by more than the threshold.
+
+    python -m benchmarks.compare baseline.json results.json --threshold 0.1
+
+Prints one JSON object with every compared metric and exits with status 1
+if any regressed, so it can gate a CI job.
+"""
+import argparse
+import json
+import sys
+
+
+def _metrics(result: dict, prefix: str = "") -> dict[str, float]:
+    """Flatten nested results into {"path.to.metric": value} for timings and throughputs."""
+    metrics = {}
+    for key, value in result.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            metrics.update(_metrics(value, f"{path}."))
+        elif isinstance(value, (int, float)) and key.endswith(("_ms", "_per_s")):
+            metrics[path] = value
+    return metrics
+
+
+def compare(baseline: dict, current: dict, *, threshold: float) -> dict:
+    before = _metrics(baseline.get("results", baseline))
+    after = _metrics(current.get("results", current))
+
+    metrics, regressions = {}, []
+    for path in sorted(before.keys() & after.keys()):
+        old, new = before[path], after[path]
+        if not old:
+            continue
+        change = (new - old) / old
+        # Lower is better for timings, higher for throughputs.
+        regressed = change > threshold if path.endswith("_ms") else change < -threshold
+        metrics[path] = {"baseline": old, "current": new, "change": round(change, 4)}
+        if regressed:
+            regressions.append(path)
+
+    return {
+        "baseline_commit": baseline.get("commit"),
+        "current_commit": current.get("commit"),
+        "threshold": threshold,
+        "regressions": regressions,
+        "metrics": metrics,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.1, help="relative change tolerated")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    report = compare(baseline, current, threshold=args.threshold)
+    print(json.dumps(report))
+    sys.exit(1 if report["regressions"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+List serialization benchmark: DocumentOutputSerializer + JSONRenderer
+against the values() fast path + ORJSONRenderer, on one page of rows.
+
+    python -m benchmarks.list_serialization --rows 50 --repeat 500
+
+Hermetic (no database or network: rows are built in memory) and prints
+one JSON object with the timings per page, in milliseconds.
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+from datetime import timedelta
+
+
+def _setup():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.django.test")
+    import django
+
+    django.setup()
+
+
+def _make_rows(count: int):
+    from django.utils import timezone
+
+    from apichallenge.documents.apis import DocumentListSerializer
+    from apichallenge.documents.models import Document
+    from apichallenge.users.models import BaseUser, Role
+
+    user = BaseUser(id=1, username="bench_user", role=Role.EDITOR)
+    now = timezone.now()
+    documents = [
+        Document(
+            id=i,
+            title=f"Quarterly report {i}",
+            description="Lorem ipsum dolor sit amet, consectetur adipiscing elit." * 2,
+            file=f"documents/1/{i:032x}.pdf",
+            file_name=f"report-{i}.pdf",
+            file_size=1024 * i,
+            content_type="application/pdf",
+            uploaded_by=user,
+            created_at=now - timedelta(minutes=i),
+            updated_at=now,
+            previews={"128": {}, "512": {}},
+        )
+        for i in range(1, count + 1)
+    ]
+
+    def resolve(obj, lookup):
+        for attr in lookup.split("__"):
+            obj = getattr(obj, attr)
+        return getattr(obj, "pk", obj)
+
+    _, lookups, _ = DocumentListSerializer._compile()
+    rows = [tuple(resolve(document, lookup) for lookup in lookups) for document in documents]
+    return documents, rows
+
+
+def _time(func, repeat: int) -> dict:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        "median_ms": round(statistics.median(samples), 4),
+        "p95_ms": round(sorted(samples)[int(len(samples) * 0.95) - 1], 4),
+    }
+
+
+def run(*, rows: int, repeat: int) -> dict:
+    _setup()
+
+    from rest_framework.renderers import JSONRenderer
+
+    from apichallenge.api.renderers import ORJSONRenderer
+    from apichallenge.documents.apis import DocumentListSerializer, DocumentOutputSerializer
+
+    documents, values = _make_rows(rows)
+
+    def baseline():
+        return JSONRenderer().render(DocumentOutputSerializer(documents, many=True).data)
+
+    def fast():
+        return ORJSONRenderer().render(DocumentListSerializer(values, many=True).data)
+
+    # Both paths must render the same bytes, or the comparison is meaningless.
+    assert baseline() == fast()
+
+    result = {
+        "benchmark": "list_serialization",
+        "rows": rows,
+        "repeat": repeat,
+        "model_serializer": _time(baseline, repeat),
+        "values_serializer": _time(fast, repeat),
+    }
+    result["speedup"] = round(
+        result["model_serializer"]["median_ms"] / result["values_serializer"]["median_ms"], 2
+    )
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+    print(json.dumps(run(rows=args.rows, repeat=args.repeat)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Hermetic settings for the benchmark suite: no PostgreSQL, Redis, RabbitMQ
+or MinIO needed. Based on the test settings, with
+
+- a SQLite file (BENCHMARK_DATABASE_URL selects e.g. a local PostgreSQL),
+- django-redis on fakeredis when installed (requirements/local.txt), so
+  the Redis code paths run, else the local-memory cache,
+- files kept in memory by the test settings' S3 stand-in instead of MinIO,
+- Celery tasks run eagerly and the in-memory channel layer.
+"""
+import os
+import tempfile
+
+from config.django.test import *  # noqa
+from config.env import env
+
+DATABASES = {
+    "default": {
+        **env.db(
+            "BENCHMARK_DATABASE_URL",
+            default=f"sqlite:///{os.path.join(tempfile.gettempdir(), 'apichallenge-benchmarks.sqlite3')}",
+        ),
+        "ATOMIC_REQUESTS": True,
+    },
+}
+
+try:
+    import fakeredis
+except ImportError:
+    pass
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django_redis.cache.RedisCache",
+            "LOCATION": "redis://benchmarks:6379/0",
+            "OPTIONS": {"CONNECTION_POOL_KWARGS": {"connection_class": fakeredis.FakeConnection}},
+        }
+    }
+    DOCUMENTS_EVENT_STREAM_ENABLED = True
+    DOCUMENTS_PROCESSING_BATCHED = True
+
+# One thread, for repeatable timings.
+DOCUMENTS_PROCESSING_CONCURRENCY = 1
+
+LOGGING = {"version": 1, "disable_existing_loggers": False, "root": {"level": "ERROR"}}
@@ -0,0 +1,5 @@
+# Loads the Celery app with Django, so that tasks queued from web and ASGI
+# processes (e.g. the outbox relay) use its broker settings.
+from config.celery import celery as celery_app
+
+__all__ = ("celery_app",)
@@ -8,11 +8,12 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.django.local')
 django_asgi_app = get_asgi_application()
 
 from channels.routing import ProtocolTypeRouter, URLRouter  # noqa: E402
+from apichallenge.authentication.middleware import JWTAuthMiddleware  # noqa: E402
 from apichallenge.documents.routing import websocket_urlpatterns  # noqa: E402
 
 application = ProtocolTypeRouter(
     {
         "http": django_asgi_app,
-        "websocket": URLRouter(websocket_urlpatterns),
+        "websocket": JWTAuthMiddleware(URLRouter(websocket_urlpatterns)),
     }
 )
\ No newline at end of file
@@ -44,7 +44,12 @@ INSTALLED_APPS = [
 
 
 MIDDLEWARE = [
+    # First, so its latency covers the whole middleware stack
+    "apichallenge.common.metrics.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "apichallenge.api.compression.CompressionMiddleware",
+    # Sets the ETags that CompressionMiddleware caches compressed bodies by
+    "django.middleware.http.ConditionalGetMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -53,6 +58,8 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "apichallenge.api.throttling.RateLimitHeadersMiddleware",
+    "apichallenge.common.db_routing.PrimaryPinningMiddleware",
 ]
 
 ROOT_URLCONF = "config.urls"
@@ -81,6 +88,23 @@ DATABASES = {
 }
 DATABASES["default"]["ATOMIC_REQUESTS"] = True
 
+# Read replicas, e.g. DATABASE_REPLICA_URLS=psql://...@replica1/db,psql://...@replica2/db
+# Only views in read-only mode (ReplicaReadMixin) read from them.
+for index, url in enumerate(env.list("DATABASE_REPLICA_URLS", default=[])):
+    DATABASES[f"replica_{index}"] = {**env.db_url_config(url), "TEST": {"MIRROR": "default"}}
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias.startswith("replica_")]
+DATABASE_ROUTERS = ["apichallenge.common.db_routing.PrimaryReplicaRouter"]
+# After a write, the user's reads stay on the primary this long (replication lag)
+DATABASE_REPLICA_PIN_SECONDS = env.int("DATABASE_REPLICA_PIN_SECONDS", default=5)
+
+# Persistent or pooled connections, per process role
+from config.settings.database import DATABASE_CONNECTION  # noqa: E402
+
+for database in DATABASES.values():
+    if database["ENGINE"] == "django.db.backends.postgresql":
+        options = {**database.get("OPTIONS", {}), **DATABASE_CONNECTION.get("OPTIONS", {})}
+        database.update(DATABASE_CONNECTION, OPTIONS=options)
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
@@ -114,6 +138,13 @@ REST_FRAMEWORK = {
         "django_filters.rest_framework.DjangoFilterBackend",
     ),
     "DEFAULT_AUTHENTICATION_CLASSES": [],
+    "DEFAULT_RENDERER_CLASSES": [
+        "apichallenge.api.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_THROTTLE_CLASSES": [
+        "apichallenge.api.throttling.TokenBucketThrottle",
+    ],
 }
 
 
@@ -134,7 +165,7 @@ MINIO_USE_SSL = env.bool("MINIO_USE_SSL", default=False)
 MINIO_SCHEME = "https" if MINIO_USE_SSL else "http"
 
 STORAGES["default"] = {
-    "BACKEND": "storages.backends.s3boto3.S3Boto3Storage",
+    "BACKEND": "apichallenge.common.storage.InstrumentedS3Storage",
 }
 
 AWS_ACCESS_KEY_ID = MINIO_ACCESS_KEY
@@ -168,3 +199,6 @@ from config.settings.jwt import *  # noqa
 from config.settings.sessions import *  # noqa
 from config.settings.celery import *  # noqa
 from config.settings.swagger import *  # noqa
+from config.settings.documents import *  # noqa
+from config.settings.throttling import *  # noqa
+from config.settings.compression import *  # noqa
@@ -19,3 +19,25 @@ DATABASES = {
         "NAME": ":memory:",
     }
 }
+
+# S3 semantics (listing, batch deletes, presigned URLs) on in-memory objects: no MinIO.
+STORAGES = {
+    **STORAGES,  # noqa: F405
+    "default": {"BACKEND": "apichallenge.common.storage.LocalS3Storage"},
+}
+
+CHANNEL_LAYERS = {
+    "default": {
+        "BACKEND": "channels.layers.InMemoryChannelLayer",
+    }
+}
+
+DOCUMENTS_EVENT_STREAM_ENABLED = False
+# No Redis: uploads are processed one task each.
+DOCUMENTS_PROCESSING_BATCHED = False
+
+# No Redis pub/sub: revocations only reach the local filter.
+AUTH_REVOCATION_PUBSUB_ENABLED = False
+
+API_THROTTLE_ENABLED = False
+DATABASE_REPLICAS = []
@@ -0,0 +1,13 @@
+from config.env import env
+
+# Response compression (apichallenge.api.compression.CompressionMiddleware)
+API_COMPRESSION_ENABLED = env.bool("API_COMPRESSION_ENABLED", default=True)
+API_COMPRESSION_MIN_SIZE = env.int("API_COMPRESSION_MIN_SIZE", default=1024)  # bytes
+API_COMPRESSION_LEVELS = {
+    "zstd": env.int("API_COMPRESSION_ZSTD_LEVEL", default=3),
+    "br": env.int("API_COMPRESSION_BROTLI_QUALITY", default=5),
+    "gzip": env.int("API_COMPRESSION_GZIP_LEVEL", default=6),
+}
+# Compressed bodies of ETagged responses are cached; 0 disables.
+API_COMPRESSION_CACHE_TTL = env.int("API_COMPRESSION_CACHE_TTL", default=60 * 60)  # 1 hour
+API_COMPRESSION_CACHE_MIN_SIZE = env.int("API_COMPRESSION_CACHE_MIN_SIZE", default=16 * 1024)  # bytes
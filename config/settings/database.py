@@ -0,0 +1,65 @@
+from django.core.exceptions import ImproperlyConfigured
+
+from config.env import env
+
+# Connection reuse, configured per process type. DJANGO_PROCESS_ROLE (set by
+# the docker entrypoints) picks the variables: the web (Gunicorn) workers read
+# DATABASE_*, the ASGI workers ASGI_DATABASE_* and Celery CELERY_DATABASE_*.
+#
+# <prefix>DATABASE_CONN_MODE:
+#   "persistent"  one connection per worker thread, reused for CONN_MAX_AGE
+#                 seconds and checked before reuse after each request
+#   "pool"        a psycopg 3 pool per process, POOL_MIN_SIZE..POOL_MAX_SIZE
+#                 connections; a request waits up to POOL_TIMEOUT seconds
+#                 for one. Persistent connections are not safe under ASGI,
+#                 so the ASGI workers pool by default.
+#   "none"        a new connection per request (or task)
+_ROLE_PREFIXES = {"web": "", "asgi": "ASGI_", "celery": "CELERY_"}
+_ROLE_DEFAULT_MODES = {"web": "persistent", "asgi": "pool", "celery": "persistent"}
+_CONN_MODES = ("persistent", "pool", "none")
+
+DJANGO_PROCESS_ROLE = env("DJANGO_PROCESS_ROLE", default="web")
+if DJANGO_PROCESS_ROLE not in _ROLE_PREFIXES:
+    raise ImproperlyConfigured(
+        f"DJANGO_PROCESS_ROLE must be one of {', '.join(_ROLE_PREFIXES)}, not {DJANGO_PROCESS_ROLE!r}."
+    )
+
+_prefix = _ROLE_PREFIXES[DJANGO_PROCESS_ROLE]
+
+DATABASE_CONN_MODE = env(
+    f"{_prefix}DATABASE_CONN_MODE", default=_ROLE_DEFAULT_MODES[DJANGO_PROCESS_ROLE]
+)
+if DATABASE_CONN_MODE not in _CONN_MODES:
+    raise ImproperlyConfigured(
+        f"{_prefix}DATABASE_CONN_MODE must be one of {', '.join(_CONN_MODES)}, not {DATABASE_CONN_MODE!r}."
+    )
+
+DATABASE_CONN_MAX_AGE = env.int(f"{_prefix}DATABASE_CONN_MAX_AGE", default=600)
+DATABASE_POOL_MIN_SIZE = env.int(f"{_prefix}DATABASE_POOL_MIN_SIZE", default=2)
+DATABASE_POOL_MAX_SIZE = env.int(f"{_prefix}DATABASE_POOL_MAX_SIZE", default=10)
+DATABASE_POOL_TIMEOUT = env.float(f"{_prefix}DATABASE_POOL_TIMEOUT", default=10.0)
+# Pooled connections are replaced after this long, spreading reconnects out
+DATABASE_POOL_MAX_LIFETIME = env.float(f"{_prefix}DATABASE_POOL_MAX_LIFETIME", default=3600.0)
+
+# Merged into every PostgreSQL entry of DATABASES (the primary and replicas).
+if DATABASE_CONN_MODE == "persistent":
+    DATABASE_CONNECTION = {
+        "CONN_MAX_AGE": DATABASE_CONN_MAX_AGE,
+        "CONN_HEALTH_CHECKS": True,
+    }
+elif DATABASE_CONN_MODE == "pool":
+    DATABASE_CONNECTION = {
+        # Django returns connections to the pool at the end of each request.
+        "CONN_MAX_AGE": 0,
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            "pool": {
+                "min_size": DATABASE_POOL_MIN_SIZE,
+                "max_size": DATABASE_POOL_MAX_SIZE,
+                "timeout": DATABASE_POOL_TIMEOUT,
+                "max_lifetime": DATABASE_POOL_MAX_LIFETIME,
+            },
+        },
+    }
+else:
+    DATABASE_CONNECTION = {"CONN_MAX_AGE": 0}
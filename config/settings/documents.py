@@ -0,0 +1,49 @@
+from config.env import env
+
+# Orphaned file cleanup (apichallenge.documents.tasks.cleanup_orphaned_files)
+DOCUMENTS_STORAGE_PREFIX = env("DOCUMENTS_STORAGE_PREFIX", default="documents/")
+DOCUMENTS_ORPHAN_GRACE_PERIOD = env.int("DOCUMENTS_ORPHAN_GRACE_PERIOD", default=60 * 60 * 24)  # 1 day
+DOCUMENTS_ORPHAN_CLEANUP_DRY_RUN = env.bool("DOCUMENTS_ORPHAN_CLEANUP_DRY_RUN", default=False)
+
+# Deferred deletion of replaced and deleted files (apichallenge.documents.tasks.purge_storage_deletions)
+DOCUMENTS_STORAGE_DELETE_GRACE_PERIOD = env.int("DOCUMENTS_STORAGE_DELETE_GRACE_PERIOD", default=60 * 60 * 24)  # 1 day
+DOCUMENTS_STORAGE_PURGE_INTERVAL = env.int("DOCUMENTS_STORAGE_PURGE_INTERVAL", default=60 * 5)  # seconds
+DOCUMENTS_STORAGE_PURGE_MAX_ATTEMPTS = env.int("DOCUMENTS_STORAGE_PURGE_MAX_ATTEMPTS", default=10)
+
+# Preview renditions (apichallenge.documents.previews)
+DOCUMENTS_PREVIEW_PREFIX = env("DOCUMENTS_PREVIEW_PREFIX", default="previews/")
+DOCUMENTS_PREVIEW_SIZES = env.list("DOCUMENTS_PREVIEW_SIZES", cast=int, default=[128, 256, 512])
+DOCUMENTS_PREVIEW_QUALITY = env.int("DOCUMENTS_PREVIEW_QUALITY", default=80)
+DOCUMENTS_PREVIEW_MAX_SOURCE_SIZE = env.int("DOCUMENTS_PREVIEW_MAX_SOURCE_SIZE", default=50 * 1024 * 1024)
+DOCUMENTS_PREVIEW_PROCESS_WORKERS = env.int("DOCUMENTS_PREVIEW_PROCESS_WORKERS", default=0)
+DOCUMENTS_PREVIEW_CACHE_MAX_AGE = env.int("DOCUMENTS_PREVIEW_CACHE_MAX_AGE", default=60 * 60 * 24 * 365)
+
+# WebSocket notifications (apichallenge.documents.consumers)
+DOCUMENTS_WS_MAX_SUBSCRIPTIONS = env.int("DOCUMENTS_WS_MAX_SUBSCRIPTIONS", default=200)
+DOCUMENTS_WS_SEND_QUEUE_SIZE = env.int("DOCUMENTS_WS_SEND_QUEUE_SIZE", default=100)
+DOCUMENTS_WS_OVERFLOW_POLICY = env("DOCUMENTS_WS_OVERFLOW_POLICY", default="drop_oldest")  # drop_oldest | coalesce | disconnect
+DOCUMENTS_WS_SLOW_CONSUMER_MAX_DROPS = env.int("DOCUMENTS_WS_SLOW_CONSUMER_MAX_DROPS", default=500)
+
+# Replayable WebSocket event stream (apichallenge.documents.event_stream)
+DOCUMENTS_EVENT_STREAM_ENABLED = env.bool("DOCUMENTS_EVENT_STREAM_ENABLED", default=True)
+DOCUMENTS_EVENT_STREAM_MAXLEN = env.int("DOCUMENTS_EVENT_STREAM_MAXLEN", default=10000)
+DOCUMENTS_EVENT_STREAM_REPLAY_LIMIT = env.int("DOCUMENTS_EVENT_STREAM_REPLAY_LIMIT", default=500)
+
+# Delta sync (apichallenge.documents.apis.DocumentSyncApi)
+DOCUMENTS_SYNC_TOMBSTONE_TTL = env.int("DOCUMENTS_SYNC_TOMBSTONE_TTL", default=60 * 60 * 24 * 30)  # 30 days
+DOCUMENTS_SYNC_TOMBSTONE_PRUNE_BATCH_SIZE = env.int("DOCUMENTS_SYNC_TOMBSTONE_PRUNE_BATCH_SIZE", default=1000)
+
+# Outbox of document side effects (apichallenge.documents.outbox)
+DOCUMENTS_OUTBOX_BATCH_SIZE = env.int("DOCUMENTS_OUTBOX_BATCH_SIZE", default=500)
+DOCUMENTS_OUTBOX_RELAY_INTERVAL = env.int("DOCUMENTS_OUTBOX_RELAY_INTERVAL", default=10)  # seconds, periodic run
+DOCUMENTS_OUTBOX_MAX_ATTEMPTS = env.int("DOCUMENTS_OUTBOX_MAX_ATTEMPTS", default=10)
+DOCUMENTS_OUTBOX_RETRY_DELAY = env.int("DOCUMENTS_OUTBOX_RETRY_DELAY", default=5)  # seconds, doubled per attempt
+DOCUMENTS_OUTBOX_MAX_RETRY_DELAY = env.int("DOCUMENTS_OUTBOX_MAX_RETRY_DELAY", default=60 * 10)
+
+# Batched post-upload processing (apichallenge.documents.processing_queue)
+DOCUMENTS_PROCESSING_BATCHED = env.bool("DOCUMENTS_PROCESSING_BATCHED", default=True)
+DOCUMENTS_PROCESSING_BATCH_SIZE = env.int("DOCUMENTS_PROCESSING_BATCH_SIZE", default=50)
+DOCUMENTS_PROCESSING_BATCH_DELAY = env.int("DOCUMENTS_PROCESSING_BATCH_DELAY", default=2)  # seconds to gather a batch
+DOCUMENTS_PROCESSING_CONCURRENCY = env.int("DOCUMENTS_PROCESSING_CONCURRENCY", default=4)  # threads per batch
+DOCUMENTS_PROCESSING_INTERVAL = env.int("DOCUMENTS_PROCESSING_INTERVAL", default=60)  # seconds, periodic run
+DOCUMENTS_PROCESSING_CLAIM_TIMEOUT = env.int("DOCUMENTS_PROCESSING_CLAIM_TIMEOUT", default=60 * 15)  # then requeued
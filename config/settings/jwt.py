@@ -13,4 +13,21 @@ SIMPLE_JWT = {
     "AUTH_HEADER_TYPES": ("Bearer",),
     "USER_ID_FIELD": "id",
     "USER_ID_CLAIM": "user_id",
-}
\ No newline at end of file
+    # Adds the `role` claim to issued tokens
+    "TOKEN_OBTAIN_SERIALIZER": "apichallenge.authentication.tokens.RoleTokenObtainPairSerializer",
+    # Rejects revoked refresh tokens
+    "TOKEN_REFRESH_SERIALIZER": "apichallenge.authentication.tokens.RevocationAwareTokenRefreshSerializer",
+}
+
+# User lookups of CachedJWTAuthentication
+AUTH_USER_CACHE_TTL = env.int("AUTH_USER_CACHE_TTL", default=60)  # seconds, shared cache
+AUTH_USER_LOCAL_CACHE_TTL = env.int("AUTH_USER_LOCAL_CACHE_TTL", default=5)  # seconds, per process
+
+# Token revocation (apichallenge.authentication.revocation)
+AUTH_REVOCATION_PUBSUB_ENABLED = env.bool("AUTH_REVOCATION_PUBSUB_ENABLED", default=True)
+AUTH_REVOCATION_FILTER_CAPACITY = env.int("AUTH_REVOCATION_FILTER_CAPACITY", default=100_000)
+AUTH_REVOCATION_FILTER_ERROR_RATE = env.float("AUTH_REVOCATION_FILTER_ERROR_RATE", default=0.001)
+# Rebuilding drops JTIs of expired tokens from the in-process filter
+AUTH_REVOCATION_FILTER_REBUILD_INTERVAL = env.int(
+    "AUTH_REVOCATION_FILTER_REBUILD_INTERVAL", default=60 * 60
+)  # seconds
@@ -0,0 +1,28 @@
+from config.env import env
+
+# Token-bucket throttling (apichallenge.api.throttling.TokenBucketThrottle)
+API_THROTTLE_ENABLED = env.bool("API_THROTTLE_ENABLED", default=True)
+
+# {scope: {role: rate}}; "anon" is unauthenticated clients (by IP), "default"
+# any role without its own entry. A rate is "<amount>[KB|MB|GB]/[n]<period>":
+# the amount is the burst, refilled continuously over the period.
+API_THROTTLE_RATES = {
+    "read": {
+        "anon": env("API_THROTTLE_READ_ANON", default="60/min"),
+        "default": env("API_THROTTLE_READ", default="300/min"),
+        "admin": env("API_THROTTLE_READ_ADMIN", default="1200/min"),
+    },
+    "write": {
+        "anon": env("API_THROTTLE_WRITE_ANON", default="20/min"),
+        "default": env("API_THROTTLE_WRITE", default="120/min"),
+    },
+    "documents.upload": {
+        "default": env("API_THROTTLE_UPLOAD", default="30/min"),
+        "admin": env("API_THROTTLE_UPLOAD_ADMIN", default="120/min"),
+    },
+    # Bytes: a download is admitted while the bucket is not in debt.
+    "documents.download": {
+        "default": env("API_THROTTLE_DOWNLOAD", default="20MB/s"),
+        "admin": env("API_THROTTLE_DOWNLOAD_ADMIN", default="100MB/s"),
+    },
+}
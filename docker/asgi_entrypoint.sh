@@ -0,0 +1,20 @@
+#!/bin/sh
+
+# Selects the database connection settings (config/settings/database.py)
+export DJANGO_PROCESS_ROLE=asgi
+
+# Each Uvicorn worker writes its metrics here; /metrics adds them up.
+# Emptied on start so the samples of a previous run are not counted again.
+export PROMETHEUS_MULTIPROC_DIR=/tmp/prometheus
+rm -rf "$PROMETHEUS_MULTIPROC_DIR" && mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
+echo "--> Waiting for database..."
+./wait-for-it.sh db:5432 -- echo "Database is ready."
+
+echo "--> Starting Uvicorn (ASGI: async API + WebSockets)..."
+uvicorn config.asgi:application \
+    --host 0.0.0.0 \
+    --port 8001 \
+    --workers 2 \
+    --proxy-headers \
+    --forwarded-allow-ips "*"
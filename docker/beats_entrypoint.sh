@@ -1,5 +1,8 @@
 #!/bin/sh
 
+# Selects the database connection settings (config/settings/database.py)
+export DJANGO_PROCESS_ROLE=celery
+
 echo "--> Waiting for database..."
 ./wait-for-it.sh db:5432 -- echo "Database is ready."
 
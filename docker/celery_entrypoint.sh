@@ -1,14 +1,60 @@
 #!/bin/sh
 
+# Usage: celery_entrypoint.sh [interactive|cpu|maintenance|all]
+# Each pool consumes its own queue (CELERY_TASK_QUEUES in config/settings/celery.py).
+POOL=${1:-all}
+
+# Selects the database connection settings (config/settings/database.py)
+export DJANGO_PROCESS_ROLE=celery
+
+# Each pool process writes its metrics here; the worker serves them on
+# METRICS_WORKER_PORT. Emptied on start so a previous run's samples are not counted again.
+export PROMETHEUS_MULTIPROC_DIR=/tmp/prometheus
+export METRICS_WORKER_PORT="${METRICS_WORKER_PORT:-9808}"
+rm -rf "$PROMETHEUS_MULTIPROC_DIR" && mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
 echo "--> Waiting for database..."
 ./wait-for-it.sh db:5432 -- echo "Database is ready."
 
 echo "--> Waiting for RabbitMQ..."
 ./wait-for-it.sh rabbitmq:5672 -- echo "RabbitMQ is ready."
 
-echo "--> Starting Celery worker..."
-celery -A config.celery worker \
+case "$POOL" in
+    interactive)
+        # I/O-bound: threads wait on the network, several messages reserved each.
+        set -- -Q interactive -P threads \
+            -c "${CELERY_INTERACTIVE_CONCURRENCY:-16}" \
+            --prefetch-multiplier "${CELERY_INTERACTIVE_PREFETCH:-4}"
+        ;;
+    cpu)
+        # CPU-bound: one process per core, one message each, recycled to bound memory.
+        set -- -Q cpu -P prefork \
+            -c "${CELERY_CPU_CONCURRENCY:-$(nproc)}" \
+            --prefetch-multiplier 1 \
+            --max-tasks-per-child "${CELERY_CPU_MAX_TASKS_PER_CHILD:-200}"
+        ;;
+    maintenance)
+        # Long housekeeping: a couple of processes, as only prefork enforces
+        # the tasks' time limits (the threads pool ignores them).
+        set -- -Q maintenance -P prefork \
+            -c "${CELERY_MAINTENANCE_CONCURRENCY:-2}" \
+            --prefetch-multiplier 1
+        ;;
+    all)
+        # A single worker for every queue, for small deployments.
+        set -- -Q interactive,cpu,maintenance -P prefork
+        ;;
+    *)
+        echo "Unknown worker pool: $POOL (expected interactive, cpu, maintenance or all)" >&2
+        exit 1
+        ;;
+esac
+
+echo "--> Starting Celery worker ($POOL)..."
+exec celery -A config.celery worker \
     -l info \
+    -n "$POOL@%h" \
     --without-gossip \
     --without-mingle \
-    --without-heartbeat
\ No newline at end of file
+    --without-heartbeat \
+    "$@"
@@ -1,5 +1,13 @@
 #!/bin/sh
 
+# Selects the database connection settings (config/settings/database.py)
+export DJANGO_PROCESS_ROLE=web
+
+# Each Gunicorn worker writes its metrics here; /metrics adds them up.
+# Emptied on start so the samples of a previous run are not counted again.
+export PROMETHEUS_MULTIPROC_DIR=/tmp/prometheus
+rm -rf "$PROMETHEUS_MULTIPROC_DIR" && mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
 echo "--> Waiting for database..."
 ./wait-for-it.sh db:5432 -- echo "Database is ready."
 